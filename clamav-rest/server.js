@@ -138,6 +138,37 @@ function testClamAVConnection() {
     });
 }
 
+// Function to get the ClamAV engine and signature database version
+function getClamAVVersion() {
+    return new Promise((resolve, reject) => {
+        const client = new net.Socket();
+        let responseData = '';
+
+        client.setTimeout(5000);
+
+        client.connect(CLAMD_PORT, CLAMD_HOST, () => {
+            client.write('zVERSION\0');
+        });
+
+        client.on('data', (data) => {
+            responseData += data.toString();
+        });
+
+        client.on('end', () => {
+            resolve(responseData.replace(/\0/g, '').trim());
+        });
+
+        client.on('error', (err) => {
+            reject(err);
+        });
+
+        client.on('timeout', () => {
+            client.destroy();
+            reject(new Error('Connection timeout'));
+        });
+    });
+}
+
 // Middleware to log requests
 app.use((req, res, next) => {
     console.log(`${new Date().toISOString()} - ${req.method} ${req.path}`);
@@ -206,6 +237,20 @@ app.post('/scan', upload.single('file'), async (req, res) => {
     }
 });
 
+// Version endpoint, e.g. "ClamAV 1.4.1/27431/Thu Oct 16 08:34:00 2026"
+app.get('/version', async (req, res) => {
+    try {
+        const version = await getClamAVVersion();
+        res.json({ version: version });
+    } catch (error) {
+        res.status(503).json({
+            status: 'ERROR',
+            message: 'ClamAV daemon not responding',
+            error: error.message
+        });
+    }
+});
+
 // Ping endpoint for ClamAV daemon
 app.get('/ping', async (req, res) => {
     try {
@@ -4,6 +4,7 @@ import { useState, useEffect } from 'react';
 import FileDashboard from '../components/FileDashboard';
 import LoginPage from '../components/LoginPage';
 import { Appointment, FileData, User } from '../types';
+import { openDownload } from '../download';
 
 // Use same-origin relative URLs so requests go through the Caddy origin
 const APPOINTMENTS_API_URL = '/api/v1/appointments/';
@@ -13,6 +14,7 @@ export default function Home() {
   const [currentUser, setCurrentUser] = useState<User | null>(null);
   const [appointments, setAppointments] = useState<Appointment[]>([]);
   const [allFiles, setAllFiles] = useState<FileData[]>([]);
+  const [filesCursor, setFilesCursor] = useState<string | null>(null);
   const [selectedAppointment, setSelectedAppointment] = useState<Appointment | null>(null);
   const [newAppointmentName, setNewAppointmentName] = useState('');
 
@@ -29,13 +31,17 @@ export default function Home() {
     }
   };
 
-  const fetchAllFiles = async () => {
+  const fetchAllFiles = async (cursor?: string) => {
     if (!currentUser) return;
     try {
-      const response = await fetch(`${FILES_API_URL}?user_id=${currentUser.id}`);
+      const params = new URLSearchParams({ user_id: currentUser.id, include_urls: 'false' });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${FILES_API_URL}?${params}`);
       const result = await response.json();
       if (result.success) {
-        setAllFiles(result.data);
+        // A cursor loads the next page after the files already shown
+        setAllFiles((prevFiles) => (cursor ? [...prevFiles, ...result.data] : result.data));
+        setFilesCursor(result.next_cursor ?? null);
       }
     } catch (error) {
       console.error('Failed to fetch all files:', error);
@@ -207,14 +213,22 @@ export default function Home() {
                         </span>
                       )}
                     </div>
-                    <a href={file.download_url} target="_blank" rel="noopener noreferrer" className="text-blue-600 hover:text-blue-500 dark:text-blue-400 dark:hover:text-blue-300 font-semibold text-sm transition-colors ml-3">
+                    <button onClick={() => openDownload(file.id)} className="text-blue-600 hover:text-blue-500 dark:text-blue-400 dark:hover:text-blue-300 font-semibold text-sm transition-colors ml-3">
                       Download
-                    </a>
+                    </button>
                   </div>
                 ))
               ) : (
                 <p className="text-center text-gray-500 dark:text-gray-400 py-8">No files uploaded yet.</p>
               )}
+              {filesCursor && (
+                <button
+                  onClick={() => fetchAllFiles(filesCursor)}
+                  className="w-full py-2 font-semibold text-blue-600 hover:text-blue-500 dark:text-blue-400 dark:hover:text-blue-300 transition-colors"
+                >
+                  Load more
+                </button>
+              )}
             </div>
           </div>
 
@@ -1,8 +1,11 @@
 import { useState, useEffect } from 'react';
 import FileUploader from './FileUploader';
 import { Appointment, FileData, User } from '../types';
+import { openDownload } from '../download';
 
 const API_BASE_URL = '/api/v1/file';
+const STATUS_POLL_INTERVAL_MS = 3000;
+const FINAL_UPLOAD_STATES = ['stored', 'failed'];
 
 interface FileDashboardProps {
   appointment: Appointment;
@@ -13,22 +16,52 @@ interface FileDashboardProps {
 export default function FileDashboard({ appointment, user, onBack }: FileDashboardProps) {
   const [files, setFiles] = useState<FileData[]>([]);
   const [refreshKey, setRefreshKey] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+
+  const fetchFiles = async (cursor?: string) => {
+    try {
+      const params = new URLSearchParams({ include_urls: 'false' });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${API_BASE_URL}/appointment/${appointment.id}?${params}`);
+      const result = await response.json();
+      if (result.success) {
+        // A cursor loads the next page after the files already shown
+        setFiles((prevFiles) => (cursor ? [...prevFiles, ...result.data] : result.data));
+        setNextCursor(result.next_cursor ?? null);
+      }
+    } catch (error) {
+      console.error('Failed to fetch files:', error);
+    }
+  };
 
   useEffect(() => {
-    const fetchFiles = async () => {
+    fetchFiles();
+  }, [appointment.id, refreshKey]);
+
+  // Refresh the state of every file still being stored with a single batch request
+  useEffect(() => {
+    const pending = files.filter((file) => file.upload_state && !FINAL_UPLOAD_STATES.includes(file.upload_state));
+    if (pending.length === 0) return;
+    const timer = setTimeout(async () => {
       try {
-        const response = await fetch(`${API_BASE_URL}/appointment/${appointment.id}`);
+        const response = await fetch(`${API_BASE_URL}/status/batch`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ files: pending.map((file) => ({ id: file.id })) }),
+        });
         const result = await response.json();
         if (result.success) {
-          setFiles(result.data);
+          setFiles((prevFiles) => prevFiles.map((file) => {
+            const status = result.data.statuses[file.id];
+            return status ? { ...file, upload_state: status.state } : file;
+          }));
         }
       } catch (error) {
-        console.error('Failed to fetch files:', error);
+        console.error('Failed to fetch upload statuses:', error);
       }
-    };
-
-    fetchFiles();
-  }, [appointment.id, refreshKey]);
+    }, STATUS_POLL_INTERVAL_MS);
+    return () => clearTimeout(timer);
+  }, [files]);
 
   const handleUploadSuccess = (newFile: FileData) => {
     setFiles((prevFiles) => [...prevFiles, newFile]);
@@ -82,9 +115,12 @@ export default function FileDashboard({ appointment, user, onBack }: FileDashboa
               {files.length > 0 ? (
                 files.map((file) => (
                   <div key={file.id} className="flex items-center justify-between p-4 bg-gray-50 dark:bg-gray-700 rounded-lg border border-gray-200 dark:border-gray-600">
-                    <a href={file.download_url} target="_blank" rel="noopener noreferrer" className="font-medium text-blue-600 hover:text-blue-500 dark:text-blue-400 dark:hover:text-blue-300 truncate transition-colors" title={file.filename}>
+                    <button onClick={() => openDownload(file.id)} className="font-medium text-left text-blue-600 hover:text-blue-500 dark:text-blue-400 dark:hover:text-blue-300 truncate transition-colors" title={file.filename}>
                       {file.filename}
-                    </a>
+                    </button>
+                    {file.upload_state && file.upload_state !== 'stored' && (
+                      <span className="text-sm text-gray-500 dark:text-gray-400 ml-3">{file.upload_state}</span>
+                    )}
                     <button onClick={() => handleDelete(file.id)} className="text-red-600 hover:text-red-800 dark:text-red-400 dark:hover:text-red-300 font-semibold transition-colors">
                       Remove
                     </button>
@@ -93,6 +129,14 @@ export default function FileDashboard({ appointment, user, onBack }: FileDashboa
               ) : (
                 <p className="text-center text-gray-500 dark:text-gray-400 py-8">No files found for this appointment.</p>
               )}
+              {nextCursor && (
+                <button
+                  onClick={() => fetchFiles(nextCursor)}
+                  className="w-full py-2 font-semibold text-blue-600 hover:text-blue-500 dark:text-blue-400 dark:hover:text-blue-300 transition-colors"
+                >
+                  Load more
+                </button>
+              )}
             </div>
           </div>
         </div>
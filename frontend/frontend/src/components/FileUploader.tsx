@@ -8,6 +8,15 @@ interface UploadInitResponse {
   data: {
     chunk_size: number;
     upload_id: string;
+    total_chunks: number | null;
+    parallelism: number;
+  };
+}
+
+interface UploadChunksResponse {
+  data: {
+    chunk_size: number | null;
+    received: { index: number; size: number }[];
   };
 }
 
@@ -31,11 +40,113 @@ interface FileUploaderProps {
   userId: string;
   onUploadSuccess: (newFile: FileData) => void;
   onUploadComplete: () => void;
+  concurrency?: number;
 }
 
 const API_BASE_URL = '/api/v1/file';
 
-export default function FileUploader({ appointmentId, userId, onUploadSuccess, onUploadComplete }: FileUploaderProps) {
+// Chunks of one upload sent at once, unless the server recommends otherwise. The server
+// stores chunks in any order, so on high-latency links several requests in flight hide
+// the round trip of each one.
+const DEFAULT_CONCURRENCY = Number(process.env.NEXT_PUBLIC_UPLOAD_CONCURRENCY) || 4;
+
+// Files up to this size are sent in a single `POST /upload/` request. The server accepts
+// files up to its APP_MAX_CHUNK_SIZE there; larger ones fall back to a chunked upload.
+const SINGLE_UPLOAD_MAX_SIZE = Number(process.env.NEXT_PUBLIC_SINGLE_UPLOAD_MAX_SIZE) || 10 * 1024 * 1024;
+
+// Uploads in progress are remembered per file, so a retry after a dropped
+// connection resends only the chunks the server does not have yet
+const resumeKey = (file: File) => `upload:${file.name}:${file.size}:${file.lastModified}`;
+
+// SHA-256 of a chunk, verified by the server before the chunk is stored.
+// WebCrypto is only available in secure contexts; elsewhere chunks go unchecked.
+async function chunkChecksum(chunk: Blob): Promise<string | null> {
+  if (!globalThis.crypto?.subtle) return null;
+  const digest = await crypto.subtle.digest('SHA-256', await chunk.arrayBuffer());
+  const hex = Array.from(new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, '0')).join('');
+  return `sha256:${hex}`;
+}
+
+interface UploadSession {
+  upload_id: string;
+  chunk_size: number;
+  parallelism?: number;
+  received: Set<number>;
+}
+
+async function resumeUpload(file: File): Promise<UploadSession | null> {
+  const saved = localStorage.getItem(resumeKey(file));
+  if (!saved) return null;
+  const { upload_id, chunk_size, parallelism } = JSON.parse(saved);
+  const response = await fetch(`${API_BASE_URL}/upload/${upload_id}/chunks`);
+  if (!response.ok) {
+    localStorage.removeItem(resumeKey(file));
+    return null;
+  }
+  const json: UploadChunksResponse = await response.json();
+  if (json.data.chunk_size !== chunk_size) return null;
+  // Only complete chunks count; the last one may be shorter
+  const received = new Set(
+    json.data.received
+      .filter(({ index, size }) => size === Math.min(chunk_size, file.size - index * chunk_size))
+      .map(({ index }) => index)
+  );
+  return { upload_id, chunk_size, parallelism, received };
+}
+
+function appendFileFields(formData: FormData, file: File, appointmentId: string, userId: string) {
+  formData.append('file_extension', file.name.split('.').pop() || '');
+  formData.append('content_type', file.type);
+  formData.append('appointment_id', appointmentId);
+  formData.append('user_id', userId);
+  formData.append('filename', file.name);
+}
+
+// Upload a small file in one request. Resolves to null when the server finds the file
+// too large for a single request, for the caller to upload it in chunks instead.
+async function uploadSingle(file: File, appointmentId: string, userId: string): Promise<Response | null> {
+  const formData = new FormData();
+  formData.append('file', file, file.name);
+  const checksum = await chunkChecksum(file);
+  if (checksum) formData.append('checksum', checksum);
+  appendFileFields(formData, file, appointmentId, userId);
+
+  const response = await fetch(`${API_BASE_URL}/upload/`, { method: 'POST', body: formData });
+  if (response.status === 422) {
+    const errorData = await response.clone().json().catch(() => null);
+    const tooLarge = Array.isArray(errorData?.detail)
+      && errorData.detail.some((error: { loc?: string[] }) => error.loc?.includes('file'));
+    if (tooLarge) return null;
+  }
+  return response;
+}
+
+async function uploadChunk(file: File, upload_id: string, chunk_size: number, index: number): Promise<void> {
+  const start = index * chunk_size;
+  const chunk = file.slice(start, Math.min(start + chunk_size, file.size));
+
+  const formData = new FormData();
+  formData.append('chunk_size', chunk.size.toString());
+  formData.append('upload_id', upload_id);
+  formData.append('chunk_index', index.toString());
+  formData.append('file', chunk, file.name);
+  const checksum = await chunkChecksum(chunk);
+  if (checksum) formData.append('checksum', checksum);
+
+  const chunkResponse = await fetch(`${API_BASE_URL}/upload/chunk/`, {
+    method: 'POST',
+    body: formData,
+  });
+
+  if (!chunkResponse.ok) {
+    const errorData = await chunkResponse.json();
+    throw new Error(`Failed to upload chunk ${index + 1}: ${errorData.message || 'Unknown error'}`);
+  }
+}
+
+export default function FileUploader({
+  appointmentId, userId, onUploadSuccess, onUploadComplete, concurrency,
+}: FileUploaderProps) {
   const [file, setFile] = useState<File | null>(null);
   const [progress, setProgress] = useState(0);
   const [status, setStatus] = useState('Click or drag to select a file');
@@ -54,6 +165,63 @@ export default function FileUploader({ appointmentId, userId, onUploadSuccess, o
     }
   };
 
+  // Resume an interrupted upload of this file, or initialize a new one, upload its
+  // missing chunks and complete it
+  const uploadChunked = async (file: File): Promise<Response> => {
+    // 1. Initialize: the server picks the chunk size and parallelism for this file
+    setStatus('Initializing upload...');
+    let session = await resumeUpload(file);
+    if (!session) {
+      const initFormData = new FormData();
+      initFormData.append('total_size', file.size.toString());
+      if (file.type) initFormData.append('content_type', file.type);
+      const initResponse = await fetch(`${API_BASE_URL}/upload/init/`, { method: 'POST', body: initFormData });
+      if (!initResponse.ok) throw new Error('Failed to initialize upload.');
+      const initJson: UploadInitResponse = await initResponse.json();
+      session = { ...initJson.data, received: new Set<number>() };
+      localStorage.setItem(resumeKey(file), JSON.stringify({
+        upload_id: session.upload_id, chunk_size: session.chunk_size, parallelism: session.parallelism,
+      }));
+    }
+    const { chunk_size, upload_id, received } = session;
+
+    // 2. Upload Chunks, a window of them at a time and in any order
+    const totalChunks = Math.max(1, Math.ceil(file.size / chunk_size));
+    const pending = Array.from({ length: totalChunks }, (_, i) => i).filter((i) => !received.has(i));
+    let done = totalChunks - pending.length;
+    setProgress(Math.round((done / totalChunks) * 100));
+    setStatus(`Uploading ${totalChunks} chunks...`);
+
+    const worker = async () => {
+      for (let i = pending.shift(); i !== undefined; i = pending.shift()) {
+        await uploadChunk(file, upload_id, chunk_size, i);
+        done += 1;
+        setStatus(`Uploaded chunk ${done} of ${totalChunks}...`);
+        setProgress(Math.round((done / totalChunks) * 100));
+      }
+    };
+    const windowSize = concurrency ?? session.parallelism ?? DEFAULT_CONCURRENCY;
+    try {
+      await Promise.all(Array.from({ length: Math.min(windowSize, pending.length) }, worker));
+    } finally {
+      // Stop the other workers after a failure; the upload resumes from what was stored
+      pending.length = 0;
+    }
+
+    // 3. Complete Upload
+    setStatus('Completing upload...');
+    const completeFormData = new FormData();
+    completeFormData.append('upload_id', upload_id);
+    completeFormData.append('total_chunks', totalChunks.toString());
+    completeFormData.append('total_size', file.size.toString());
+    appendFileFields(completeFormData, file, appointmentId, userId);
+
+    return fetch(`${API_BASE_URL}/upload/complete/`, {
+      method: 'POST',
+      body: completeFormData,
+    });
+  };
+
   const handleUpload = async () => {
     if (!file) {
       setStatus('Please select a file first.');
@@ -66,58 +234,15 @@ export default function FileUploader({ appointmentId, userId, onUploadSuccess, o
     setVirusWarning(null);
 
     try {
-      // 1. Initialize Upload
-      setStatus('Initializing upload...');
-      const initResponse = await fetch(`${API_BASE_URL}/upload/init/`, { method: 'POST' });
-      if (!initResponse.ok) throw new Error('Failed to initialize upload.');
-      const initJson: UploadInitResponse = await initResponse.json();
-      const { chunk_size, upload_id } = initJson.data;
-
-      // 2. Upload Chunks
-      const totalChunks = Math.ceil(file.size / chunk_size);
-      for (let i = 0; i < totalChunks; i++) {
-        const start = i * chunk_size;
-        const end = Math.min(start + chunk_size, file.size);
-        const chunk = file.slice(start, end);
-
-        const formData = new FormData();
-        formData.append('chunk_size', chunk.size.toString());
-        formData.append('upload_id', upload_id);
-        formData.append('chunk_index', i.toString());
-        formData.append('file', chunk, file.name);
-        
-        setStatus(`Uploading chunk ${i + 1} of ${totalChunks}...`);
-        
-        const chunkResponse = await fetch(`${API_BASE_URL}/upload/chunk/`, {
-          method: 'POST',
-          body: formData,
-        });
-
-        if (!chunkResponse.ok) {
-           const errorData = await chunkResponse.json();
-           throw new Error(`Failed to upload chunk ${i + 1}: ${errorData.message || 'Unknown error'}`);
-        }
-        
-        setProgress(Math.round(((i + 1) / totalChunks) * 100));
+      let completeResponse: Response | null = null;
+      if (file.size <= SINGLE_UPLOAD_MAX_SIZE) {
+        setStatus('Uploading...');
+        completeResponse = await uploadSingle(file, appointmentId, userId);
       }
 
-      // 3. Complete Upload
-      setStatus('Completing upload...');
-      const completeFormData = new FormData();
-      const fileExtension = file.name.split('.').pop() || '';
-      completeFormData.append('upload_id', upload_id);
-      completeFormData.append('total_chunks', totalChunks.toString());
-      completeFormData.append('total_size', file.size.toString());
-      completeFormData.append('file_extension', fileExtension);
-      completeFormData.append('content_type', file.type);
-      completeFormData.append('appointment_id', appointmentId);
-      completeFormData.append('user_id', userId);
-      completeFormData.append('filename', file.name);
-      
-      const completeResponse = await fetch(`${API_BASE_URL}/upload/complete/`, {
-        method: 'POST',
-        body: completeFormData,
-      });
+      if (!completeResponse) {
+        completeResponse = await uploadChunked(file);
+      }
 
       if (!completeResponse.ok) {
         // Try to parse the error response
@@ -132,6 +257,7 @@ export default function FileUploader({ appointmentId, userId, onUploadSuccess, o
       }
 
       const completeJson: SuccessResponse<UploadCompleteResponse> = await completeResponse.json();
+      localStorage.removeItem(resumeKey(file));
       
       const newFileData: FileData = {
           id: completeJson.data.id,
@@ -0,0 +1,24 @@
+const SIGN_API_URL = '/api/v1/file/sign';
+
+// Listings are fetched without download URLs: sign one when a file is opened
+export async function openDownload(fileId: string): Promise<void> {
+  // Open the tab synchronously so popup blockers treat it as user-initiated
+  const tab = window.open('', '_blank');
+  try {
+    const response = await fetch(SIGN_API_URL, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ file_ids: [fileId] }),
+    });
+    const result = await response.json();
+    const url = result.success ? result.data.urls[fileId] : undefined;
+    if (url && tab) {
+      tab.opener = null;
+      tab.location.href = url;
+      return;
+    }
+  } catch (error) {
+    console.error('Failed to sign download URL:', error);
+  }
+  tab?.close();
+}
@@ -9,7 +9,6 @@ export interface Appointment {
   id: string;
   name: string;
   date: string; // ISO date string
-  files: FileData[];
 }
 
 export interface FileData {
@@ -17,6 +16,9 @@ export interface FileData {
   filename: string;
   content_type: string;
   size: number;
-  download_url: string;
+  // Absent from listings fetched with include_urls=false
+  download_url?: string | null;
   appointment_name?: string;
+  // queued, scanning, assembling, uploading, stored or failed
+  upload_state?: string;
 } 
\ No newline at end of file
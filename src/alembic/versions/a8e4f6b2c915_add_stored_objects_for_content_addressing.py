@@ -0,0 +1,38 @@
+"""add stored_objects table for content-addressed storage
+
+Revision ID: a8e4f6b2c915
+Revises: f2a9c3d1b004
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e4f6b2c915'
+down_revision: Union[str, None] = 'f2a9c3d1b004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stored_objects',
+    sa.Column('path', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('content_sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('celery_task_id', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('path')
+    )
+    # Files with the same content share one stored object
+    op.drop_index(op.f('ix_files_path'), table_name='files')
+    op.create_index(op.f('ix_files_path'), 'files', ['path'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_files_path'), table_name='files')
+    op.create_index(op.f('ix_files_path'), 'files', ['path'], unique=True)
+    op.drop_table('stored_objects')
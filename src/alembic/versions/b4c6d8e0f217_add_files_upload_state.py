@@ -0,0 +1,38 @@
+"""add files.upload_state and index files.celery_task_id
+
+Revision ID: b4c6d8e0f217
+Revises: e7a9b1c3d405
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c6d8e0f217'
+down_revision: Union[str, None] = 'e7a9b1c3d405'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('upload_state', sa.String(length=20), nullable=False, server_default='queued'))
+    # Existing files take the state of their Celery task; files without one were never stored
+    op.execute("""
+        UPDATE files LEFT JOIN celery_tasks ON celery_tasks.task_id = files.celery_task_id
+        SET files.upload_state = CASE
+            WHEN files.celery_task_id IS NULL OR files.celery_task_id = '' THEN 'failed'
+            WHEN celery_tasks.status = 'SUCCESS' THEN 'stored'
+            WHEN celery_tasks.status = 'FAILURE' THEN 'failed'
+            WHEN celery_tasks.status = 'STARTED' THEN 'uploading'
+            ELSE 'queued'
+        END
+    """)
+    op.create_index(op.f('ix_files_celery_task_id'), 'files', ['celery_task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_files_celery_task_id'), table_name='files')
+    op.drop_column('files', 'upload_state')
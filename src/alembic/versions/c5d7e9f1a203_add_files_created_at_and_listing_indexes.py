@@ -0,0 +1,32 @@
+"""add files.created_at and keyset pagination indexes
+
+Revision ID: c5d7e9f1a203
+Revises: a8e4f6b2c915
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d7e9f1a203'
+down_revision: Union[str, None] = 'a8e4f6b2c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('created_at', sa.DateTime(), nullable=True))
+    # Existing files have no creation time: fall back to their scan date
+    op.execute("UPDATE files SET created_at = COALESCE(virus_scan_date, CURRENT_TIMESTAMP)")
+    op.alter_column('files', 'created_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_files_user_id_created_at_id', 'files', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_files_appointment_id_created_at_id', 'files', ['appointment_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_files_appointment_id_created_at_id', table_name='files')
+    op.drop_index('ix_files_user_id_created_at_id', table_name='files')
+    op.drop_column('files', 'created_at')
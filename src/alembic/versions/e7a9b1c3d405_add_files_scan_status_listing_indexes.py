@@ -0,0 +1,30 @@
+"""add (owner, virus_scan_status) listing indexes on files
+
+Revision ID: e7a9b1c3d405
+Revises: c5d7e9f1a203
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a9b1c3d405'
+down_revision: Union[str, None] = 'c5d7e9f1a203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # created_at and id follow the status so filtered pages are read in keyset order without a filesort
+    op.create_index('ix_files_user_id_virus_scan_status', 'files',
+                    ['user_id', 'virus_scan_status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_files_appointment_id_virus_scan_status', 'files',
+                    ['appointment_id', 'virus_scan_status', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_files_appointment_id_virus_scan_status', table_name='files')
+    op.drop_index('ix_files_user_id_virus_scan_status', table_name='files')
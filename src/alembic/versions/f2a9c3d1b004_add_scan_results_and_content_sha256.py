@@ -0,0 +1,39 @@
+"""add scan_results table and files.content_sha256
+
+Revision ID: f2a9c3d1b004
+Revises: d3b2a1c4f789
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c3d1b004'
+down_revision: Union[str, None] = 'd3b2a1c4f789'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_files_content_sha256'), 'files', ['content_sha256'], unique=False)
+    op.create_table('scan_results',
+    sa.Column('content_sha256', sa.CHAR(length=64), nullable=False),
+    sa.Column('signature_version', sa.String(length=64), nullable=False),
+    sa.Column('is_infected', sa.Boolean(), nullable=False),
+    sa.Column('virus_name', sa.String(length=255), nullable=True),
+    sa.Column('result', sa.JSON(none_as_null=True), nullable=True),
+    sa.Column('scanned_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('content_sha256', 'signature_version')
+    )
+    op.create_index(op.f('ix_scan_results_scanned_at'), 'scan_results', ['scanned_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scan_results_scanned_at'), table_name='scan_results')
+    op.drop_table('scan_results')
+    op.drop_index(op.f('ix_files_content_sha256'), table_name='files')
+    op.drop_column('files', 'content_sha256')
@@ -1,11 +1,20 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from constants.upload_stauts import UploadStatus
+from constants.upload_mode import UploadMode
+from constants.upload_state import UploadState
 
 
 class UploadInitResponse(BaseModel):
     chunk_size: int
     upload_id: str
+    mode: UploadMode = UploadMode.chunked
+    # Presigned PUT URLs, one per part, for direct uploads
+    part_urls: Optional[List[str]] = None
+    # Computed from total_size when declared; null when the number of chunks is unknown
+    total_chunks: Optional[int] = None
+    # Recommended number of chunk requests in flight at once
+    parallelism: int = 1
 
 
 class UploadChunkResponse(BaseModel):
@@ -13,6 +22,23 @@ class UploadChunkResponse(BaseModel):
     upload_id: str
 
 
+class UploadedChunk(BaseModel):
+    index: int
+    size: int
+    sha256: Optional[str] = None
+    crc32c: Optional[str] = None
+
+
+class UploadChunksResponse(BaseModel):
+    upload_id: str
+    mode: UploadMode = UploadMode.chunked
+    total_chunks: Optional[int] = None
+    chunk_size: Optional[int] = None
+    received: List[UploadedChunk] = []
+    # Indices still to send; null until total_chunks is declared at init
+    missing: Optional[List[int]] = None
+
+
 class FileResponse(BaseModel):
     id: str
     filename: str
@@ -30,4 +56,37 @@ class FileResponse(BaseModel):
 
 
 class UploadStatusResponse(BaseModel):
+    # Celery-style status, derived from `state`
     status: UploadStatus
+    state: Optional[UploadState] = None
+
+
+class SignedUrlsResponse(BaseModel):
+    # Download URL by file ID
+    urls: Dict[str, str] = {}
+    not_found: List[str] = []
+    forbidden: List[str] = []
+
+
+class UploadStatusBatchResponse(BaseModel):
+    # Upload status by file ID
+    statuses: Dict[str, UploadStatusResponse] = {}
+    not_found: List[str] = []
+    forbidden: List[str] = []
+
+
+class DeleteFilesResponse(BaseModel):
+    deleted: List[str] = []
+    not_found: List[str] = []
+
+
+class DeleteJobResponse(BaseModel):
+    # Celery task ID; poll `GET /api/v1/file/batch/{task_id}` for progress
+    task_id: str
+
+
+class DeleteProgressResponse(BaseModel):
+    # Celery state: PENDING, PROGRESS, SUCCESS or FAILURE
+    status: str
+    deleted: int = 0
+    total: int = 0
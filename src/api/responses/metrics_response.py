@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class DBPoolMetricsResponse(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    utilization: float  # checked out / (pool size + max overflow)
+    checkouts: int
+    timeouts: int
+    # Over the most recent checkouts
+    checkout_ms_p50: float
+    checkout_ms_p99: float
+    checkout_ms_max: float
@@ -11,6 +11,11 @@ class SuccessResponse(BaseModel, Generic[T]):
     success: bool = True
 
 
+class PaginatedResponse(SuccessResponse[T], Generic[T]):
+    # Opaque cursor of the next page, None on the last page
+    next_cursor: Optional[str] = None
+
+
 class ErrorResponse(BaseModel):
     errors: Optional[Sequence[str]] = []
     message: Optional[str] = ''
@@ -19,7 +24,7 @@ class ErrorResponse(BaseModel):
 
 class Response:
     def success(self, content: SuccessResponse, status: int = 200) -> JSONResponse:
-        return JSONResponse(content=content.model_dump(), status_code=status)
+        return JSONResponse(content=content.model_dump(mode="json"), status_code=status)
 
     def error(self, content: ErrorResponse, status: int = 400) -> JSONResponse:
         return JSONResponse(content=content.model_dump(), status_code=status)
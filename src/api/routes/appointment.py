@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from infrastructure.db.mysql import mysql
 from repositories.appointment_repository import AppointmentRepo
 from services.appointment_service import AppointmentService
 from dto.appointment_dto import Appointment, AppointmentCreate
 from api.responses.response import SuccessResponse, ErrorResponse
+from api.responses.file_response import DeleteJobResponse
 from typing import List
 
 router = APIRouter(
@@ -26,9 +28,24 @@ def list_appointments(user_id: str, service: AppointmentService = Depends(get_ap
     appointments = service.list_appointments(user_id)
     return SuccessResponse(data=appointments)
 
-@router.delete("/{appointment_id}", response_model=SuccessResponse)
-def delete_appointment(appointment_id: str, service: AppointmentService = Depends(get_appointment_service)):
+def _not_found() -> JSONResponse:
+    return JSONResponse(content=ErrorResponse(message="Appointment not found").model_dump(),
+                        status_code=status.HTTP_404_NOT_FOUND)
+
+@router.delete("/{appointment_id}", response_model=SuccessResponse, responses={
+    202: {"description": "Deletion queued with `background=true`; `data.task_id` reports its progress"},
+    404: {"model": ErrorResponse},
+})
+def delete_appointment(appointment_id: str, response: Response, background: bool = False,
+                       service: AppointmentService = Depends(get_appointment_service)):
+    if background:
+        # Large appointments: a Celery task deletes the files in batches, see GET /api/v1/file/batch/{task_id}
+        task_id = service.delete_appointment_in_background(appointment_id)
+        if not task_id:
+            return _not_found()
+        response.status_code = status.HTTP_202_ACCEPTED
+        return SuccessResponse(data=DeleteJobResponse(task_id=task_id))
     deleted_appointment = service.delete_appointment(appointment_id)
     if not deleted_appointment:
-        return ErrorResponse(message="Appointment not found", status=status.HTTP_404_NOT_FOUND)
+        return _not_found()
     return SuccessResponse(data={"message": "Appointment and associated files deleted successfully"}) 
\ No newline at end of file
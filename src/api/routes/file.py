@@ -1,17 +1,20 @@
-from fastapi import APIRouter, UploadFile, Form, Request, Depends
+from fastapi import APIRouter, UploadFile, Form, Request, Depends, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from infrastructure.db.mysql import mysql as db
 from repositories.file_repository import FileRepo
 from services.file_service import FileService
 from handlers.file_handler import FileHandler
-from api.responses.file_response import FileResponse, UploadInitResponse, UploadChunkResponse, UploadStatusResponse
+from api.responses.file_response import FileResponse, UploadInitResponse, UploadChunkResponse, UploadStatusResponse, SignedUrlsResponse, UploadStatusBatchResponse, UploadChunksResponse, DeleteFilesResponse, DeleteProgressResponse
 from typing import Optional
-from api.responses.response import SuccessResponse, ErrorResponse
+from api.responses.response import SuccessResponse, ErrorResponse, PaginatedResponse
 from core.config import config
 from constants.file_extensions import FileExtension
+from constants.upload_mode import UploadMode
 from infrastructure.db.mysql import mysql
-from dto.file_dto import FileResponseDTO
+from dto.file_dto import FileResponseDTO, FileListQueryDTO, SignFilesDTO, UploadStatusBatchDTO, DeleteFilesDTO
+from constants.file_listing import FileSortField, SortOrder
+from datetime import datetime
 from api.responses.quarantine_response import VirusScanHealthResponse
 
 
@@ -28,9 +31,28 @@ def get_file_handler(db: Session = Depends(mysql.get_db)) -> FileHandler:
     return handler
 
 
-@router.post("/upload/init/", response_model=SuccessResponse[UploadInitResponse])
-async def endpoint(file_handler: FileHandler = Depends(get_file_handler)):
-    return await file_handler.upload_initialize()
+@router.post("/upload/init/", response_model=SuccessResponse[UploadInitResponse], responses={
+    422: {"model": ErrorResponse},
+})
+async def endpoint(mode: Optional[UploadMode] = Form(None), total_chunks: Optional[int] = Form(None),
+                   content_type: Optional[str] = Form(None), total_size: Optional[int] = Form(None, ge=0),
+                   file_handler: FileHandler = Depends(get_file_handler)):
+    return await file_handler.upload_initialize(mode=mode, total_chunks=total_chunks, content_type=content_type,
+                                                total_size=total_size)
+
+
+@router.post("/upload/", response_model=SuccessResponse[FileResponse], responses={
+    422: {"model": ErrorResponse},
+})
+async def upload_single(file: UploadFile = Form(...), credential: Optional[str] = Form(None),
+                        file_extension: FileExtension = Form(...), content_type: str = Form(...),
+                        appointment_id: str = Form(...), user_id: str = Form(...),
+                        filename: str = Form(...), checksum: Optional[str] = Form(None),
+                        detail: Optional[str] = Form(None), file_handler: FileHandler = Depends(get_file_handler)):
+    """Upload a file of up to APP_MAX_CHUNK_SIZE bytes in a single request"""
+    return await file_handler.upload_single(file=file, file_extension=file_extension, content_type=content_type,
+                                            credential=credential, detail=detail, appointment_id=appointment_id,
+                                            user_id=user_id, filename=filename, checksum=checksum)
 
 
 @router.post("/upload/chunk/", response_model=SuccessResponse[UploadChunkResponse], responses={
@@ -38,8 +60,18 @@ async def endpoint(file_handler: FileHandler = Depends(get_file_handler)):
 })
 async def endpoint(chunk_size: int = Form(..., le=config.APP_MAX_CHUNK_SIZE),
                    upload_id: str = Form(...), chunk_index: int = Form(...), file: UploadFile = Form(...),
+                   checksum: Optional[str] = Form(None),
                    file_handler: FileHandler = Depends(get_file_handler)):
-    return await file_handler.upload_chunk(chunk_size=chunk_size, upload_id=upload_id, chunk_index=chunk_index, file=file)
+    return await file_handler.upload_chunk(chunk_size=chunk_size, upload_id=upload_id, chunk_index=chunk_index, file=file,
+                                           checksum=checksum)
+
+
+@router.get("/upload/{upload_id}/chunks", response_model=SuccessResponse[UploadChunksResponse], responses={
+    404: {"model": ErrorResponse},
+})
+async def upload_chunks(upload_id: str, file_handler: FileHandler = Depends(get_file_handler)):
+    """Chunks received so far, so an interrupted upload resends only the missing ones"""
+    return await file_handler.get_upload_chunks(upload_id)
 
 
 @router.post("/upload/complete/", response_model=SuccessResponse[FileResponse], responses={
@@ -67,14 +99,52 @@ async def endpoint(file_id: str, request: Request, file_handler: FileHandler = D
     return await file_handler.get_file(file_id=file_id, credential=credential)
 
 
-@router.get("/appointment/{appointment_id}", response_model=SuccessResponse[list[FileResponseDTO]])
-async def get_files_by_appointment(appointment_id: str, file_handler: FileHandler = Depends(get_file_handler)):
-    return await file_handler.get_files_by_appointment(appointment_id)
+def get_file_list_query(limit: int = Query(config.APP_FILE_LIST_LIMIT, ge=1, le=config.APP_FILE_LIST_MAX_LIMIT),
+                        cursor: Optional[str] = None,
+                        sort: FileSortField = FileSortField.created_at, order: SortOrder = SortOrder.desc,
+                        content_type: Optional[str] = None, virus_scan_status: Optional[str] = None,
+                        created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> FileListQueryDTO:
+    return FileListQueryDTO(limit=limit, cursor=cursor, sort=sort, order=order, content_type=content_type,
+                            virus_scan_status=virus_scan_status, created_from=created_from, created_to=created_to)
 
 
-@router.get("/all", response_model=SuccessResponse[list[FileResponseDTO]])
-async def list_all_files(user_id: str, file_handler: FileHandler = Depends(get_file_handler)):
-    return await file_handler.list_all_files(user_id)
+@router.get("/appointment/{appointment_id}", response_model=PaginatedResponse[list[FileResponseDTO]], responses={
+    422: {"model": ErrorResponse},
+})
+async def get_files_by_appointment(appointment_id: str, query: FileListQueryDTO = Depends(get_file_list_query),
+                                   include_urls: bool = True, file_handler: FileHandler = Depends(get_file_handler)):
+    return await file_handler.get_files_by_appointment(appointment_id, query, include_urls=include_urls)
+
+
+@router.get("/all", response_model=PaginatedResponse[list[FileResponseDTO]], responses={
+    422: {"model": ErrorResponse},
+})
+async def list_all_files(user_id: str, query: FileListQueryDTO = Depends(get_file_list_query),
+                         include_urls: bool = True, file_handler: FileHandler = Depends(get_file_handler)):
+    return await file_handler.list_all_files(user_id, query, include_urls=include_urls)
+
+
+@router.post("/sign", response_model=SuccessResponse[SignedUrlsResponse], responses={
+    422: {"model": ErrorResponse},
+})
+async def sign_files(payload: SignFilesDTO, file_handler: FileHandler = Depends(get_file_handler)):
+    """Sign the download URLs of a batch of files, e.g. for listings fetched with `include_urls=false`"""
+    return await file_handler.sign_files(payload)
+
+
+@router.delete("/batch", response_model=SuccessResponse[DeleteFilesResponse], responses={
+    202: {"description": "Deletion queued with `background=true`; `data.task_id` reports its progress"},
+    422: {"model": ErrorResponse},
+})
+async def delete_files(payload: DeleteFilesDTO, file_handler: FileHandler = Depends(get_file_handler)):
+    """Delete a batch of files; objects are removed from MinIO with multi-object deletes"""
+    return await file_handler.delete_files(payload)
+
+
+@router.get("/batch/{task_id}", response_model=SuccessResponse[DeleteProgressResponse])
+async def delete_progress(task_id: str, file_handler: FileHandler = Depends(get_file_handler)):
+    """Progress of a background delete, including appointment and user deletes"""
+    return await file_handler.get_delete_progress(task_id)
 
 
 @router.delete("/{file_id}", response_model=SuccessResponse)
@@ -82,6 +152,14 @@ async def delete_file(file_id: str, file_handler: FileHandler = Depends(get_file
     return await file_handler.delete_file(file_id)
 
 
+@router.post('/status/batch', response_model=SuccessResponse[UploadStatusBatchResponse], responses={
+    422: {"model": ErrorResponse},
+})
+async def upload_statuses(payload: UploadStatusBatchDTO, file_handler: FileHandler = Depends(get_file_handler)):
+    """Upload status of a batch of files, each with the credential it was uploaded with"""
+    return await file_handler.get_upload_statuses(payload)
+
+
 @router.get('/status/{file_id}', response_model=SuccessResponse[UploadStatusResponse], responses={
     404: {"model": ErrorResponse},
     422: {"model": ErrorResponse},
@@ -92,6 +170,16 @@ async def endpoint(file_id: str, request: Request, file_handler: FileHandler = D
     return await file_handler.get_upload_status(file_id=file_id, credential=credential)
 
 
+@router.get('/status/{file_id}/events', responses={
+    200: {"content": {"text/event-stream": {}}, "description": "`state` events until the upload is stored or failed"},
+    404: {"model": ErrorResponse},
+    403: {"model": ErrorResponse}
+})
+async def upload_state_events(file_id: str, request: Request, file_handler: FileHandler = Depends(get_file_handler)):
+    credential = dict(request.query_params)
+    return await file_handler.upload_state_events(file_id=file_id, credential=credential)
+
+
 @router.post('/upload/retry', response_model=SuccessResponse[FileResponse], responses={
     404: {"model": ErrorResponse},
     422: {"model": ErrorResponse},
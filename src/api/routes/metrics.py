@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from infrastructure.db.mysql import mysql
+from api.responses.response import SuccessResponse
+from api.responses.metrics_response import DBPoolMetricsResponse
+
+router = APIRouter(
+    prefix="/api/v1/metrics",
+    tags=["metrics"]
+)
+
+@router.get("/db-pool", response_model=SuccessResponse[DBPoolMetricsResponse])
+def db_pool_metrics():
+    return SuccessResponse(data=DBPoolMetricsResponse(**mysql.pool_metrics()))
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from infrastructure.db.mysql import mysql
 from repositories.user_repository import UserRepo
 from services.user_service import UserService
 from dto.user_dto import User, UserCreate
 from api.responses.response import SuccessResponse, ErrorResponse
+from api.responses.file_response import DeleteJobResponse
 from typing import List
 
 router = APIRouter(
@@ -26,9 +28,24 @@ def list_users(service: UserService = Depends(get_user_service)):
     users = service.list_users()
     return SuccessResponse(data=users)
 
-@router.delete("/{user_id}", response_model=SuccessResponse)
-def delete_user(user_id: str, service: UserService = Depends(get_user_service)):
+def _not_found() -> JSONResponse:
+    return JSONResponse(content=ErrorResponse(message="User not found").model_dump(),
+                        status_code=status.HTTP_404_NOT_FOUND)
+
+@router.delete("/{user_id}", response_model=SuccessResponse, responses={
+    202: {"description": "Deletion queued with `background=true`; `data.task_id` reports its progress"},
+    404: {"model": ErrorResponse},
+})
+def delete_user(user_id: str, response: Response, background: bool = False,
+                service: UserService = Depends(get_user_service)):
+    if background:
+        # Large accounts: a Celery task deletes the files in batches, see GET /api/v1/file/batch/{task_id}
+        task_id = service.delete_user_in_background(user_id)
+        if not task_id:
+            return _not_found()
+        response.status_code = status.HTTP_202_ACCEPTED
+        return SuccessResponse(data=DeleteJobResponse(task_id=task_id))
     deleted_user = service.delete_user(user_id)
     if not deleted_user:
-        return ErrorResponse(message="User not found", status=status.HTTP_404_NOT_FOUND)
+        return _not_found()
     return SuccessResponse(data={"message": "User and all associated data deleted successfully"})
\ No newline at end of file
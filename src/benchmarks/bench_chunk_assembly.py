@@ -0,0 +1,81 @@
+"""
+Micro-benchmark for chunk assembly.
+
+Compares the previous `assembled_file.write(chunk_file.read())` loop against
+`infrastructure.chunk_assembler.assemble_chunks` (kernel-side copy with a
+buffered fallback). Run from the `src` directory:
+
+    python -m benchmarks.bench_chunk_assembly --size-mb 1024 --chunk-mb 5
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("APP_MAX_CHUNK_SIZE", str(10 * 1024 * 1024))
+
+from infrastructure.chunk_assembler import assemble_chunks, assembled_file_path, chunk_path
+
+
+def write_chunks(upload_dir: str, size: int, chunk_size: int) -> int:
+    block = os.urandom(chunk_size)
+    total_chunks = 0
+    remaining = size
+    while remaining > 0:
+        with open(chunk_path(upload_dir, total_chunks), "wb") as chunk_file:
+            chunk_file.write(block[:min(chunk_size, remaining)])
+        remaining -= chunk_size
+        total_chunks += 1
+    return total_chunks
+
+
+def legacy_assemble(upload_dir: str, total_chunks: int) -> str:
+    path = assembled_file_path(upload_dir)
+    with open(path, "wb") as assembled_file:
+        for i in range(total_chunks):
+            with open(chunk_path(upload_dir, i), "rb") as chunk_file:
+                assembled_file.write(chunk_file.read())
+    return path
+
+
+def measure(name: str, assemble, upload_dir: str, total_chunks: int, size: int, rounds: int) -> None:
+    timings = []
+    peak = 0
+    for _ in range(rounds):
+        tracemalloc.start()
+        start = time.perf_counter()
+        path = assemble(upload_dir, total_chunks)
+        with open(path, "rb+") as assembled_file:
+            os.fsync(assembled_file.fileno())
+        timings.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        os.remove(path)
+    best = min(timings)
+    print(f"{name:<10} best {best:.3f}s  {size / best / 1024 / 1024:8.1f} MB/s  "
+          f"peak python alloc {peak / 1024 / 1024:.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024, help="Total file size in MB")
+    parser.add_argument("--chunk-mb", type=int, default=5, help="Chunk size in MB")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per implementation")
+    parser.add_argument("--dir", default=None, help="Directory for the temporary chunks")
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    upload_dir = tempfile.mkdtemp(dir=args.dir)
+    try:
+        total_chunks = write_chunks(upload_dir, size, args.chunk_mb * 1024 * 1024)
+        print(f"{args.size_mb} MB in {total_chunks} chunks of {args.chunk_mb} MB ({upload_dir})")
+        measure("legacy", legacy_assemble, upload_dir, total_chunks, size, args.rounds)
+        measure("assembler", assemble_chunks, upload_dir, total_chunks, size, args.rounds)
+    finally:
+        shutil.rmtree(upload_dir)
+
+
+if __name__ == "__main__":
+    main()
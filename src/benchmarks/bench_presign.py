@@ -0,0 +1,67 @@
+"""
+Micro-benchmark for presigned URL generation.
+
+Compares the previous behaviour (a new external `Minio` client per URL)
+against `MinioStorage.get_presigned_url` with its cached, region-pinned
+client. Signing is offline: the legacy clients get the region too, so the
+numbers leave out the bucket-location round trip each unpinned client also
+made on first use. Run from the `src` directory:
+
+    python -m benchmarks.bench_presign --urls 5000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("APP_MAX_CHUNK_SIZE", str(10 * 1024 * 1024))
+os.environ.setdefault("MINIO_ENDPOINT", "minio:9000")
+os.environ.setdefault("MINIO_EXTERNAL_ENDPOINT", "files.example.com")
+os.environ.setdefault("MINIO_ACCESS_KEY", "minioadmin")
+os.environ.setdefault("MINIO_SECRET_KEY", "minioadmin")
+
+from minio import Minio
+from core.config import config
+from infrastructure.minio import minioStorage
+
+HEADERS = {"response-content-disposition": 'inline; filename="scan.pdf"'}
+
+
+def legacy_presign(object_name: str) -> str:
+    external_client = Minio(
+        config.MINIO_EXTERNAL_ENDPOINT,
+        access_key=config.MINIO_ACCESS_KEY,
+        secret_key=config.MINIO_SECRET_KEY,
+        secure=True,
+        region=config.MINIO_REGION,
+    )
+    return external_client.get_presigned_url("GET", "public", object_name, response_headers=HEADERS)
+
+
+def cached_presign(object_name: str) -> str:
+    return minioStorage.get_presigned_url("GET", "public", object_name, response_headers=HEADERS)
+
+
+def measure(name: str, presign, urls: int, rounds: int) -> None:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for i in range(urls):
+            presign(f"cas/{i:064x}")
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{name:<8} best {best:.3f}s  {best / urls * 1e6:8.1f} us/url  {urls / best:10.0f} urls/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=5000, help="URLs signed per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per implementation")
+    args = parser.parse_args()
+
+    print(f"{args.urls} URLs for {config.MINIO_EXTERNAL_ENDPOINT} (region {config.MINIO_REGION})")
+    measure("legacy", legacy_presign, args.urls, args.rounds)
+    measure("cached", cached_presign, args.urls, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class ChecksumAlgorithm(str, Enum):
+    sha256 = "sha256"
+    crc32c = "crc32c"
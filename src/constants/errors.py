@@ -10,3 +10,16 @@ class ValidatonErrors:
     INVALID_JSON_DETAIL: str = "Invalid JSON format for detail"
     INVALID_JSON_CREDENTIAL: str = "Invalid JSON format for credential"
     LE_CHUNCK_SIZE: str = "File sile is larger than valid chunk size"
+    DIRECT_TOTAL_CHUNKS: str = "total_chunks between 1 and 10000 is required for direct uploads"
+    INVALID_CURSOR: str = "Invalid cursor for this listing"
+    SIGN_BATCH_SIZE: str = "file_ids must hold between 1 and APP_FILE_LIST_MAX_LIMIT IDs"
+    STATUS_BATCH_SIZE: str = "files must hold between 1 and APP_FILE_LIST_MAX_LIMIT entries"
+    INVALID_CHECKSUM: str = "checksum must be sha256:<hex> or crc32c:<hex>"
+    CHECKSUM_MISMATCH: str = "Chunk content does not match its checksum"
+    DELETE_BATCH_SIZE: str = "file_ids must hold between 1 and APP_FILE_DELETE_BATCH_SIZE IDs, or more with background=true"
+    CHUNK_INDEX_OUT_OF_RANGE: str = "chunk_index must be between 0 and total_chunks - 1"
+    CHUNK_CONFLICT: str = "A different chunk is already stored at this chunk_index"
+    TOTAL_CHUNKS_MISMATCH: str = "total_chunks does not match the total_chunks declared at upload/init"
+    MISSING_CHUNKS: str = "Chunks are missing; upload them before completing"
+    TOTAL_SIZE_OR_CHUNKS: str = "Declare either total_size or total_chunks, not both"
+    TOTAL_SIZE_TOO_LARGE: str = "total_size exceeds the 5 TiB maximum object size"
@@ -0,0 +1,9 @@
+from enum import Enum
+
+class FileSortField(str, Enum):
+    created_at = "created_at"
+    filename = "filename"
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
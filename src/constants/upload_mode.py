@@ -0,0 +1,7 @@
+from enum import Enum
+
+class UploadMode(str, Enum):
+    # Chunks are posted to /upload/chunk/ and stored by the Celery worker
+    chunked = "chunked"
+    # Chunks are uploaded by the client straight to MinIO with presigned part URLs
+    direct = "direct"
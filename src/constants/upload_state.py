@@ -0,0 +1,26 @@
+from enum import Enum
+from constants.upload_stauts import UploadStatus
+
+class UploadState(str, Enum):
+    # File row created, storage task waiting for a worker
+    queued = "queued"
+    # Worker scanning a direct upload, still held in its staging object
+    scanning = "scanning"
+    # Worker concatenating the chunks into one file
+    assembling = "assembling"
+    # Worker writing the content to MinIO
+    uploading = "uploading"
+    stored = "stored"
+    failed = "failed"
+
+TERMINAL_UPLOAD_STATES = {UploadState.stored, UploadState.failed}
+
+# Celery-style status reported by /status for clients of the original API
+UPLOAD_STATE_STATUS = {
+    UploadState.queued: UploadStatus.PENDING,
+    UploadState.scanning: UploadStatus.STARTED,
+    UploadState.assembling: UploadStatus.STARTED,
+    UploadState.uploading: UploadStatus.STARTED,
+    UploadState.stored: UploadStatus.SUCCESS,
+    UploadState.failed: UploadStatus.FAILURE,
+}
@@ -8,6 +8,17 @@ load_dotenv()
 class Config:
     APP_UPLOAD_DIR = os.getenv("APP_UPLOAD_DIR")
     APP_MAX_CHUNK_SIZE = int(os.getenv("APP_MAX_CHUNK_SIZE"))
+    # Smallest chunk size handed out by `upload/init` for a declared file size, and the
+    # number of chunk requests clients are told to keep in flight
+    APP_MIN_CHUNK_SIZE = int(os.getenv("APP_MIN_CHUNK_SIZE", str(1024 * 1024)))  # 1MB default
+    APP_UPLOAD_PARALLELISM = int(os.getenv("APP_UPLOAD_PARALLELISM", "4"))
+    # Block size used when streaming chunk bodies to and from disk
+    APP_STREAM_BLOCK_SIZE = int(os.getenv("APP_STREAM_BLOCK_SIZE", str(1024 * 1024)))  # 1MB default
+    # Page size of the file listings when no `limit` is given, and its upper bound
+    APP_FILE_LIST_LIMIT = int(os.getenv("APP_FILE_LIST_LIMIT", "50"))
+    APP_FILE_LIST_MAX_LIMIT = int(os.getenv("APP_FILE_LIST_MAX_LIMIT", "200"))
+    # Most files deleted by one `DELETE /file/batch` request, and per batch of a background delete
+    APP_FILE_DELETE_BATCH_SIZE = int(os.getenv("APP_FILE_DELETE_BATCH_SIZE", "1000"))
     ENV = os.getenv("ENV")
     print("ENV:", ENV)
 
@@ -16,10 +27,27 @@ class Config:
     # Optional: external endpoint used when generating presigned URLs for browser access.
     # Always signed with HTTPS for production use.
     MINIO_EXTERNAL_ENDPOINT = os.getenv("MINIO_EXTERNAL_ENDPOINT")
+    # Region of the buckets; pinned on the clients so presigning never looks it up over the network
+    MINIO_REGION = os.getenv("MINIO_REGION", "us-east-1")
     MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY")
     MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY")
     MINIO_PUBLIC_BUCKET = os.getenv('MINIO_PUBLIC_BUCKET', 'public')
     MINIO_PRIVATE_BUCKET = os.getenv('MINIO_PRIVATE_BUCKET', 'private')
+    # Stream the ordered chunks straight to the scanner and MinIO instead of
+    # assembling them into a full-size local file first
+    MINIO_STREAM_CHUNKS = os.getenv("MINIO_STREAM_CHUNKS", "false").lower() == "true"
+    # Multipart upload tuning for the Celery worker
+    MINIO_PART_SIZE = int(os.getenv("MINIO_PART_SIZE", str(10 * 1024 * 1024)))  # 10MB default
+    MINIO_UPLOAD_PARALLELISM = int(os.getenv("MINIO_UPLOAD_PARALLELISM", "4"))
+    # Store objects by content hash (cas/{sha256}) and share them between identical uploads
+    STORAGE_CONTENT_ADDRESSED = os.getenv("STORAGE_CONTENT_ADDRESSED", "false").lower() == "true"
+    # Lifetime of the presigned part URLs handed out for direct uploads
+    MINIO_PART_URL_EXPIRY = int(os.getenv("MINIO_PART_URL_EXPIRY", str(60 * 60)))  # 1 hour default
+    # Lifetime of presigned download URLs, and the validity a cached URL must have left to be reused
+    DOWNLOAD_URL_EXPIRY = int(os.getenv("DOWNLOAD_URL_EXPIRY", str(7 * 24 * 60 * 60)))  # 7 days default
+    DOWNLOAD_URL_MIN_VALIDITY = int(os.getenv("DOWNLOAD_URL_MIN_VALIDITY", str(24 * 60 * 60)))  # 1 day default
+    DOWNLOAD_URL_CACHE_ENABLED = os.getenv("DOWNLOAD_URL_CACHE_ENABLED", "true").lower() == "true"
+    DOWNLOAD_URL_CACHE_SIZE = int(os.getenv("DOWNLOAD_URL_CACHE_SIZE", "10000"))  # In-process LRU entries
 
     MYSQL_USER = os.getenv('MYSQL_USER', 'root')
     MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', 'password')
@@ -27,12 +55,45 @@ class Config:
     MYSQL_PORT = os.getenv('MYSQL_PORT', '3306')
     MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "filemanager")
     MYSQL_TEST_DATABASE = os.getenv("MYSQL_TEST_DATABASE", "filemanager_test")
+    # Connection pool of the MySQL engine
+    MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+    MYSQL_MAX_OVERFLOW = int(os.getenv("MYSQL_MAX_OVERFLOW", "10"))
+    MYSQL_POOL_TIMEOUT = int(os.getenv("MYSQL_POOL_TIMEOUT", "30"))
+    # Recycle connections before MySQL's wait_timeout closes them server-side
+    MYSQL_POOL_RECYCLE = int(os.getenv("MYSQL_POOL_RECYCLE", "1800"))
+    MYSQL_POOL_PRE_PING = os.getenv("MYSQL_POOL_PRE_PING", "true").lower() == "true"
+    # Worker threads running blocking DB calls for async endpoints
+    DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", str(MYSQL_POOL_SIZE + MYSQL_MAX_OVERFLOW)))
 
     CLAMAV_REST_URL = os.getenv("CLAMAV_REST_URL", "http://clamav-rest:3000")
+    # Connection pool of the shared ClamAV REST session
+    CLAMAV_POOL_SIZE = int(os.getenv("CLAMAV_POOL_SIZE", "100"))
+    CLAMAV_POOL_SIZE_PER_HOST = int(os.getenv("CLAMAV_POOL_SIZE_PER_HOST", "20"))
+    CLAMAV_KEEPALIVE_TIMEOUT = int(os.getenv("CLAMAV_KEEPALIVE_TIMEOUT", "30"))
+    CLAMAV_DNS_CACHE_TTL = int(os.getenv("CLAMAV_DNS_CACHE_TTL", "300"))
+    # "rest" posts files to the clamav-rest service, "clamd" streams chunks to clamd as they arrive
+    CLAMAV_BACKEND = os.getenv("CLAMAV_BACKEND", "rest").lower()
+    CLAMD_HOST = os.getenv("CLAMD_HOST", "clamav")
+    CLAMD_PORT = int(os.getenv("CLAMD_PORT", "3310"))
+    CLAMD_SOCKET = os.getenv("CLAMD_SOCKET")  # Unix socket path, preferred over host/port when set
+    CLAMD_TIMEOUT = int(os.getenv("CLAMD_TIMEOUT", "300"))
+    # Incremental scans idle for longer than this are dropped (clamd's own IdleTimeout defaults to 30s)
+    CLAMD_IDLE_TIMEOUT = int(os.getenv("CLAMD_IDLE_TIMEOUT", "30"))
+    CLAMD_MAX_SESSIONS = int(os.getenv("CLAMD_MAX_SESSIONS", "100"))
     VIRUS_SCAN_ENABLED = os.getenv("VIRUS_SCAN_ENABLED", "true").lower() == "true"
     QUARANTINE_INFECTED_FILES = os.getenv("QUARANTINE_INFECTED_FILES", "true").lower() == "true"
     DELETE_INFECTED_FILES = os.getenv("DELETE_INFECTED_FILES", "false").lower() == "true"
     MAX_SCAN_FILE_SIZE = int(os.getenv("MAX_SCAN_FILE_SIZE", str(100 * 1024 * 1024)))  # 100MB default
+    # Reuse scan verdicts of identical content (same SHA-256) under the same signature version
+    SCAN_CACHE_ENABLED = os.getenv("SCAN_CACHE_ENABLED", "true").lower() == "true"
+    SCAN_CACHE_TTL = int(os.getenv("SCAN_CACHE_TTL", str(7 * 24 * 60 * 60)))  # 7 days default
+    SCAN_CACHE_SIZE = int(os.getenv("SCAN_CACHE_SIZE", "10000"))  # In-process LRU entries
+    # How long the ClamAV signature version is cached before being asked again
+    SCAN_SIGNATURE_VERSION_TTL = int(os.getenv("SCAN_SIGNATURE_VERSION_TTL", "300"))
+    # Running hashes of uploads without new chunks for this long are dropped (and recomputed at completion)
+    UPLOAD_HASH_IDLE_TIMEOUT = int(os.getenv("UPLOAD_HASH_IDLE_TIMEOUT", str(6 * 60 * 60)))
+    # How often the upload state event stream re-reads the state of a file
+    UPLOAD_STATE_POLL_INTERVAL = float(os.getenv("UPLOAD_STATE_POLL_INTERVAL", "1"))
 
     @property
     def MYSQL_DATABASE_URL(self):
@@ -1,7 +1,5 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import List
-from .file_dto import FileResponseDTO
 
 class AppointmentBase(BaseModel):
     name: str
@@ -12,6 +10,5 @@ class AppointmentCreate(AppointmentBase):
 class Appointment(AppointmentBase):
     id: str
     date: datetime
-    files: List[FileResponseDTO] = []
     
     model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
@@ -1,14 +1,53 @@
 from pydantic import BaseModel
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from fastapi import UploadFile
 from constants.file_extensions import FileExtension
+from constants.upload_mode import UploadMode
+from constants.file_listing import FileSortField, SortOrder
 from datetime import datetime
 
+class UploadInitDTO(BaseModel):
+    mode: UploadMode = UploadMode.chunked
+    total_chunks: Optional[int] = None
+    content_type: Optional[str] = None
+    # Size of the file in bytes; the chunk size and total_chunks are then computed from it
+    total_size: Optional[int] = None
+
+class UploadSessionDTO(BaseModel):
+    upload_id: str
+    chunk_size: int
+    mode: UploadMode = UploadMode.chunked
+    part_urls: Optional[List[str]] = None
+    # None when neither total_chunks nor total_size was declared
+    total_chunks: Optional[int] = None
+    # Chunk requests the client should keep in flight
+    parallelism: int = 1
+
+class UploadedChunkDTO(BaseModel):
+    index: int
+    size: int
+    # SHA-256 of the chunk; None for the parts of direct uploads
+    sha256: Optional[str] = None
+    # Only when the client sent a CRC32C checksum with the chunk
+    crc32c: Optional[str] = None
+
+class UploadManifestDTO(BaseModel):
+    upload_id: str
+    mode: UploadMode = UploadMode.chunked
+    # None when the client did not declare them at init
+    total_chunks: Optional[int] = None
+    chunk_size: Optional[int] = None
+    received: List[UploadedChunkDTO] = []
+    # Indices still to send; None when total_chunks is unknown
+    missing: Optional[List[int]] = None
+
 class UploadChunkDTO(BaseModel):
     chunk_size: int
     file: UploadFile
     upload_id: str
     chunk_index: int
+    # Optional `sha256:<hex>` or `crc32c:<hex>` of the chunk, verified before it is stored
+    checksum: Optional[str] = None
 
 class UploadFileDTO(BaseModel):
     upload_id: str
@@ -23,6 +62,17 @@ class UploadFileDTO(BaseModel):
     user_id: str
     filename: str
 
+class UploadSingleDTO(BaseModel):
+    file: UploadFile
+    file_extension: FileExtension
+    content_type: str
+    detail: Optional[Dict[str, Any]]
+    credential: Optional[Dict[str, Any]]
+    appointment_id: str
+    user_id: str
+    filename: str
+    checksum: Optional[str] = None
+
 class FileBaseDTO(BaseModel):
     upload_id: str
     path: str
@@ -34,6 +84,7 @@ class FileBaseDTO(BaseModel):
     appointment_id: str
     user_id: str
     filename: str
+    upload_state: str = 'queued'
     
     # Virus scanning fields
     virus_scan_status: str = 'pending'
@@ -41,6 +92,7 @@ class FileBaseDTO(BaseModel):
     virus_scan_date: Optional[datetime] = None
     is_quarantined: bool = False
     quarantine_reason: Optional[str] = None
+    content_sha256: Optional[str] = None
 
 class FileResponseDTO(BaseModel):
     id: str
@@ -49,6 +101,8 @@ class FileResponseDTO(BaseModel):
     size: int
     download_url: Optional[str] = None
     appointment_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+    upload_state: Optional[str] = None
     
     # Virus scanning fields
     virus_scan_status: str = 'pending'
@@ -58,6 +112,34 @@ class FileResponseDTO(BaseModel):
     class Config:
         from_attributes = True
 
+class FileListQueryDTO(BaseModel):
+    limit: int
+    cursor: Optional[str] = None
+    sort: FileSortField = FileSortField.created_at
+    order: SortOrder = SortOrder.desc
+    # Exact content type, or a `type/*` wildcard
+    content_type: Optional[str] = None
+    virus_scan_status: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+class SignFilesDTO(BaseModel):
+    file_ids: List[str]
+    # Credential of private files, as passed to /get/{file_id}
+    credential: Optional[Dict[str, str]] = None
+
+class FileCredentialDTO(BaseModel):
+    id: str
+    credential: Optional[Dict[str, str]] = None
+
+class UploadStatusBatchDTO(BaseModel):
+    files: List[FileCredentialDTO]
+
+class DeleteFilesDTO(BaseModel):
+    file_ids: List[str]
+    # Queue a Celery task instead, e.g. for more than APP_FILE_DELETE_BATCH_SIZE files
+    background: bool = False
+
 class RetryUploadFileDTO(BaseModel):
     id: str
     credential: Optional[Dict[str, Any]]
@@ -2,5 +2,7 @@ from .celery_task import CeleryTask
 from .file import File
 from .appointment import Appointment
 from .user import User
+from .scan_result import ScanResult
+from .stored_object import StoredObject
 
-__all__ = ['CeleryTask', 'File', 'Appointment', 'User']
+__all__ = ['CeleryTask', 'File', 'Appointment', 'User', 'ScanResult', 'StoredObject']
@@ -14,5 +14,6 @@ class Appointment(db.Base):
     user_id = Column(VARCHAR(36), ForeignKey("users.id"), nullable=False)
 
     # Relationships
-    files = relationship("File", back_populates="appointment", lazy="joined", cascade="all, delete-orphan")
+    # Never loaded with the appointment: queries that need the files ask for them (see AppointmentRepo)
+    files = relationship("File", back_populates="appointment", cascade="all, delete-orphan")
     user = relationship("User", back_populates="appointments") 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from infrastructure.db.mysql import mysql as db
-from sqlalchemy import Column, String, JSON, Integer, VARCHAR, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, String, JSON, Integer, VARCHAR, ForeignKey, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -7,6 +7,14 @@ from datetime import datetime
 
 class File(db.Base):
     __tablename__ = "files"
+    __table_args__ = (
+        # Keyset pagination of the file listings: owner, then (created_at, id) order
+        Index("ix_files_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_files_appointment_id_created_at_id", "appointment_id", "created_at", "id"),
+        # Listings filtered on a scan status: equality on both columns, then keyset order
+        Index("ix_files_user_id_virus_scan_status", "user_id", "virus_scan_status", "created_at", "id"),
+        Index("ix_files_appointment_id_virus_scan_status", "appointment_id", "virus_scan_status", "created_at", "id"),
+    )
     id = Column(VARCHAR(36), nullable=False, primary_key=True, unique=True,
                 index=True, default=lambda: str(uuid.uuid4()))
     upload_id = Column(String(36), nullable=False, unique=True, index=True)
@@ -14,13 +22,16 @@ class File(db.Base):
     appointment_id = Column(VARCHAR(36), ForeignKey("appointments.id"), nullable=False)
     user_id = Column(VARCHAR(36), ForeignKey("users.id"), nullable=False)
     credential = Column(JSON(none_as_null=True))
-    # Path must be globally unique per stored object
-    path = Column(VARCHAR(255), nullable=False, unique=True, index=True)
+    # Files with identical content share the path of a content-addressed object (see StoredObject)
+    path = Column(VARCHAR(255), nullable=False, index=True)
     content_type = Column(String(32), nullable=False)
     size = Column(Integer)
     detail = Column(JSON(none_as_null=True))
     # Reference Celery task by its unique task_id
-    celery_task_id = Column(String(255))
+    celery_task_id = Column(String(255), index=True)
+    # Lifecycle of the stored object, see UploadState; set by the storage tasks
+    upload_state = Column(String(20), nullable=False, default='queued')
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     
     # Virus scanning fields
     virus_scan_status = Column(String(20), default='pending')  # 'pending', 'clean', 'infected', 'error', 'disabled'
@@ -28,6 +39,7 @@ class File(db.Base):
     virus_scan_date = Column(DateTime)                         # When scan was performed
     is_quarantined = Column(Boolean, default=False)           # If file is quarantined
     quarantine_reason = Column(String(500))                   # Why file was quarantined
+    content_sha256 = Column(String(64), index=True)           # SHA-256 of the content, computed at ingest
 
     # Relationships
     appointment = relationship("Appointment", back_populates="files")
@@ -0,0 +1,14 @@
+from infrastructure.db.mysql import mysql as db
+from sqlalchemy import Column, String, JSON, Boolean, DateTime, CHAR
+from datetime import datetime
+
+
+class ScanResult(db.Base):
+    """Virus scan verdict of a content hash under a given ClamAV signature version"""
+    __tablename__ = "scan_results"
+    content_sha256 = Column(CHAR(64), primary_key=True)
+    signature_version = Column(String(64), primary_key=True)
+    is_infected = Column(Boolean, nullable=False)
+    virus_name = Column(String(255))
+    result = Column(JSON(none_as_null=True))
+    scanned_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,17 @@
+from infrastructure.db.mysql import mysql as db
+from sqlalchemy import Column, String, Integer, BigInteger, VARCHAR, DateTime
+from datetime import datetime
+
+
+class StoredObject(db.Base):
+    """Content-addressed MinIO object shared by every file with the same content"""
+    __tablename__ = "stored_objects"
+    # `{bucket}/cas/{sha256}`, as referenced by files.path
+    path = Column(VARCHAR(255), primary_key=True)
+    content_sha256 = Column(String(64), nullable=False)
+    size = Column(BigInteger)
+    # Number of files referencing the object; it is removed when this drops to 0
+    ref_count = Column(Integer, nullable=False, default=0)
+    # Task storing the object, shared by the files that reuse it
+    celery_task_id = Column(String(255))
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
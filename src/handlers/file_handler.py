@@ -1,16 +1,21 @@
 from services.file_service import FileService
 from fastapi import UploadFile, status
+from fastapi.exceptions import RequestValidationError
 from constants.messages import Message
-from dto.file_dto import UploadFileDTO, UploadChunkDTO, RetryUploadFileDTO
-from api.responses.file_response import FileResponse, UploadInitResponse, UploadChunkResponse, UploadStatusResponse
+from dto.file_dto import UploadFileDTO, UploadChunkDTO, RetryUploadFileDTO, UploadInitDTO, FileListQueryDTO, SignFilesDTO, UploadStatusBatchDTO, DeleteFilesDTO, UploadSingleDTO
+from api.responses.file_response import FileResponse, UploadInitResponse, UploadChunkResponse, UploadStatusResponse, SignedUrlsResponse, UploadStatusBatchResponse, UploadChunksResponse, DeleteFilesResponse, DeleteJobResponse, DeleteProgressResponse
 from handlers.base_handler import BaseHandler
-from api.responses.response import SuccessResponse, ErrorResponse
-from fastapi.responses import JSONResponse
+from api.responses.response import SuccessResponse, ErrorResponse, PaginatedResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from exceptions.http_exception import BaseException
 from exceptions.virus_exception import VirusDetectedException, VirusScanException
 from constants.file_extensions import FileExtension
+from constants.upload_mode import UploadMode
+from constants.upload_state import UploadState, UPLOAD_STATE_STATUS
+from minio import S3Error
 from constants.errors import Errors
-from typing import Dict, Any
+from typing import Dict, Any, Optional, AsyncIterator, Awaitable
+from entities.file import File
 from core.config import config
 from utils import parse_json_to_dict
 import logging
@@ -26,21 +31,36 @@ class FileHandler(BaseHandler[FileService]):
     def __init__(self, service: FileService) -> None:
         super().__init__(service=service)
 
-    async def upload_initialize(self):
-        upload_id = await self.service.upload_initialize()
+    async def upload_initialize(self, mode: Optional[UploadMode] = None, total_chunks: Optional[int] = None,
+                                content_type: Optional[str] = None, total_size: Optional[int] = None):
+        payload = UploadInitDTO(mode=mode or UploadMode.chunked, total_chunks=total_chunks, content_type=content_type,
+                                total_size=total_size)
+        try:
+            session = await self.service.upload_initialize(payload)
+        except S3Error as exc:
+            logger.error(f"Failed to create direct upload: {str(exc)}")
+            return self.response.error(ErrorResponse(message=Errors.BAD_REQUEST), status=status.HTTP_502_BAD_GATEWAY)
         return self.response.success(content=SuccessResponse[UploadInitResponse](data=UploadInitResponse(
-            chunk_size=config.APP_MAX_CHUNK_SIZE,
-            upload_id=upload_id
+            chunk_size=session.chunk_size,
+            upload_id=session.upload_id,
+            mode=session.mode,
+            part_urls=session.part_urls,
+            total_chunks=session.total_chunks,
+            parallelism=session.parallelism,
         )))
 
-    async def upload_chunk(self, chunk_size: int, upload_id: str, chunk_index: int, file: UploadFile):
+    async def upload_chunk(self, chunk_size: int, upload_id: str, chunk_index: int, file: UploadFile,
+                           checksum: Optional[str] = None):
         payload = UploadChunkDTO(
-            chunk_size=chunk_size, file=file, upload_id=upload_id, chunk_index=chunk_index)
+            chunk_size=chunk_size, file=file, upload_id=upload_id, chunk_index=chunk_index, checksum=checksum)
         try:
             await self.service.upload_chunk(payload)
             return self.response.success(content=SuccessResponse[UploadChunkResponse](
                 data=UploadChunkResponse(chunk_index=chunk_index, upload_id=upload_id), message=Message.UPLOADED_CHUNK
             ))
+        except RequestValidationError:
+            # Let the validation exception handler render the 422 response
+            raise
         except FileNotFoundError as exc:
             logger.error(f"File not found error in upload_chunk: {str(exc)}")
             return self.response.error(ErrorResponse(message=Errors.FILE_NOT_FOUND), status=status.HTTP_422_UNPROCESSABLE_ENTITY)
@@ -48,28 +68,50 @@ class FileHandler(BaseHandler[FileService]):
             logger.error(f"Unexpected error in upload_chunk: {str(exc)}\n{traceback.format_exc()}")
             return self.response.error(ErrorResponse(message="An error occurred during chunk upload"), status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    async def get_upload_chunks(self, upload_id: str) -> JSONResponse:
+        try:
+            manifest = await self.service.get_upload_chunks(upload_id)
+        except FileNotFoundError:
+            return self.response.error(ErrorResponse(message=Errors.FILE_NOT_FOUND), status=status.HTTP_404_NOT_FOUND)
+        return self.response.success(content=SuccessResponse[UploadChunksResponse](
+            data=UploadChunksResponse(**manifest.model_dump())))
+
     async def upload_complete(self, upload_id: str, total_chunks: int, total_size: int, file_extension: FileExtension,
                               content_type: str, credential: str, detail: str, appointment_id: str, user_id: str, filename: str, size: int = 0) -> JSONResponse:
         logger.info("=== UPLOAD_COMPLETE HANDLER CALLED ===")
-        try:
-            logger.info(f"Starting upload_complete for upload_id: {upload_id}")
-            
-            if credential:
-                credential_dict = parse_json_to_dict(credential, 'credential')
-            else:
-                credential_dict = None
+        logger.info(f"Starting upload_complete for upload_id: {upload_id}")
 
-            if detail:
-                detail_dict = parse_json_to_dict(detail, 'detail')
-            else:
-                detail_dict = None
-                
-            payload = UploadFileDTO(upload_id=upload_id, total_chunks=total_chunks, total_size=total_size, file_extension=file_extension,
-                                    content_type=content_type, detail=detail_dict, credential=credential_dict, size=size,
-                                    appointment_id=appointment_id, user_id=user_id, filename=filename)
-            
-            logger.info(f"Calling service.upload_complete with payload: {payload}")
-            file = await self.service.upload_complete(payload=payload)
+        if credential:
+            credential_dict = parse_json_to_dict(credential, 'credential')
+        else:
+            credential_dict = None
+
+        if detail:
+            detail_dict = parse_json_to_dict(detail, 'detail')
+        else:
+            detail_dict = None
+
+        payload = UploadFileDTO(upload_id=upload_id, total_chunks=total_chunks, total_size=total_size, file_extension=file_extension,
+                                content_type=content_type, detail=detail_dict, credential=credential_dict, size=size,
+                                appointment_id=appointment_id, user_id=user_id, filename=filename)
+
+        logger.info(f"Calling service.upload_complete with payload: {payload}")
+        return await self._uploaded_file(self.service.upload_complete(payload=payload))
+
+    async def upload_single(self, file: UploadFile, file_extension: FileExtension, content_type: str, credential: Optional[str],
+                            detail: Optional[str], appointment_id: str, user_id: str, filename: str,
+                            checksum: Optional[str] = None) -> JSONResponse:
+        payload = UploadSingleDTO(
+            file=file, file_extension=file_extension, content_type=content_type,
+            credential=parse_json_to_dict(credential, 'credential') if credential else None,
+            detail=parse_json_to_dict(detail, 'detail') if detail else None,
+            appointment_id=appointment_id, user_id=user_id, filename=filename, checksum=checksum)
+        return await self._uploaded_file(self.service.upload_single(payload=payload))
+
+    async def _uploaded_file(self, upload: Awaitable[File]) -> JSONResponse:
+        """Respond with the file created by a completed upload"""
+        try:
+            file = await upload
             logger.info(f"File created successfully: {file.id}")
             
             download_url = await self.service.get_download_link(file)
@@ -106,6 +148,8 @@ class FileHandler(BaseHandler[FileService]):
                 ),
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        except RequestValidationError:
+            raise
         except FileNotFoundError as exc:
             logger.error(f"File not found error in upload_complete: {str(exc)}")
             return self.response.error(ErrorResponse(message=Errors.FILE_NOT_FOUND), status=status.HTTP_422_UNPROCESSABLE_ENTITY)
@@ -137,11 +181,36 @@ class FileHandler(BaseHandler[FileService]):
 
     async def get_upload_status(self, file_id: str, credential=Dict[str, Any]) -> JSONResponse:
         try:
-            result = await self.service.get_upload_status(file_id=file_id, credential=credential)
-            return self.response.success(SuccessResponse[UploadStatusResponse](data=UploadStatusResponse(status=result)))
+            state = await self.service.get_upload_status(file_id=file_id, credential=credential)
+            return self.response.success(SuccessResponse[UploadStatusResponse](data=UploadStatusResponse(
+                status=UPLOAD_STATE_STATUS[state], state=state)))
         except BaseException as exception:
             return self.response.error(ErrorResponse(message=exception.message), status=exception.status)
 
+    async def get_upload_statuses(self, payload: UploadStatusBatchDTO) -> JSONResponse:
+        states, not_found, forbidden = await self.service.get_upload_statuses(payload)
+        statuses = {file_id: UploadStatusResponse(status=UPLOAD_STATE_STATUS[state], state=state)
+                    for file_id, state in states.items()}
+        return self.response.success(content=SuccessResponse[UploadStatusBatchResponse](data=UploadStatusBatchResponse(
+            statuses=statuses, not_found=not_found, forbidden=forbidden)))
+
+    async def upload_state_events(self, file_id: str, credential=Dict[str, Any]):
+        try:
+            states = await self.service.upload_state_events(file_id=file_id, credential=credential)
+        except BaseException as exception:
+            return self.response.error(ErrorResponse(message=exception.message), status=exception.status)
+        return StreamingResponse(self._format_state_events(states), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    async def _format_state_events(self, states: AsyncIterator[Optional[UploadState]]) -> AsyncIterator[str]:
+        async for state in states:
+            if state is None:
+                # Comment line: keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            data = UploadStatusResponse(status=UPLOAD_STATE_STATUS[state], state=state)
+            yield f"event: state\ndata: {data.model_dump_json()}\n\n"
+
     async def retry_upload(self, file_id: str, credential: str):
         if credential:
             credential_dict = parse_json_to_dict(credential, 'credential')
@@ -168,26 +237,34 @@ class FileHandler(BaseHandler[FileService]):
         except BaseException as exception:
             return self.response.error(ErrorResponse(message=exception.message), status=exception.status)
 
-    async def get_files_by_appointment(self, appointment_id: str) -> JSONResponse:
-        files = await self.service.get_files_by_appointment(appointment_id)
+    async def get_files_by_appointment(self, appointment_id: str, query: FileListQueryDTO,
+                                       include_urls: bool = True) -> JSONResponse:
+        files, next_cursor = await self.service.get_files_by_appointment(appointment_id, query)
         files_response = []
         for file in files:
-            download_url = await self.service.get_download_link(file)
             file_resp = FileResponseDTO.from_orm(file)
-            file_resp.download_url = download_url
+            if include_urls:
+                file_resp.download_url = await self.service.get_download_link(file)
             files_response.append(file_resp)
-        return self.response.success(content=SuccessResponse[list[FileResponseDTO]](data=files_response))
+        return self.response.success(content=PaginatedResponse[list[FileResponseDTO]](
+            data=files_response, next_cursor=next_cursor))
 
-    async def list_all_files(self, user_id: str) -> JSONResponse:
-        file_tuples = await self.service.list_all_files(user_id)
+    async def list_all_files(self, user_id: str, query: FileListQueryDTO, include_urls: bool = True) -> JSONResponse:
+        file_tuples, next_cursor = await self.service.list_all_files(user_id, query)
         files_response = []
         for file, appointment_name in file_tuples:
-            download_url = await self.service.get_download_link(file)
             file_resp = FileResponseDTO.from_orm(file)
-            file_resp.download_url = download_url
+            if include_urls:
+                file_resp.download_url = await self.service.get_download_link(file)
             file_resp.appointment_name = appointment_name
             files_response.append(file_resp)
-        return self.response.success(content=SuccessResponse[list[FileResponseDTO]](data=files_response))
+        return self.response.success(content=PaginatedResponse[list[FileResponseDTO]](
+            data=files_response, next_cursor=next_cursor))
+
+    async def sign_files(self, payload: SignFilesDTO) -> JSONResponse:
+        urls, not_found, forbidden = await self.service.sign_files(payload)
+        return self.response.success(content=SuccessResponse[SignedUrlsResponse](data=SignedUrlsResponse(
+            urls=urls, not_found=not_found, forbidden=forbidden)))
 
     async def delete_file(self, file_id: str) -> JSONResponse:
         deleted_file = await self.service.delete_file(file_id)
@@ -195,6 +272,20 @@ class FileHandler(BaseHandler[FileService]):
             return self.response.error(ErrorResponse(message="File not found"), status=status.HTTP_404_NOT_FOUND)
         return self.response.success(content=SuccessResponse(message="File deleted successfully."))
 
+    async def delete_files(self, payload: DeleteFilesDTO) -> JSONResponse:
+        if payload.background:
+            task_id = await self.service.delete_files_in_background(payload)
+            return self.response.success(content=SuccessResponse[DeleteJobResponse](
+                data=DeleteJobResponse(task_id=task_id)), status=status.HTTP_202_ACCEPTED)
+        deleted, not_found = await self.service.delete_files(payload)
+        return self.response.success(content=SuccessResponse[DeleteFilesResponse](data=DeleteFilesResponse(
+            deleted=deleted, not_found=not_found)))
+
+    async def get_delete_progress(self, task_id: str) -> JSONResponse:
+        progress = await self.service.get_delete_progress(task_id)
+        return self.response.success(content=SuccessResponse[DeleteProgressResponse](
+            data=DeleteProgressResponse(**progress)))
+
     async def virus_scanner_health(self) -> JSONResponse:
         """Check the health status of the virus scanner"""
         try:
@@ -0,0 +1,39 @@
+import hashlib
+from typing import Tuple
+import google_crc32c
+from constants.checksum import ChecksumAlgorithm
+
+_DIGEST_SIZES = {ChecksumAlgorithm.sha256: 32, ChecksumAlgorithm.crc32c: 4}
+
+
+def parse_checksum(value: str) -> Tuple[ChecksumAlgorithm, str]:
+    """
+    Parse a chunk checksum given as `algorithm:hexdigest`, e.g. `sha256:9f86d0...`.
+
+    :raises ValueError: If the algorithm is unknown or the digest is not a hex digest of its size.
+    """
+    algorithm, _, digest = value.partition(":")
+    algorithm = ChecksumAlgorithm(algorithm.strip().lower())
+    digest = digest.strip().lower()
+    if not digest or len(bytes.fromhex(digest)) != _DIGEST_SIZES[algorithm]:
+        raise ValueError(f"Invalid {algorithm.value} digest")
+    return algorithm, digest
+
+
+def new_checksum(algorithm: ChecksumAlgorithm):
+    """Return a hash object with `update(bytes)` and `hexdigest()` for `algorithm`"""
+    if algorithm == ChecksumAlgorithm.crc32c:
+        return _Crc32c()
+    return hashlib.sha256()
+
+
+class _Crc32c:
+    def __init__(self) -> None:
+        self._checksum = google_crc32c.Checksum()
+
+    def update(self, data: bytes) -> None:
+        self._checksum.update(data)
+
+    def hexdigest(self) -> str:
+        return self._checksum.digest().hex()
+
@@ -0,0 +1,183 @@
+import io
+import os
+import errno
+import logging
+from typing import Iterable
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+# Name of the assembled upload inside its upload directory. It is built once by
+# `upload_complete` (for scanning) and reused by `upload_file_task` for storage.
+ASSEMBLED_FILENAME = "assembled"
+
+# Errors meaning "this copy primitive is not supported for these files", after
+# which the next, more portable primitive is tried
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+
+def chunk_path(upload_dir: str, chunk_index: int) -> str:
+    return os.path.join(upload_dir, f"{chunk_index}.part")
+
+
+def chunk_paths(upload_dir: str, total_chunks: int) -> list[str]:
+    """Return the ordered chunk paths of an upload, raising if any chunk is missing"""
+    paths = [chunk_path(upload_dir, i) for i in range(total_chunks)]
+    for i, path in enumerate(paths):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Missing chunk {i} for upload")
+    return paths
+
+
+def assembled_file_path(upload_dir: str) -> str:
+    return os.path.join(upload_dir, ASSEMBLED_FILENAME)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, length: int) -> int:
+    while offset < length:
+        copied = os.copy_file_range(src_fd, dst_fd, length - offset, offset)
+        if copied == 0:
+            break
+        offset += copied
+    return offset
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, length: int) -> int:
+    while offset < length:
+        sent = os.sendfile(dst_fd, src_fd, offset, length - offset)
+        if sent == 0:
+            break
+        offset += sent
+    return offset
+
+
+def _copy_buffered(src_fd: int, dst_fd: int, offset: int, length: int) -> int:
+    while offset < length:
+        block = os.pread(src_fd, min(config.APP_STREAM_BLOCK_SIZE, length - offset), offset)
+        if not block:
+            break
+        view = memoryview(block)
+        while view:
+            view = view[os.write(dst_fd, view):]
+        offset += len(block)
+    return offset
+
+
+# Kernel-side copies first (no data passes through Python), buffered copy last
+_COPY_STRATEGIES = [
+    strategy for strategy, available in (
+        (_copy_file_range, hasattr(os, "copy_file_range")),
+        (_sendfile, hasattr(os, "sendfile")),
+        (_copy_buffered, True),
+    ) if available
+]
+
+
+def append_file(dst_fd: int, src_path: str) -> int:
+    """
+    Append the content of `src_path` at the current position of `dst_fd`.
+
+    :param dst_fd: File descriptor opened for writing.
+    :param src_path: Path of the file to copy.
+    :return: Number of bytes copied.
+    """
+    src_fd = os.open(src_path, os.O_RDONLY)
+    try:
+        length = os.fstat(src_fd).st_size
+        offset = 0
+        for strategy in _COPY_STRATEGIES:
+            start = os.lseek(dst_fd, 0, os.SEEK_CUR)
+            try:
+                return strategy(src_fd, dst_fd, offset, length)
+            except OSError as exc:
+                if exc.errno not in _FALLBACK_ERRNOS or strategy is _copy_buffered:
+                    raise
+                # Resume from whatever the failed primitive managed to copy
+                offset += os.lseek(dst_fd, 0, os.SEEK_CUR) - start
+        return offset
+    finally:
+        os.close(src_fd)
+
+
+def assemble_chunks(upload_dir: str, total_chunks: int) -> str:
+    """
+    Concatenate the ordered `.part` files of an upload into a single file.
+
+    Chunks are copied with `os.copy_file_range`/`os.sendfile` when the platform
+    supports it, falling back to a bounded buffered copy. This call blocks, so
+    async callers should run it in a worker thread.
+
+    The file is written under a temporary name and renamed once complete, so an
+    existing assembled file can always be trusted to hold the whole upload.
+
+    :param upload_dir: Directory holding the chunks of the upload.
+    :param total_chunks: Number of chunks to concatenate.
+    :return: Path of the assembled file.
+    """
+    assembled_path = assembled_file_path(upload_dir)
+    temp_path = f"{assembled_path}.tmp"
+    try:
+        paths = chunk_paths(upload_dir, total_chunks)
+        dst_fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            for path in paths:
+                append_file(dst_fd, path)
+        finally:
+            os.close(dst_fd)
+        os.replace(temp_path, assembled_path)
+        logger.info(f"Assembled {total_chunks} chunks into {assembled_path}")
+        return assembled_path
+    except Exception as e:
+        logger.error(f"Failed to assemble chunks: {str(e)}")
+        # Clean up partial file if it exists
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ChunkStreamReader(io.RawIOBase):
+    """
+    Read-only file object presenting ordered chunk files as a single stream.
+
+    Lets the chunks of an upload be streamed (to MinIO or the virus scanner)
+    without assembling them into an intermediate file first.
+
+    ##  Example
+    ```python
+    with ChunkStreamReader(chunk_paths(upload_dir, total_chunks)) as reader:
+        minioStorage.put_object(bucket, filename, reader, length=reader.size)
+    ```
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        super().__init__()
+        self._paths = list(paths)
+        self.size = sum(os.path.getsize(path) for path in self._paths)
+        self._index = 0
+        self._current = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < len(view):
+            if self._current is None:
+                if self._index >= len(self._paths):
+                    break
+                self._current = open(self._paths[self._index], "rb", buffering=0)
+                self._index += 1
+            read = self._current.readinto(view[filled:])
+            if not read:
+                self._current.close()
+                self._current = None
+                continue
+            filled += read
+        return filled
+
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        super().close()
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional
+from core.config import config
+from infrastructure.chunk_assembler import chunk_path
+
+
+class _UploadDigest:
+    def __init__(self) -> None:
+        self.sha256 = hashlib.sha256()
+        self.next_index = 0
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class ContentHasher:
+    """
+    SHA-256 of chunked uploads, computed while the chunks are ingested.
+
+    A chunk arriving in order is hashed as it streams to disk (`chunk_digest` /
+    `chunk_stored`). Chunks received out of order, or by another worker process,
+    are hashed from disk once the chunks before them are present, so
+    `hexdigest` only has to hash whatever is left.
+
+    ##  Example
+    ```python
+    digest = content_hasher.chunk_digest(upload_id, chunk_index)
+    # ... digest.update(block) for every block written ...
+    content_hasher.chunk_stored(upload_id, chunk_index, digest)
+    sha256 = content_hasher.hexdigest(upload_id, upload_dir, total_chunks)
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._digests: Dict[str, _UploadDigest] = {}
+        self._lock = threading.Lock()
+
+    def chunk_digest(self, upload_id: str, chunk_index: int):
+        """
+        Return a copy of the running hash to update with the chunk's content when
+        `chunk_index` is the next chunk to hash, otherwise None.
+        """
+        with self._lock:
+            self._drop_idle()
+            state = self._digests.get(upload_id)
+            if state is None and chunk_index == 0:
+                state = self._digests[upload_id] = _UploadDigest()
+        if state is None or state.next_index != chunk_index:
+            return None
+        with state.lock:
+            return state.sha256.copy() if state.next_index == chunk_index else None
+
+    def chunk_stored(self, upload_id: str, chunk_index: int, digest=None) -> None:
+        """Record a stored chunk and its streamed hash, if any"""
+        state = self._digests.get(upload_id)
+        if state is None or digest is None:
+            return
+        with state.lock:
+            if state.next_index == chunk_index:
+                state.sha256 = digest
+                state.next_index += 1
+                state.last_used = time.monotonic()
+
+    def advance(self, upload_id: str, upload_dir: str) -> None:
+        """Hash the contiguous chunks already on disk. Blocking: run it in a worker thread."""
+        state = self._digests.get(upload_id)
+        if state is not None:
+            with state.lock:
+                self._hash_chunks(state, upload_dir)
+
+    def hexdigest(self, upload_id: str, upload_dir: str, total_chunks: int) -> str:
+        """
+        Finish and forget the hash of an upload, hashing the chunks not hashed yet.
+        Blocking: run it in a worker thread.
+
+        :raises FileNotFoundError: If a chunk is missing.
+        """
+        with self._lock:
+            state = self._digests.pop(upload_id, None) or _UploadDigest()
+        with state.lock:
+            self._hash_chunks(state, upload_dir, total_chunks)
+            return state.sha256.hexdigest()
+
+    def discard(self, upload_id: str) -> None:
+        with self._lock:
+            self._digests.pop(upload_id, None)
+
+    def _hash_chunks(self, state: _UploadDigest, upload_dir: str, total_chunks: Optional[int] = None) -> None:
+        while total_chunks is None or state.next_index < total_chunks:
+            path = chunk_path(upload_dir, state.next_index)
+            if not os.path.exists(path):
+                if total_chunks is None:
+                    break
+                raise FileNotFoundError(f"Missing chunk {state.next_index} for upload")
+            with open(path, "rb") as chunk_file:
+                while block := chunk_file.read(config.APP_STREAM_BLOCK_SIZE):
+                    state.sha256.update(block)
+            state.next_index += 1
+        state.last_used = time.monotonic()
+
+    def _drop_idle(self) -> None:
+        """Forget hashes of abandoned uploads"""
+        deadline = time.monotonic() - config.UPLOAD_HASH_IDLE_TIMEOUT
+        for upload_id, state in list(self._digests.items()):
+            if state.last_used < deadline:
+                del self._digests[upload_id]
+
+
+# Singleton instance
+content_hasher = ContentHasher()
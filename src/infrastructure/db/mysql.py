@@ -2,7 +2,34 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from core.config import config
-from typing import Self, Generator
+from infrastructure.db.pool import InstrumentedQueuePool
+from typing import Self, Generator, Callable, TypeVar, Any, Dict
+from functools import partial
+from anyio import to_thread, CapacityLimiter
+import asyncio
+
+T = TypeVar("T")
+
+
+class LazySession:
+    """
+    Proxy creating its `Session` on first use, so a request only acquires a
+    session (and a pooled connection) when it actually talks to the database.
+    """
+
+    def __init__(self, factory: Callable[[], Session]) -> None:
+        self._factory = factory
+        self._session: Session = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
 class MySQLDB:
     _instance: Self = None
@@ -14,15 +41,53 @@ class MySQLDB:
         return cls._instance
 
     def __initialize(self) -> None:
-        self.engine = create_engine(str(config.MYSQL_DATABASE_URL))
+        self.engine = create_engine(
+            str(config.MYSQL_DATABASE_URL),
+            poolclass=InstrumentedQueuePool,
+            pool_size=config.MYSQL_POOL_SIZE,
+            max_overflow=config.MYSQL_MAX_OVERFLOW,
+            pool_timeout=config.MYSQL_POOL_TIMEOUT,
+            pool_recycle=config.MYSQL_POOL_RECYCLE,
+            pool_pre_ping=config.MYSQL_POOL_PRE_PING,
+        )
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self.Base = declarative_base()
+        self._limiter: CapacityLimiter = None
+        self._limiter_loop = None
 
     def get_db(self) -> Generator[Session, None, None]:
-        db = self.SessionLocal()
+        # Requests that never query (e.g. chunk uploads) never create a session
+        db = LazySession(self.SessionLocal)
         try:
             yield db
         finally:
             db.close()
-    
-mysql = MySQLDB()
\ No newline at end of file
+
+    def pool_metrics(self) -> Dict[str, Any]:
+        """Utilization and checkout latency of the connection pool"""
+        return {**self.engine.pool.utilization(), **self.engine.pool.metrics.snapshot()}
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run blocking database work in a worker thread, so a slow query does not
+        stall the event loop (and every in-flight chunk upload) while it runs.
+
+        At most DB_THREADPOOL_SIZE calls run at once, in their own thread budget:
+        DB work never starves the default threadpool used for file I/O.
+
+        ##  Example
+        ```python
+        file = await mysql.run(self.repo.get_file, file_id)
+        ```
+        """
+        return await to_thread.run_sync(partial(func, *args, **kwargs), limiter=self._get_limiter())
+
+    def _get_limiter(self) -> CapacityLimiter:
+        loop = asyncio.get_running_loop()
+        if self._limiter is None or self._limiter_loop is not loop:
+            self._limiter = CapacityLimiter(config.DB_THREADPOOL_SIZE)
+            self._limiter_loop = loop
+        return self._limiter
+
+
+mysql = MySQLDB()
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Checkout latency of the connection pool, over the most recent checkouts"""
+
+    def __init__(self, window: int = 1000) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def observe_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.checkouts += 1
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            checkouts, timeouts = self.checkouts, self.timeouts
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+        return {
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'checkout_ms_p50': percentile(0.50),
+            'checkout_ms_p99': percentile(0.99),
+            'checkout_ms_max': samples[-1] * 1000 if samples else 0.0,
+        }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording how long each connection checkout waits"""
+
+    metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe_checkout(time.perf_counter() - start)
+        return connection
+
+    def utilization(self) -> Dict[str, Any]:
+        capacity = self.size() + self._max_overflow
+        return {
+            'pool_size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_out': self.checkedout(),
+            'checked_in': self.checkedin(),
+            'overflow': max(self.overflow(), 0),
+            'utilization': self.checkedout() / capacity if capacity > 0 else 0.0,
+        }
@@ -1,11 +1,21 @@
 from datetime import timedelta
 from core.config import config
 from minio import Minio
-from minio.helpers import ObjectWriteResult
+from minio.commonconfig import CopySource
+from minio.datatypes import Part
+from minio.deleteobjects import DeleteObject
+from minio.helpers import ObjectWriteResult, MIN_PART_SIZE, MAX_MULTIPART_COUNT
+from concurrent.futures import ThreadPoolExecutor
 from typing import Self
+from infrastructure.cache import TTLCache
 import json
+import logging
+import math
+import os
 from urllib.parse import urlsplit, urlunsplit
 
+logger = logging.getLogger(__name__)
+
 
 class MinioStorage:
 
@@ -33,9 +43,29 @@ class MinioStorage:
             access_key=config.MINIO_ACCESS_KEY,
             secret_key=config.MINIO_SECRET_KEY,
             secure=False,
+            region=config.MINIO_REGION,
         )
+        # Presigned URLs for browsers are signed for the external endpoint so the
+        # signed Host header matches what the browser requests. Signing is local
+        # (HMAC only) since the region is pinned, so one client serves all calls.
+        self.external_client = None
+        if config.MINIO_EXTERNAL_ENDPOINT:
+            # Always use HTTPS when generating browser-facing URLs in production
+            self.external_client = Minio(
+                config.MINIO_EXTERNAL_ENDPOINT,
+                access_key=config.MINIO_ACCESS_KEY,
+                secret_key=config.MINIO_SECRET_KEY,
+                secure=True,
+                region=config.MINIO_REGION,
+            )
         self.public_bucket = config.MINIO_PUBLIC_BUCKET
         self.private_bucket = config.MINIO_PRIVATE_BUCKET
+        # Presigned download URLs by file ID (see `FileService.get_download_link`). Entries
+        # expire while the URL still has DOWNLOAD_URL_MIN_VALIDITY left.
+        self.url_cache = TTLCache[tuple[tuple[str, str], str]](
+            maxsize=config.DOWNLOAD_URL_CACHE_SIZE if config.DOWNLOAD_URL_CACHE_ENABLED else 0,
+            ttl=max(config.DOWNLOAD_URL_EXPIRY - config.DOWNLOAD_URL_MIN_VALIDITY, 0),
+        )
 
     def setup_buckets(self):
         # This policy allows anyone to read objects from the public bucket
@@ -108,6 +138,61 @@ class MinioStorage:
         return self.client.put_object(bucket_name, object_name, data, length, content_type, metadate, sse, progress, part_size,
                                       num_parallel_uploads, tags, retention, legal_hold)
 
+    def put_files_parallel(self, bucket_name, object_name, file_paths: list[str], content_type="application/octet-stream",
+                           part_size: int | None = None, num_parallel_uploads: int | None = None):
+        """
+        Upload the concatenation of local files as one object, uploading the
+        multipart parts concurrently. Each worker reads its own byte range from
+        disk, so at most `num_parallel_uploads` parts are held in memory. The
+        multipart upload is aborted if any part fails.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Object name in the bucket.
+        :param file_paths: Ordered files making up the object (e.g. upload chunks).
+        :param content_type: Content type of the object.
+        :param part_size: Multipart part size; defaults to `MINIO_PART_SIZE`.
+        :param num_parallel_uploads: Number of parallel part uploads; defaults to `MINIO_UPLOAD_PARALLELISM`.
+        :return: Result of the completed upload.
+        """
+        if not self.bucket_exists(bucket_name=bucket_name):
+            self.create_bucket(bucket_name=bucket_name)
+
+        files = [(path, os.path.getsize(path)) for path in file_paths]
+        total_size = sum(size for _, size in files)
+        part_size = _part_size_for(total_size, part_size or config.MINIO_PART_SIZE)
+        parts = _plan_parts(files, part_size)
+        if len(parts) <= 1:
+            # Single-part objects do not need a multipart upload
+            data = _read_ranges(parts[0]) if parts else b""
+            return self.client._put_object(bucket_name, object_name, data, {"Content-Type": content_type})
+
+        upload_id = self.client._create_multipart_upload(bucket_name, object_name, {"Content-Type": content_type})
+        workers = max(1, num_parallel_uploads or config.MINIO_UPLOAD_PARALLELISM)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._upload_part_range, bucket_name, object_name, upload_id, number, ranges)
+                    for number, ranges in enumerate(parts, start=1)
+                ]
+                try:
+                    uploaded = [future.result() for future in futures]
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            return self.client._complete_multipart_upload(bucket_name, object_name, upload_id, uploaded)
+        except BaseException as exc:
+            logger.error(f"Multipart upload of {bucket_name}/{object_name} failed, aborting: {str(exc)}")
+            try:
+                self.client._abort_multipart_upload(bucket_name, object_name, upload_id)
+            except Exception as abort_exc:
+                logger.warning(f"Failed to abort multipart upload {upload_id}: {str(abort_exc)}")
+            raise
+
+    def _upload_part_range(self, bucket_name, object_name, upload_id, part_number, ranges) -> Part:
+        etag = self.client._upload_part(bucket_name, object_name, _read_ranges(ranges), None, upload_id, part_number)
+        return Part(part_number, etag)
+
     def get_presigned_url(self, method, bucket_name, object_name, expires=timedelta(days=7), response_headers=None, request_date=None,
                           version_id=None, extra_query_params=None) -> str:
         """
@@ -128,29 +213,8 @@ class MinioStorage:
         :param extra_query_params: Extra query parameters for advanced usage.
         :return: URL string.
         """
-        # If an external endpoint is configured, generate the signature using that endpoint
-        # so the Host header in the signature matches what the browser will request.
-        if config.MINIO_EXTERNAL_ENDPOINT:
-            # Always use HTTPS when generating browser-facing URLs in production
-            external_client = Minio(
-                config.MINIO_EXTERNAL_ENDPOINT,
-                access_key=config.MINIO_ACCESS_KEY,
-                secret_key=config.MINIO_SECRET_KEY,
-                secure=True,
-            )
-            return external_client.get_presigned_url(
-                method,
-                bucket_name,
-                object_name,
-                expires,
-                response_headers,
-                request_date,
-                version_id,
-                extra_query_params,
-            )
-
-        # Default: sign with the internal client/endpoint
-        return self.client.get_presigned_url(
+        client = self.external_client or self.client
+        return client.get_presigned_url(
             method,
             bucket_name,
             object_name,
@@ -173,5 +237,159 @@ class MinioStorage:
         """
         return self.client.remove_object(bucket_name, object_name)
 
+    def remove_objects(self, paths: list[str]) -> list[str]:
+        """
+        Remove objects with multi-object deletes, one per bucket and 1000 keys.
+        Paths that are not `bucket/object`, like the placeholders of quarantined
+        files, are skipped.
+
+        :param paths: Object paths as stored on files, `bucket/object`.
+        :return: Paths that could not be removed; each error is logged.
+        """
+        objects_by_bucket: dict[str, list[str]] = {}
+        for path in dict.fromkeys(paths):
+            bucket_name, _, object_name = path.partition("/")
+            if object_name:
+                objects_by_bucket.setdefault(bucket_name, []).append(object_name)
+        failed = []
+        for bucket_name, object_names in objects_by_bucket.items():
+            # The client sends the keys in requests of at most 1000; errors are only
+            # known, and the requests only sent, as the returned iterator is consumed
+            for error in self.client.remove_objects(bucket_name, (DeleteObject(name) for name in object_names)):
+                logger.error(f"Failed to delete {bucket_name}/{error.name} from MinIO: {error.code} {error.message}")
+                failed.append(f"{bucket_name}/{error.name}")
+        return failed
+
+    def get_object(self, bucket_name, object_name):
+        """
+        Get data of an object. The returned response must be closed and released.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Object name in the bucket.
+        :return: :class:`urllib3.response.HTTPResponse` object.
+        """
+        return self.client.get_object(bucket_name, object_name)
+
+    def stat_object(self, bucket_name, object_name):
+        """
+        Get object information and metadata of an object.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Object name in the bucket.
+        :return: :class:`Object <Object>`.
+        """
+        return self.client.stat_object(bucket_name, object_name)
+
+    def copy_object(self, bucket_name, object_name, source_bucket_name, source_object_name) -> ObjectWriteResult:
+        """
+        Server-side copy of an object; sources larger than 5GiB are composed.
+
+        :param bucket_name: Name of the destination bucket.
+        :param object_name: Object name in the destination bucket.
+        :param source_bucket_name: Name of the source bucket.
+        :param source_object_name: Object name in the source bucket.
+        :return: :class:`ObjectWriteResult` object.
+        """
+        if not self.bucket_exists(bucket_name=bucket_name):
+            self.create_bucket(bucket_name=bucket_name)
+        return self.client.copy_object(bucket_name, object_name, CopySource(source_bucket_name, source_object_name))
+
+    def create_multipart_upload(self, bucket_name, object_name, content_type="application/octet-stream") -> str:
+        """
+        Start a multipart upload whose parts are uploaded by the client.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Object name in the bucket.
+        :param content_type: Content type of the object.
+        :return: S3 upload ID.
+        """
+        return self.client._create_multipart_upload(bucket_name, object_name, {"Content-Type": content_type})
+
+    def list_parts(self, bucket_name, object_name, upload_id) -> list[Part]:
+        """
+        List all uploaded parts of a multipart upload.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Object name in the bucket.
+        :param upload_id: S3 upload ID.
+        :return: Uploaded parts ordered by part number.
+        """
+        parts = []
+        marker = None
+        while True:
+            result = self.client._list_parts(bucket_name, object_name, upload_id, part_number_marker=marker)
+            parts.extend(result.parts)
+            if not result.is_truncated:
+                return parts
+            marker = result.next_part_number_marker
+
+    def complete_multipart_upload(self, bucket_name, object_name, upload_id, parts: list[Part]):
+        """
+        Complete a multipart upload from its uploaded parts.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Object name in the bucket.
+        :param upload_id: S3 upload ID.
+        :param parts: Uploaded parts ordered by part number.
+        """
+        return self.client._complete_multipart_upload(bucket_name, object_name, upload_id, parts)
+
+    def abort_multipart_upload(self, bucket_name, object_name, upload_id) -> None:
+        """
+        Abort a multipart upload and discard its uploaded parts.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Object name in the bucket.
+        :param upload_id: S3 upload ID.
+        """
+        self.client._abort_multipart_upload(bucket_name, object_name, upload_id)
+
+
+def _part_size_for(total_size: int, part_size: int) -> int:
+    """Use at least `part_size`, growing it when needed to stay within the S3 part count limit"""
+    part_size = max(part_size, MIN_PART_SIZE)
+    if total_size > part_size * MAX_MULTIPART_COUNT:
+        part_size = math.ceil(total_size / MAX_MULTIPART_COUNT / MIN_PART_SIZE) * MIN_PART_SIZE
+    return part_size
+
+
+def _plan_parts(files: list[tuple[str, int]], part_size: int) -> list[list[tuple[str, int, int]]]:
+    """
+    Split the concatenation of `files` into parts of `part_size` bytes (the last
+    one may be smaller). Each part is a list of `(path, offset, length)` ranges.
+    """
+    parts = []
+    current, current_size = [], 0
+    for path, size in files:
+        offset = 0
+        while offset < size:
+            length = min(size - offset, part_size - current_size)
+            current.append((path, offset, length))
+            current_size += length
+            offset += length
+            if current_size == part_size:
+                parts.append(current)
+                current, current_size = [], 0
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _read_ranges(ranges: list[tuple[str, int, int]]) -> bytearray:
+    """Read the ranges of a part into one buffer, filled in place, so each in-flight part is held in memory once"""
+    data = bytearray(sum(length for _, _, length in ranges))
+    position = 0
+    with memoryview(data) as view:
+        for path, offset, length in ranges:
+            with open(path, "rb") as file:
+                file.seek(offset)
+                end = position + length
+                while position < end:
+                    read = file.readinto(view[position:end])
+                    if not read:
+                        raise EOFError(f"{path} is shorter than expected")
+                    position += read
+    return data
+
 
 minioStorage = MinioStorage()
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, Optional
+from core.config import config
+from infrastructure.chunk_assembler import chunk_path
+
+# Name of the manifest written by `upload/init` inside the upload directory
+MANIFEST_FILENAME = "manifest.json"
+# Each stored chunk `{index}.part` gets its record in `{index}.part.json`
+CHUNK_RECORD_SUFFIX = ".json"
+
+
+def _write_json(path: str, content: Dict[str, Any]) -> None:
+    # Written under a temporary name of its own and renamed, so readers never see a
+    # partial record and concurrent writers of the same record never share a file
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, "w") as record_file:
+        json.dump(content, record_file)
+    os.replace(temp_path, path)
+
+
+def create_manifest(upload_dir: str, total_chunks: Optional[int], chunk_size: int) -> None:
+    """Record the expected shape of a chunked upload, when the client declared it"""
+    _write_json(os.path.join(upload_dir, MANIFEST_FILENAME), {"total_chunks": total_chunks, "chunk_size": chunk_size})
+
+
+def record_chunk(upload_dir: str, chunk_index: int, size: int, checksums: Dict[str, str]) -> None:
+    """
+    Record a chunk once its `.part` file is in place, with its checksums by algorithm.
+    Each chunk has its own record, so concurrent chunk requests, from any worker
+    process, never overwrite each other.
+    """
+    _write_json(f"{chunk_path(upload_dir, chunk_index)}{CHUNK_RECORD_SUFFIX}", {"size": size, **checksums})
+
+
+def read_total_chunks(upload_dir: str) -> Optional[int]:
+    """The number of chunks declared by `upload/init`, if any"""
+    try:
+        with open(os.path.join(upload_dir, MANIFEST_FILENAME)) as manifest_file:
+            return json.load(manifest_file)["total_chunks"]
+    except FileNotFoundError:
+        return None
+
+
+def read_chunk_record(upload_dir: str, chunk_index: int) -> Optional[Dict[str, Any]]:
+    """The record of a stored chunk, or None when it is not recorded (yet)"""
+    try:
+        with open(f"{chunk_path(upload_dir, chunk_index)}{CHUNK_RECORD_SUFFIX}") as record_file:
+            return json.load(record_file)
+    except FileNotFoundError:
+        return None
+
+
+def stored_chunk_sha256(upload_dir: str, chunk_index: int) -> str:
+    """
+    SHA-256 of a stored chunk, from its record or, for a chunk stored by a request
+    that has not recorded it yet, its content. Blocking: run it in a worker thread.
+    """
+    record = read_chunk_record(upload_dir, chunk_index)
+    if record is not None:
+        return record["sha256"]
+    sha256 = hashlib.sha256()
+    with open(chunk_path(upload_dir, chunk_index), "rb") as chunk_file:
+        while block := chunk_file.read(config.APP_STREAM_BLOCK_SIZE):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def read_manifest(upload_dir: str) -> Dict[str, Any]:
+    """
+    Read the manifest of a chunked upload. Blocking: run it in a worker thread.
+
+    A chunk counts as received once both its `.part` file and its record exist, so
+    a chunk interrupted while being stored is reported missing and sent again.
+
+    :return: `total_chunks` and `chunk_size` (None when not declared) and the
+             received `chunks` as `{index: {"size", "sha256", ...}}`.
+    :raises FileNotFoundError: If the upload directory does not exist.
+    """
+    manifest = {"total_chunks": None, "chunk_size": None}
+    chunks = {}
+    with os.scandir(upload_dir) as entries:
+        for entry in entries:
+            if entry.name == MANIFEST_FILENAME:
+                with open(entry.path) as manifest_file:
+                    manifest.update(json.load(manifest_file))
+                continue
+            index, _, suffix = entry.name.partition(".")
+            if suffix != f"part{CHUNK_RECORD_SUFFIX}" or not index.isdigit():
+                continue
+            if os.path.exists(chunk_path(upload_dir, int(index))):
+                with open(entry.path) as record_file:
+                    chunks[int(index)] = json.load(record_file)
+    return {**manifest, "chunks": dict(sorted(chunks.items()))}
@@ -1,16 +1,317 @@
 import aiohttp
+import aiofiles
 import asyncio
 import logging
-import hashlib
-from typing import Optional, Dict, Any
+import io
+import os
+import struct
+import time
+from typing import Optional, Dict, Any, List, IO
+from starlette.concurrency import run_in_threadpool
 from core.config import config
+from infrastructure.chunk_assembler import ChunkStreamReader, assembled_file_path, chunk_path, chunk_paths
+from infrastructure.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+
+class ClamdError(Exception):
+    pass
+
+
+class ClamdStream:
+    """
+    One clamd `zINSTREAM` scan over TCP or a Unix socket.
+
+    Data is sent as length-prefixed packets while it becomes available; the
+    verdict is read once the stream is terminated with `finish`.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self.size = 0
+
+    @classmethod
+    async def open(cls, command: bytes = b"zINSTREAM\0") -> "ClamdStream":
+        if config.CLAMD_SOCKET:
+            connection = asyncio.open_unix_connection(config.CLAMD_SOCKET)
+        else:
+            connection = asyncio.open_connection(config.CLAMD_HOST, config.CLAMD_PORT)
+        reader, writer = await asyncio.wait_for(connection, timeout=config.CLAMD_TIMEOUT)
+        writer.write(command)
+        return cls(reader, writer)
+
+    async def write(self, data: bytes) -> None:
+        if not data:
+            return
+        try:
+            self._writer.write(struct.pack("!L", len(data)))
+            self._writer.write(data)
+            # Waiting for the socket buffer to drain applies clamd's back-pressure to the caller
+            await asyncio.wait_for(self._writer.drain(), timeout=config.CLAMD_TIMEOUT)
+        except ConnectionError as e:
+            # clamd drops the connection when it rejects a stream, e.g. over StreamMaxLength
+            raise ClamdError(f"clamd closed the connection: {str(e)}")
+        self.size += len(data)
+
+    async def finish(self) -> str:
+        """Terminate the stream and return clamd's reply, e.g. `stream: OK`"""
+        self._writer.write(struct.pack("!L", 0))
+        return await self.reply()
+
+    async def reply(self) -> str:
+        try:
+            reply = await asyncio.wait_for(self._reader.readuntil(b"\0"), timeout=config.CLAMD_TIMEOUT)
+        except asyncio.IncompleteReadError as e:
+            raise ClamdError(f"clamd closed the connection: {e.partial.decode(errors='replace')}")
+        finally:
+            await self.close()
+        return reply.rstrip(b"\0").decode(errors="replace").strip()
+
+    def abort(self) -> None:
+        self._writer.close()
+
+    async def close(self) -> None:
+        if not self._writer.is_closing():
+            self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+
+
+class _IncrementalScan:
+    """clamd stream of an upload, fed with its contiguous chunks as they arrive"""
+
+    def __init__(self) -> None:
+        self.stream: Optional[ClamdStream] = None
+        self.next_index = 0
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
 class VirusScanner:
     def __init__(self):
         self.clamav_url = config.CLAMAV_REST_URL
         self.enabled = config.VIRUS_SCAN_ENABLED
+        self.backend = config.CLAMAV_BACKEND
+        # upload_id -> incremental clamd scan, local to this process
+        self._scans: Dict[str, _IncrementalScan] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        # (content sha256, signature version) -> scan result, in front of the scan_results table
+        self.result_cache = TTLCache[Dict[str, Any]](maxsize=config.SCAN_CACHE_SIZE, ttl=config.SCAN_CACHE_TTL)
+        self._signature_version = TTLCache[Optional[str]](maxsize=1, ttl=config.SCAN_SIGNATURE_VERSION_TTL)
+
+    async def startup(self) -> None:
+        """Open the shared HTTP session; called from the application lifespan"""
+        await self.get_session()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the long-lived session used for the ClamAV REST service.
+
+        Its connector pools keep-alive connections, so scans reuse connections
+        and cached DNS lookups instead of opening a new session per call. A new
+        session is created lazily when none is open on the running event loop
+        (e.g. in a Celery worker or a script); the session of the previous loop
+        is closed then, so its pooled connections are not leaked.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session_loop is not loop:
+            await self._close_session()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.CLAMAV_POOL_SIZE,
+                limit_per_host=config.CLAMAV_POOL_SIZE_PER_HOST,
+                keepalive_timeout=config.CLAMAV_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=config.CLAMAV_DNS_CACHE_TTL,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session and pending incremental scans; called on shutdown"""
+        for upload_id, scan in list(self._scans.items()):
+            await self._drop_scan(upload_id, scan)
+        await self._close_session()
+
+    async def _close_session(self) -> None:
+        session, loop = self._session, self._session_loop
+        self._session = None
+        self._session_loop = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop is not asyncio.get_running_loop() and loop.is_running():
+            # Its connections belong to a loop running in another thread: close them there
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            await session.close()
+
+    async def signature_version(self) -> Optional[str]:
+        """
+        Engine and signature database version of ClamAV, e.g. `1.4.1/27431`.
+        Cached for SCAN_SIGNATURE_VERSION_TTL seconds; None when unknown.
+        """
+        if not self.enabled:
+            return None
+        version = self._signature_version.get("version", default=False)
+        if version is not False:
+            return version
+        try:
+            if self.backend == "clamd":
+                clamd = await ClamdStream.open(b"zVERSION\0")
+                reply = await clamd.reply()
+            else:
+                session = await self.get_session()
+                async with session.get(f"{self.clamav_url}/version", timeout=10) as response:
+                    response.raise_for_status()
+                    reply = (await response.json()).get('version', '')
+            # "ClamAV 1.4.1/27431/Thu Oct 16 08:34:00 2026" -> "1.4.1/27431"
+            version = reply.split(" ", 1)[-1].rsplit("/", 1)[0] if reply.count("/") >= 2 else None
+        except Exception as e:
+            logger.warning(f"Could not get ClamAV signature version: {str(e)}")
+            version = None
+        self._signature_version.set("version", version)
+        return version
+
+    async def discard_upload(self, upload_id: str) -> None:
+        """Drop the incremental scan of an upload that does not need scanning"""
+        scan = self._scans.get(upload_id)
+        if scan is not None:
+            await self._drop_scan(upload_id, scan)
+
+    @property
+    def incremental(self) -> bool:
+        return self.enabled and self.backend == "clamd"
+
+    async def feed_upload(self, upload_id: str, upload_dir: str) -> None:
+        """
+        Stream the chunks of an upload received so far, in order, to its clamd scan.
+
+        Only used with the clamd backend. Chunks that arrive out of order are fed
+        once the gap before them is filled. Failures only drop the incremental
+        scan: `scan_upload` then scans the whole upload.
+
+        Never waits for a feed already running for the upload: concurrent chunk
+        requests would otherwise answer at clamd's pace. That feed picks up the
+        chunks made contiguous meanwhile, and `scan_upload` sends any left.
+        """
+        if not self.incremental:
+            return
+        self._drop_idle_scans()
+        scan = self._scans.get(upload_id)
+        if scan is None:
+            if len(self._scans) >= config.CLAMD_MAX_SESSIONS or not os.path.exists(chunk_path(upload_dir, 0)):
+                return
+            scan = self._scans[upload_id] = _IncrementalScan()
+        if scan.lock.locked():
+            return
+        try:
+            async with scan.lock:
+                await self._feed_chunks(scan, upload_dir)
+        except Exception as e:
+            logger.warning(f"Incremental scan of {upload_id} dropped: {str(e)}")
+            await self._drop_scan(upload_id, scan)
+
+    async def scan_upload(self, upload_id: str, upload_dir: str, total_chunks: int, filename: str) -> Dict[str, Any]:
+        """
+        Scan a complete chunked upload. Returns the same structure as `scan_file`.
+
+        With the clamd backend only the chunks not yet fed by `feed_upload` are
+        sent before reading the verdict. Otherwise the assembled file, or the
+        chunks when none was assembled, are scanned in full.
+        """
+        scan = self._scans.pop(upload_id, None) if self.incremental else None
+        if scan is not None:
+            try:
+                async with scan.lock:
+                    await self._feed_chunks(scan, upload_dir, total_chunks)
+                    if scan.stream.size <= config.MAX_SCAN_FILE_SIZE:
+                        logger.info(f"Finishing incremental virus scan for {filename} (size: {scan.stream.size} bytes)")
+                        return self._clamd_result(await scan.stream.finish(), scan.stream.size)
+            except Exception as e:
+                logger.warning(f"Incremental scan of {upload_id} failed, rescanning: {str(e)}")
+            await self._drop_scan(upload_id, scan)
+
+        final_file_path = assembled_file_path(upload_dir)
+        if os.path.exists(final_file_path):
+            return await self.scan_file(final_file_path)
+        return await self.scan_chunks(chunk_paths(upload_dir, total_chunks), filename)
+
+    async def _feed_chunks(self, scan: _IncrementalScan, upload_dir: str, total_chunks: Optional[int] = None) -> None:
+        """Feed contiguous chunks from `scan.next_index`; all of them up to `total_chunks` when given"""
+        if scan.stream is None:
+            scan.stream = await ClamdStream.open()
+        while total_chunks is None or scan.next_index < total_chunks:
+            path = chunk_path(upload_dir, scan.next_index)
+            if not os.path.exists(path):
+                if total_chunks is None:
+                    break
+                raise FileNotFoundError(f"Missing chunk {scan.next_index} for upload")
+            async with aiofiles.open(path, "rb") as chunk_file:
+                while True:
+                    block = await chunk_file.read(config.APP_STREAM_BLOCK_SIZE)
+                    if not block:
+                        break
+                    await scan.stream.write(block)
+            scan.next_index += 1
+            if scan.stream.size > config.MAX_SCAN_FILE_SIZE:
+                raise ClamdError(f"File size exceeds maximum scan size {config.MAX_SCAN_FILE_SIZE}")
+        scan.last_used = time.monotonic()
+
+    async def _drop_scan(self, upload_id: str, scan: _IncrementalScan) -> None:
+        if self._scans.get(upload_id) is scan:
+            del self._scans[upload_id]
+        if scan.stream is not None:
+            await scan.stream.close()
+
+    def _drop_idle_scans(self) -> None:
+        """Forget scans of abandoned uploads; clamd closes their connections after its IdleTimeout"""
+        deadline = time.monotonic() - config.CLAMD_IDLE_TIMEOUT
+        for upload_id, scan in list(self._scans.items()):
+            if scan.last_used < deadline and not scan.lock.locked():
+                del self._scans[upload_id]
+                if scan.stream is not None:
+                    scan.stream.abort()
+
+    def _clamd_result(self, reply: str, file_size: int) -> Dict[str, Any]:
+        """Map a clamd reply (`stream: OK`, `stream: <name> FOUND`, `... ERROR`) to a scan result"""
+        logger.info(f"clamd scan result: {reply}")
+        status = reply.split(": ", 1)[-1]
+        if status.endswith(" FOUND"):
+            return {
+                'is_infected': True,
+                'virus_name': status[:-len(" FOUND")],
+                'scan_result': 'FOUND',
+                'scanner': 'ClamAV',
+                'file_size': file_size
+            }
+        if status == "OK":
+            return {
+                'is_infected': False,
+                'virus_name': None,
+                'scan_result': 'OK',
+                'scanner': 'ClamAV',
+                'file_size': file_size
+            }
+        return self._scan_error_result(file_size, f"Unexpected clamd response: {reply}")
+
+    async def _clamd_scan_stream(self, stream: IO[bytes], file_size: int) -> Dict[str, Any]:
+        """Stream a readable stream to clamd with zINSTREAM"""
+        clamd = await ClamdStream.open()
+        try:
+            while True:
+                # The stream may be a file or a MinIO response: read it off the event loop
+                block = await run_in_threadpool(stream.read, config.APP_STREAM_BLOCK_SIZE)
+                if not block:
+                    break
+                await clamd.write(block)
+            return self._clamd_result(await clamd.finish(), file_size)
+        finally:
+            await clamd.close()
         
     async def scan_file(self, file_path: str) -> Dict[str, Any]:
         """
@@ -50,27 +351,8 @@ class VirusScanner:
             
             logger.info(f"Starting virus scan for file: {file_path} (size: {file_size} bytes)")
             
-            async with aiohttp.ClientSession() as session:
-                with open(file_path, 'rb') as file:
-                    data = aiohttp.FormData()
-                    data.add_field('file', file, filename=file_path.split('/')[-1])
-                    
-                    async with session.post(f"{self.clamav_url}/scan", data=data, timeout=300) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            logger.info(f"ClamAV scan result: {result}")
-                            
-                            return {
-                                'is_infected': result.get('is_infected', False),
-                                'virus_name': result.get('virus_name'),
-                                'scan_result': result.get('result', 'OK'),
-                                'scanner': 'ClamAV',
-                                'file_size': file_size
-                            }
-                        else:
-                            error_text = await response.text()
-                            logger.error(f"ClamAV scan failed with status {response.status}: {error_text}")
-                            return self._scan_error_result(file_size, f"HTTP {response.status}: {error_text}")
+            with open(file_path, 'rb') as file:
+                return await self._scan_stream(file, file_path.split('/')[-1], file_size)
                             
         except asyncio.TimeoutError:
             logger.error("ClamAV scan timed out")
@@ -85,6 +367,82 @@ class VirusScanner:
             logger.error(f"Virus scan failed: {str(e)}")
             return self._scan_error_result(0, str(e))
     
+    async def scan_chunks(self, chunk_paths: List[str], filename: str) -> Dict[str, Any]:
+        """
+        Scan the ordered chunks of an upload as one file, without assembling them on disk.
+        Returns the same structure as `scan_file`.
+        """
+        try:
+            with ChunkStreamReader(chunk_paths) as reader:
+                return await self.scan_stream(reader, filename, reader.size)
+        except FileNotFoundError:
+            logger.error(f"Chunk not found for scanning: {filename}")
+            return self._scan_error_result(0, "File not found")
+
+    async def scan_stream(self, stream: IO[bytes], filename: str, file_size: int) -> Dict[str, Any]:
+        """
+        Scan data from a readable stream of known size (e.g. an object read back from MinIO).
+        Returns the same structure as `scan_file`.
+        """
+        if not self.enabled:
+            logger.info("Virus scanning is disabled")
+            return {
+                'is_infected': False,
+                'virus_name': None,
+                'scan_result': 'SCAN_DISABLED',
+                'scanner': 'ClamAV',
+                'file_size': file_size
+            }
+
+        if file_size > config.MAX_SCAN_FILE_SIZE:
+            logger.warning(f"File size {file_size} exceeds scan limit {config.MAX_SCAN_FILE_SIZE}")
+            return {
+                'is_infected': None,
+                'virus_name': None,
+                'scan_result': 'FILE_TOO_LARGE',
+                'scanner': 'ClamAV',
+                'file_size': file_size,
+                'error': f'File size {file_size} exceeds maximum scan size {config.MAX_SCAN_FILE_SIZE}'
+            }
+
+        try:
+            logger.info(f"Starting virus scan for stream: {filename} (size: {file_size} bytes)")
+            return await self._scan_stream(stream, filename, file_size)
+        except asyncio.TimeoutError:
+            logger.error("ClamAV scan timed out")
+            return self._scan_error_result(file_size, "Scan timeout")
+        except aiohttp.ClientError as e:
+            logger.error(f"ClamAV connection error: {str(e)}")
+            return self._scan_error_result(file_size, f"Connection error: {str(e)}")
+        except Exception as e:
+            logger.error(f"Virus scan failed for {filename}: {str(e)}")
+            return self._scan_error_result(file_size, str(e))
+
+    async def _scan_stream(self, stream: IO[bytes], filename: str, file_size: int) -> Dict[str, Any]:
+        """Scan a readable stream with clamd, or POST it to the ClamAV REST service"""
+        if self.backend == "clamd":
+            return await self._clamd_scan_stream(stream, file_size)
+        session = await self.get_session()
+        data = aiohttp.FormData()
+        data.add_field('file', stream, filename=filename)
+
+        async with session.post(f"{self.clamav_url}/scan", data=data, timeout=300) as response:
+            if response.status == 200:
+                result = await response.json()
+                logger.info(f"ClamAV scan result: {result}")
+
+                return {
+                    'is_infected': result.get('is_infected', False),
+                    'virus_name': result.get('virus_name'),
+                    'scan_result': result.get('result', 'OK'),
+                    'scanner': 'ClamAV',
+                    'file_size': file_size
+                }
+            else:
+                error_text = await response.text()
+                logger.error(f"ClamAV scan failed with status {response.status}: {error_text}")
+                return self._scan_error_result(file_size, f"HTTP {response.status}: {error_text}")
+
     async def scan_file_content(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """Scan file content directly without saving to disk"""
         if not self.enabled:
@@ -103,27 +461,30 @@ class VirusScanner:
                 return self._scan_error_result(file_size, "File too large for scanning")
             
             logger.info(f"Starting virus scan for file content: {filename} (size: {file_size} bytes)")
+
+            if self.backend == "clamd":
+                return await self._clamd_scan_stream(io.BytesIO(file_content), file_size)
             
-            async with aiohttp.ClientSession() as session:
-                data = aiohttp.FormData()
-                data.add_field('file', file_content, filename=filename)
+            session = await self.get_session()
+            data = aiohttp.FormData()
+            data.add_field('file', file_content, filename=filename)
                 
-                async with session.post(f"{self.clamav_url}/scan", data=data, timeout=300) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.info(f"ClamAV scan result for {filename}: {result}")
+            async with session.post(f"{self.clamav_url}/scan", data=data, timeout=300) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    logger.info(f"ClamAV scan result for {filename}: {result}")
                         
-                        return {
-                            'is_infected': result.get('is_infected', False),
-                            'virus_name': result.get('virus_name'),
-                            'scan_result': result.get('result', 'OK'),
-                            'scanner': 'ClamAV',
-                            'file_size': file_size
-                        }
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"ClamAV scan failed: {error_text}")
-                        return self._scan_error_result(file_size, error_text)
+                    return {
+                        'is_infected': result.get('is_infected', False),
+                        'virus_name': result.get('virus_name'),
+                        'scan_result': result.get('result', 'OK'),
+                        'scanner': 'ClamAV',
+                        'file_size': file_size
+                    }
+                else:
+                    error_text = await response.text()
+                    logger.error(f"ClamAV scan failed: {error_text}")
+                    return self._scan_error_result(file_size, error_text)
                         
         except Exception as e:
             logger.error(f"Virus scan failed for {filename}: {str(e)}")
@@ -144,14 +505,23 @@ class VirusScanner:
         """Check if ClamAV service is available"""
         if not self.enabled:
             return {'status': 'disabled', 'message': 'Virus scanning is disabled'}
+
+        if self.backend == "clamd":
+            try:
+                clamd = await ClamdStream.open(b"zPING\0")
+                if await clamd.reply() == "PONG":
+                    return {'status': 'healthy', 'message': 'clamd is available'}
+                return {'status': 'unhealthy', 'message': 'clamd did not answer PING'}
+            except Exception as e:
+                return {'status': 'unhealthy', 'message': f'clamd unavailable: {str(e)}'}
             
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.clamav_url}/", timeout=10) as response:
-                    if response.status == 200:
-                        return {'status': 'healthy', 'message': 'ClamAV service is available'}
-                    else:
-                        return {'status': 'unhealthy', 'message': f'ClamAV returned status {response.status}'}
+            session = await self.get_session()
+            async with session.get(f"{self.clamav_url}/", timeout=10) as response:
+                if response.status == 200:
+                    return {'status': 'healthy', 'message': 'ClamAV service is available'}
+                else:
+                    return {'status': 'unhealthy', 'message': f'ClamAV returned status {response.status}'}
         except Exception as e:
             return {'status': 'unhealthy', 'message': f'ClamAV service unavailable: {str(e)}'}
 
@@ -1,11 +1,12 @@
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
-from api.routes import file, appointment, user
+from api.routes import file, appointment, user, metrics
 from exceptions.handler import ExceptionHandler
 from fastapi.middleware.cors import CORSMiddleware
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from contextlib import asynccontextmanager
 from infrastructure.minio import minioStorage
+from infrastructure.virus_scanner import virus_scanner
 from api.responses.response import ErrorResponse
 import logging
 import traceback
@@ -34,6 +35,9 @@ async def lifespan(app: FastAPI):
     try:
         minioStorage.setup_buckets()
         logger.info("MinIO buckets and policies configured.")
+
+        await virus_scanner.startup()
+        logger.info("Virus scanner session opened.")
         
         # Seed the database with initial appointments
         db_session = next(mysql.get_db())
@@ -49,7 +53,7 @@ async def lifespan(app: FastAPI):
         db_session.close()
         
     yield
-    # Code to run on shutdown could go here if needed.
+    await virus_scanner.close()
 
 
 def create_application() -> FastAPI:
@@ -98,6 +102,7 @@ def create_application() -> FastAPI:
     app.include_router(file.router)
     app.include_router(appointment.router)
     app.include_router(user.router)
+    app.include_router(metrics.router)
     ExceptionHandler(app)
     return app
 
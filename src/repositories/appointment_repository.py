@@ -1,6 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, noload, selectinload
 from .base_repository import BaseRepo
 from entities.appointment import Appointment
+from entities.file import File
 from dto.appointment_dto import AppointmentCreate
 from typing import List
 
@@ -16,10 +17,20 @@ class AppointmentRepo(BaseRepo[Appointment]):
         return self.db.query(self.model).filter(self.model.name == name).first()
 
     def list_appointments(self, user_id: str) -> List[Appointment]:
-        return self.db.query(self.model).filter(self.model.user_id == user_id).all()
+        return self.db.query(self.model).options(noload(self.model.files)).filter(self.model.user_id == user_id).all()
+
+    def get_with_files(self, appointment_id: str) -> Appointment:
+        """
+        Get an appointment with its files loaded for a cascade delete: one extra
+        query, reading only the keys the cascade and the stored object removal need.
+        """
+        return (self.db.query(self.model)
+                .options(selectinload(self.model.files).load_only(File.id, File.path, File.appointment_id, File.user_id))
+                .filter(self.model.id == appointment_id).first())
 
     def delete_appointment(self, appointment_id: str) -> Appointment:
-        appointment = self.get(id=appointment_id)
+        # The cascade deletes the files loaded here, without reading their other columns
+        appointment = self.get_with_files(appointment_id)
         if appointment:
             self.db.delete(appointment)
             self.db.commit()
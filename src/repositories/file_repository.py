@@ -2,8 +2,11 @@ from infrastructure.db.mysql import MySQLDB
 from .base_repository import BaseRepo
 from entities.file import File
 from entities.appointment import Appointment
-from dto.file_dto import FileBaseDTO
-from sqlalchemy.orm import Session
+from dto.file_dto import FileBaseDTO, FileListQueryDTO
+from constants.file_listing import SortOrder
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, Query
+from typing import Any, Optional
 
 
 class FileRepo(BaseRepo[File]):
@@ -13,6 +16,12 @@ class FileRepo(BaseRepo[File]):
     def get_file(self, id: str) -> File:
         return self.get(id=id)
 
+    def get_file_by_upload_id(self, upload_id: str) -> File:
+        return self.db.query(self.model).filter(self.model.upload_id == upload_id).first()
+
+    def get_files(self, ids: list[str]) -> list[File]:
+        return self.db.query(self.model).filter(self.model.id.in_(ids)).all()
+
     def create_file(self, file: FileBaseDTO) -> File:
         db_file = File(
             upload_id=file.upload_id,
@@ -29,23 +38,78 @@ class FileRepo(BaseRepo[File]):
             virus_scan_result=file.virus_scan_result,
             virus_scan_date=file.virus_scan_date,
             is_quarantined=file.is_quarantined,
-            quarantine_reason=file.quarantine_reason
+            quarantine_reason=file.quarantine_reason,
+            content_sha256=file.content_sha256,
+            upload_state=file.upload_state
         )
         return self.create(db_file)
 
-    def get_files_by_appointment(self, appointment_id: str) -> list[File]:
+    def get_upload_state(self, id: str) -> Optional[str]:
+        return self.db.query(self.model.upload_state).filter(self.model.id == id).scalar()
+
+    def get_upload_state_by_task(self, celery_task_id: str) -> Optional[str]:
+        return (
+            self.db
+            .query(self.model.upload_state)
+            .filter(self.model.celery_task_id == celery_task_id)
+            .limit(1)
+            .scalar()
+        )
+
+    def get_upload_states(self, ids: list[str]) -> list[tuple[str, str, Optional[dict]]]:
+        """Return `(id, upload_state, credential)` of the files, without loading whole rows"""
         return (
+            self.db
+            .query(self.model.id, self.model.upload_state, self.model.credential)
+            .filter(self.model.id.in_(ids))
+            .all()
+        )
+
+    def set_upload_state(self, celery_task_id: str, state: str) -> int:
+        """Set the upload state of every file stored by the task, returning the number of rows updated"""
+        updated = (
+            self.db
+            .query(self.model)
+            .filter(self.model.celery_task_id == celery_task_id)
+            .update({self.model.upload_state: state}, synchronize_session=False)
+        )
+        self.db.commit()
+        return updated
+
+    def update_by_task(self, celery_task_id: str, values: dict[str, Any]) -> int:
+        """Update the columns in `values` on every file stored by the task, returning the number of rows updated"""
+        updated = (
+            self.db
+            .query(self.model)
+            .filter(self.model.celery_task_id == celery_task_id)
+            .update(values, synchronize_session=False)
+        )
+        self.db.commit()
+        return updated
+
+    def get_files_by_appointment(self, appointment_id: str, query: FileListQueryDTO,
+                                 after: Optional[tuple[Any, str]] = None) -> list[File]:
+        return self.files_by_appointment_query(appointment_id, query, after).all()
+
+    def list_all_files(self, user_id: str, query: FileListQueryDTO,
+                       after: Optional[tuple[Any, str]] = None) -> list[tuple]:
+        return self.all_files_query(user_id, query, after).all()
+
+    def files_by_appointment_query(self, appointment_id: str, query: FileListQueryDTO,
+                                   after: Optional[tuple[Any, str]] = None) -> Query:
+        files = (
             self.db
             .query(self.model)
             .filter(
                 self.model.appointment_id == appointment_id,
                 self.model.virus_scan_status != 'infected'
             )
-            .all()
         )
+        return self._paginate(files, query, after)
 
-    def list_all_files(self, user_id: str) -> list[tuple]:
-        return (
+    def all_files_query(self, user_id: str, query: FileListQueryDTO,
+                        after: Optional[tuple[Any, str]] = None) -> Query:
+        files = (
             self.db
             .query(self.model, Appointment.name)
             .join(Appointment, self.model.appointment_id == Appointment.id)
@@ -53,8 +117,63 @@ class FileRepo(BaseRepo[File]):
                 self.model.user_id == user_id,
                 self.model.virus_scan_status != 'infected'
             )
-            .all()
         )
+        return self._paginate(files, query, after)
+
+    def _paginate(self, files: Query, query: FileListQueryDTO, after: Optional[tuple[Any, str]]) -> Query:
+        """
+        Apply the listing filters and one keyset page to `files`.
+
+        Rows are ordered by the sort column with `id` as tie-breaker, and the
+        page starts strictly after the `(sort value, id)` position `after`.
+        One row more than `query.limit` is returned so callers can tell
+        whether a next page exists.
+        """
+        if query.content_type:
+            if query.content_type.endswith("/*"):
+                files = files.filter(self.model.content_type.startswith(query.content_type[:-1], autoescape=True))
+            else:
+                files = files.filter(self.model.content_type == query.content_type)
+        if query.virus_scan_status:
+            files = files.filter(self.model.virus_scan_status == query.virus_scan_status)
+        if query.created_from:
+            files = files.filter(self.model.created_at >= query.created_from)
+        if query.created_to:
+            files = files.filter(self.model.created_at < query.created_to)
+
+        column = getattr(self.model, query.sort.value)
+        ascending = query.order == SortOrder.asc
+        if after is not None:
+            value, last_id = after
+            if ascending:
+                files = files.filter(or_(column > value, and_(column == value, self.model.id > last_id)))
+            else:
+                files = files.filter(or_(column < value, and_(column == value, self.model.id < last_id)))
+        if ascending:
+            files = files.order_by(column.asc(), self.model.id.asc())
+        else:
+            files = files.order_by(column.desc(), self.model.id.desc())
+        return files.limit(query.limit + 1)
+
+    def get_owned_files(self, limit: int, appointment_id: Optional[str] = None,
+                        user_id: Optional[str] = None) -> list[File]:
+        return self._owned_files(appointment_id, user_id).limit(limit).all()
+
+    def count_owned_files(self, appointment_id: Optional[str] = None, user_id: Optional[str] = None) -> int:
+        return self._owned_files(appointment_id, user_id).count()
+
+    def _owned_files(self, appointment_id: Optional[str], user_id: Optional[str]) -> Query:
+        query = self.db.query(self.model)
+        if appointment_id is not None:
+            query = query.filter(self.model.appointment_id == appointment_id)
+        if user_id is not None:
+            query = query.filter(self.model.user_id == user_id)
+        return query
+
+    def delete_files(self, ids: list[str]) -> int:
+        deleted = self.db.query(self.model).filter(self.model.id.in_(ids)).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
 
     def delete_file(self, file_id: str):
         file_to_delete = self.get(id=file_id)
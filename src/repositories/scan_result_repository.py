@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from .base_repository import BaseRepo
+from entities.scan_result import ScanResult
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class ScanResultRepo(BaseRepo[ScanResult]):
+    def __init__(self, db: Session) -> None:
+        super().__init__(ScanResult, db)
+
+    def get_result(self, content_sha256: str, signature_version: str, scanned_after: datetime) -> Optional[ScanResult]:
+        return (
+            self.db
+            .query(self.model)
+            .filter(
+                self.model.content_sha256 == content_sha256,
+                self.model.signature_version == signature_version,
+                self.model.scanned_at >= scanned_after
+            )
+            .first()
+        )
+
+    def save_result(self, content_sha256: str, signature_version: str, result: Dict[str, Any]) -> None:
+        try:
+            self.db.merge(ScanResult(
+                content_sha256=content_sha256,
+                signature_version=signature_version,
+                is_infected=bool(result.get('is_infected')),
+                virus_name=result.get('virus_name'),
+                result=result,
+                scanned_at=datetime.utcnow()
+            ))
+            self.db.commit()
+        except IntegrityError:
+            # The same content was scanned concurrently; either verdict will do
+            self.db.rollback()
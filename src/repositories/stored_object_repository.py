@@ -0,0 +1,129 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from .base_repository import BaseRepo
+from entities.stored_object import StoredObject
+from entities.file import File
+from constants.upload_state import UploadState
+from typing import Callable, Optional, Tuple
+from collections import Counter
+
+
+class StoredObjectRepo(BaseRepo[StoredObject]):
+    def __init__(self, db: Session) -> None:
+        super().__init__(StoredObject, db)
+
+    def _locked(self, path: str) -> Optional[StoredObject]:
+        return self.db.query(self.model).filter(self.model.path == path).with_for_update().first()
+
+    def acquire(self, path: str, content_sha256: str, size: int, celery_task_id: str) -> Tuple[StoredObject, bool]:
+        """
+        Add a reference to the object at `path`.
+
+        :return: The stored object and whether it must be uploaded, i.e. no file
+                 referenced it yet or the upload storing it failed. `celery_task_id`
+                 is recorded in that case.
+        """
+        for _ in range(2):
+            try:
+                stored = self._locked(path)
+                created = stored is None or stored.ref_count <= 0 or self._upload_failed(stored.celery_task_id)
+                if stored is None:
+                    stored = StoredObject(path=path, content_sha256=content_sha256, size=size, ref_count=0)
+                    self.db.add(stored)
+                if created:
+                    stored.celery_task_id = celery_task_id
+                stored.ref_count += 1
+                self.db.commit()
+                return stored, created
+            except IntegrityError:
+                # Another upload of the same content inserted the row first: reference it instead
+                self.db.rollback()
+        raise RuntimeError(f"Could not reference stored object {path}")
+
+    def _upload_failed(self, celery_task_id: Optional[str]) -> bool:
+        state = (
+            self.db
+            .query(File.upload_state)
+            .filter(File.celery_task_id == celery_task_id)
+            .limit(1)
+            .scalar()
+        )
+        return state == UploadState.failed.value
+
+    def release(self, path: str) -> bool:
+        """
+        Drop a reference to the object at `path`.
+
+        :return: True when no file references the object any more and it should be
+                 removed from storage, including objects that are not reference-counted.
+        """
+        stored = self._locked(path)
+        if stored is None:
+            self.db.rollback()
+            return True
+        stored.ref_count -= 1
+        unreferenced = stored.ref_count <= 0
+        if unreferenced:
+            self.db.delete(stored)
+        self.db.commit()
+        return unreferenced
+
+    def release_many(self, paths: list[str]) -> list[str]:
+        """
+        Drop one reference to the object at each of `paths` (a path may repeat)
+        with a single locking query. Nothing is committed: the caller commits the
+        released references together with deleting the files that held them.
+
+        Unreferenced rows are kept at a zero count, for `remove_unreferenced` to
+        remove them with their objects once that commit succeeded.
+
+        :return: The distinct paths no file references any more, including objects
+                 that are not reference-counted.
+        """
+        references = Counter(paths)
+        if not references:
+            return []
+        stored_objects = {
+            stored.path: stored
+            for stored in self.db.query(self.model).filter(self.model.path.in_(references)).with_for_update()
+        }
+        unreferenced = []
+        for path, count in references.items():
+            stored = stored_objects.get(path)
+            if stored is not None:
+                stored.ref_count -= count
+                if stored.ref_count > 0:
+                    continue
+            unreferenced.append(path)
+        return unreferenced
+
+    def remove_unreferenced(self, paths: list[str], remove_objects: Callable[[list[str]], list[str]]) -> list[str]:
+        """
+        Remove the objects at `paths` that are still unreferenced with
+        `remove_objects`, which returns the paths it failed to remove, then their rows.
+
+        The rows stay locked while the objects are removed: an `acquire` of the same
+        content either referenced the object again first, and it is kept, or waits
+        and uploads it anew.
+
+        :return: The paths removed.
+        """
+        if not paths:
+            return []
+        try:
+            stored_objects = {
+                stored.path: stored
+                for stored in self.db.query(self.model).filter(self.model.path.in_(paths)).with_for_update()
+            }
+            unreferenced = [path for path in paths
+                            if path not in stored_objects or stored_objects[path].ref_count <= 0]
+            failed = set(remove_objects(unreferenced))
+            removed = [path for path in unreferenced if path not in failed]
+            for path in removed:
+                if path in stored_objects:
+                    self.db.delete(stored_objects[path])
+            self.db.commit()
+            return removed
+        except Exception:
+            self.db.rollback()
+            raise
@@ -1,6 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from .base_repository import BaseRepo
 from entities.user import User
+from entities.appointment import Appointment
+from entities.file import File
 from typing import List
 
 
@@ -18,8 +20,20 @@ class UserRepo(BaseRepo[User]):
     def list_users(self) -> List[User]:
         return self.db.query(self.model).all()
 
+    def get_with_files(self, user_id: str) -> User:
+        """
+        Get a user with their appointments and files loaded for a cascade delete,
+        reading only the keys the cascade and the stored object removal need.
+        """
+        return (self.db.query(self.model)
+                .options(selectinload(self.model.files).load_only(File.id, File.path, File.appointment_id, File.user_id),
+                         selectinload(self.model.appointments).load_only(Appointment.id, Appointment.user_id)
+                         .selectinload(Appointment.files).load_only(File.id, File.path, File.appointment_id, File.user_id))
+                .filter(self.model.id == user_id).first())
+
     def delete_user(self, user_id: str) -> User:
-        user = self.get(id=user_id)
+        # The cascade deletes the files loaded here, without reading their other columns
+        user = self.get_with_files(user_id)
         if user:
             self.db.delete(user)
             self.db.commit()
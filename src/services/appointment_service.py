@@ -1,8 +1,10 @@
 from repositories.appointment_repository import AppointmentRepo
 from services.base_service import BaseService
 from dto.appointment_dto import AppointmentCreate, Appointment
-from typing import List
+from typing import List, Optional
 from infrastructure.minio import minioStorage
+from repositories.stored_object_repository import StoredObjectRepo
+from tasks.file_delete_task import delete_files_task
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,21 +29,31 @@ class AppointmentService(BaseService[AppointmentRepo]):
 
     def delete_appointment(self, appointment_id: str) -> Appointment:
         # First get the appointment to access its files
-        appointment = self.repo.get(id=appointment_id)
+        appointment = self.repo.get_with_files(appointment_id)
         if not appointment:
             return None
-            
-        # Delete all files associated with this appointment
+
+        # Drop the cached download URLs of its files
         for file in appointment.files:
-            try:
-                # Delete from MinIO
-                bucket_name = file.path.split("/")[0]
-                object_name = "/".join(file.path.split("/")[1:])
-                minioStorage.remove_object(bucket_name, object_name)
-                logger.info(f"Deleted file from MinIO: {bucket_name}/{object_name}")
-            except Exception as e:
-                logger.error(f"Failed to delete file from MinIO: {str(e)}")
-                # Continue with deletion even if MinIO deletion fails
-        
-        # Delete the appointment (cascade will delete associated files from DB)
-        return self.repo.delete_appointment(appointment_id) 
\ No newline at end of file
+            minioStorage.url_cache.pop(file.id)
+        # Objects are kept while other files still reference the content-addressed object
+        stored_objects = StoredObjectRepo(db=self.repo.db)
+        paths = stored_objects.release_many([file.path for file in appointment.files])
+
+        # Delete the appointment (cascade will delete associated files from DB),
+        # committing the released references with it
+        deleted = self.repo.delete_appointment(appointment_id)
+
+        # Only then remove the objects no file references any more, 1000 per MinIO request
+        try:
+            removed = stored_objects.remove_unreferenced(paths, minioStorage.remove_objects)
+            logger.info(f"Deleted {len(removed)} objects of appointment {appointment_id} from MinIO")
+        except Exception as e:
+            logger.error(f"Failed to delete files from MinIO: {str(e)}")
+        return deleted
+
+    def delete_appointment_in_background(self, appointment_id: str) -> Optional[str]:
+        """Queue the deletion of the appointment and its files; returns the ID of the task reporting its progress"""
+        if not self.repo.get(id=appointment_id):
+            return None
+        return delete_files_task.apply_async(kwargs={"appointment_id": appointment_id}).id
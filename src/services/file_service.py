@@ -1,85 +1,424 @@
 from repositories.file_repository import FileRepo
-from dto.file_dto import UploadFileDTO, UploadChunkDTO, RetryUploadFileDTO
-from typing import Dict, Any, Optional
+from repositories.scan_result_repository import ScanResultRepo
+from repositories.stored_object_repository import StoredObjectRepo
+from dto.file_dto import UploadFileDTO, UploadChunkDTO, RetryUploadFileDTO, UploadInitDTO, UploadSessionDTO, FileListQueryDTO, SignFilesDTO, UploadStatusBatchDTO, DeleteFilesDTO, UploadManifestDTO, UploadedChunkDTO, UploadSingleDTO
+from typing import Dict, Any, Optional, AsyncIterator
 from entities.file import File
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
 import os
+import json
+import shutil
+import hashlib
 import aiofiles
 from fastapi.exceptions import RequestValidationError
+from starlette.concurrency import run_in_threadpool
 from constants.errors import ValidatonErrors
 from infrastructure.minio import minioStorage
+from infrastructure.db.mysql import mysql
 from dto.file_dto import FileBaseDTO
 from services.base_service import BaseService
 from exceptions.http_exception import PermissionException, FileNotFoundException, FileUploadedException, FilePendingUploadException
 from exceptions.virus_exception import VirusDetectedException, VirusScanException
 from tasks.file_upload_task import upload_file_task
+from tasks.direct_upload_task import finalize_direct_upload_task
+from tasks.file_delete_task import delete_files_task
 import uuid
+import asyncio
+from functools import partial
 from core.config import config
-from celery.result import AsyncResult
 from tasks import celery
-from constants.upload_stauts import UploadStatus
+from constants.upload_mode import UploadMode
+from constants.upload_state import UploadState, TERMINAL_UPLOAD_STATES
+from constants.file_listing import FileSortField
 from infrastructure.virus_scanner import virus_scanner
+from infrastructure.chunk_assembler import assemble_chunks
+from infrastructure.content_hash import content_hasher
+from infrastructure.upload_manifest import create_manifest, record_chunk, read_manifest, read_total_chunks, stored_chunk_sha256
+from infrastructure.checksum import parse_checksum, new_checksum
+from constants.checksum import ChecksumAlgorithm
 import logging
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta
 from urllib.parse import quote
+from utils import encode_cursor, decode_cursor
+from minio.helpers import MIN_PART_SIZE, MAX_PART_SIZE, MAX_MULTIPART_COUNT, MAX_MULTIPART_OBJECT_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Direct uploads are assembled by MinIO under this prefix of the private bucket and
+# only copied to their final location once the virus scan passed
+DIRECT_UPLOAD_PREFIX = "uploads"
+# Multipart upload state of a direct upload, kept in its upload directory
+DIRECT_SESSION_FILENAME = "direct_upload.json"
+# Prefix of content-addressed objects, stored as `{CAS_PREFIX}/{sha256}`
+CAS_PREFIX = "cas"
+# Chunk sizes computed from the declared file size are rounded up to a multiple of this
+CHUNK_SIZE_ALIGNMENT = 64 * 1024
+
 class FileService(BaseService[FileRepo]):
     def __init__(self, repo: FileRepo) -> None:
         super().__init__(repo=repo)
 
-    async def upload_initialize(self) -> str:
+    async def upload_initialize(self, payload: UploadInitDTO) -> UploadSessionDTO:
+        if payload.total_size is not None and payload.total_chunks is not None:
+            # With the size declared, the chunking is the server's choice
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'total_chunks'),
+                'msg': ValidatonErrors.TOTAL_SIZE_OR_CHUNKS,
+                'type': 'value_error'
+            }],
+                body={"total_size": payload.total_size, "total_chunks": payload.total_chunks})
+        if payload.total_size is not None and payload.total_size > MAX_MULTIPART_OBJECT_SIZE:
+            # Every upload ends up as one object in MinIO
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'total_size'),
+                'msg': ValidatonErrors.TOTAL_SIZE_TOO_LARGE,
+                'type': 'value_error'
+            }],
+                body={"total_size": payload.total_size})
+        chunk_size, total_chunks = self._plan_chunks(payload)
+        if payload.mode == UploadMode.direct and not 1 <= (total_chunks or 0) <= MAX_MULTIPART_COUNT:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'total_chunks'),
+                'msg': ValidatonErrors.DIRECT_TOTAL_CHUNKS,
+                'type': 'value_error'
+            }],
+                body={"total_chunks": total_chunks})
+
         upload_id = str(uuid.uuid4())
-        os.makedirs(os.path.join(
-            config.APP_UPLOAD_DIR, upload_id), exist_ok=True)
-        return upload_id
+        upload_dir = os.path.join(config.APP_UPLOAD_DIR, upload_id)
+        os.makedirs(upload_dir, exist_ok=True)
+        if payload.mode == UploadMode.direct:
+            # Creating the multipart upload and signing the part URLs talks to MinIO
+            return await run_in_threadpool(self._initialize_direct_upload, upload_id, upload_dir,
+                                           payload.content_type, chunk_size, total_chunks)
+        await run_in_threadpool(create_manifest, upload_dir, total_chunks, chunk_size)
+        return UploadSessionDTO(upload_id=upload_id, chunk_size=chunk_size, total_chunks=total_chunks,
+                                parallelism=self._parallelism(total_chunks))
+
+    def _plan_chunks(self, payload: UploadInitDTO) -> tuple[int, Optional[int]]:
+        """
+        Chunk size and number of chunks of an upload.
+
+        Without a declared `total_size`, the largest chunk accepted. Otherwise the file is
+        split in up to APP_UPLOAD_PARALLELISM chunks, to be sent at once, of at least
+        APP_MIN_CHUNK_SIZE: a small file takes one request and a huge one as few as the
+        largest chunk allows.
+        """
+        if payload.mode == UploadMode.direct:
+            # Parts go straight to MinIO: every part but the last must reach the S3
+            # minimum part size, a file must fit in MAX_MULTIPART_COUNT parts and no
+            # part may exceed the S3 maximum part size
+            smallest = MIN_PART_SIZE
+            fitting = -(-(payload.total_size or 0) // MAX_MULTIPART_COUNT)
+            fitting = -(-fitting // CHUNK_SIZE_ALIGNMENT) * CHUNK_SIZE_ALIGNMENT
+            largest = min(max(config.APP_MAX_CHUNK_SIZE, MIN_PART_SIZE, fitting), MAX_PART_SIZE)
+        else:
+            largest = config.APP_MAX_CHUNK_SIZE
+            smallest = min(config.APP_MIN_CHUNK_SIZE, largest)
+        if payload.total_size is None:
+            return largest, payload.total_chunks
+        chunk_size = -(-payload.total_size // config.APP_UPLOAD_PARALLELISM)
+        chunk_size = -(-chunk_size // CHUNK_SIZE_ALIGNMENT) * CHUNK_SIZE_ALIGNMENT
+        chunk_size = min(max(chunk_size, smallest), largest)
+        # An empty file is still sent as one (empty) chunk
+        return chunk_size, max(1, -(-payload.total_size // chunk_size))
+
+    def _parallelism(self, total_chunks: Optional[int]) -> int:
+        """Chunk requests a client should keep in flight"""
+        return max(1, min(config.APP_UPLOAD_PARALLELISM, total_chunks or config.APP_UPLOAD_PARALLELISM))
 
-    async def upload_chunk(self, payload: UploadChunkDTO) -> None:
+    def _initialize_direct_upload(self, upload_id: str, upload_dir: str, content_type: Optional[str],
+                                  chunk_size: int, total_chunks: int) -> UploadSessionDTO:
+        bucket = minioStorage.private_bucket
+        object_name = f"{DIRECT_UPLOAD_PREFIX}/{upload_id}"
+        s3_upload_id = minioStorage.create_multipart_upload(
+            bucket, object_name, content_type=content_type or "application/octet-stream")
+        with open(os.path.join(upload_dir, DIRECT_SESSION_FILENAME), "w") as session_file:
+            json.dump({"bucket": bucket, "object_name": object_name, "s3_upload_id": s3_upload_id,
+                       "chunk_size": chunk_size, "completed": False}, session_file)
+
+        expires = timedelta(seconds=config.MINIO_PART_URL_EXPIRY)
+        part_urls = [
+            minioStorage.get_presigned_url(
+                method="PUT",
+                bucket_name=bucket,
+                object_name=object_name,
+                expires=expires,
+                extra_query_params={"uploadId": s3_upload_id, "partNumber": str(part_number)},
+            )
+            for part_number in range(1, total_chunks + 1)
+        ]
+        logger.info(f"Direct upload {upload_id} initialized with {total_chunks} parts of {chunk_size} bytes")
+        return UploadSessionDTO(
+            upload_id=upload_id,
+            chunk_size=chunk_size,
+            mode=UploadMode.direct,
+            part_urls=part_urls,
+            total_chunks=total_chunks,
+            parallelism=self._parallelism(total_chunks),
+        )
+
+    async def _cached_scan_result(self, content_sha256: str, signature_version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Scan result of identical content under the current signatures, if it was scanned before"""
+        if not config.SCAN_CACHE_ENABLED or not signature_version:
+            return None
+        key = (content_sha256, signature_version)
+        result = virus_scanner.result_cache.get(key)
+        if result is None:
+            scanned_after = datetime.utcnow() - timedelta(seconds=config.SCAN_CACHE_TTL)
+            row = await mysql.run(ScanResultRepo(db=self.repo.db).get_result, content_sha256, signature_version, scanned_after)
+            if row is None:
+                return None
+            result = row.result
+            virus_scanner.result_cache.set(key, result)
+        return {**result, 'cached': True}
+
+    async def _cache_scan_result(self, content_sha256: str, signature_version: Optional[str], scan_result: Dict[str, Any]) -> None:
+        # Only definitive verdicts are reused; errors, disabled and oversized scans are not
+        if not config.SCAN_CACHE_ENABLED or not signature_version or scan_result.get('scan_result') not in ('OK', 'FOUND'):
+            return
+        virus_scanner.result_cache.set((content_sha256, signature_version), scan_result)
+        try:
+            await mysql.run(ScanResultRepo(db=self.repo.db).save_result, content_sha256, signature_version, scan_result)
+        except Exception as e:
+            logger.warning(f"Failed to store scan result for {content_sha256}: {str(e)}")
+
+    def _load_direct_session(self, upload_path: str) -> Optional[Dict[str, Any]]:
+        session_path = os.path.join(upload_path, DIRECT_SESSION_FILENAME)
+        if not os.path.exists(session_path):
+            return None
+        with open(session_path) as session_file:
+            return json.load(session_file)
+
+    async def _complete_direct_upload(self, upload_path: str, session: Dict[str, Any], payload: UploadFileDTO) -> File:
+        """
+        Complete the multipart upload of a direct upload in MinIO and queue its scan.
+
+        The object is never read back through the API: the file is created with a pending
+        scan, and `finalize_direct_upload_task` scans the staging object in the worker before
+        moving it to its final location.
+        """
+        bucket, object_name = session["bucket"], session["object_name"]
+        if not session["completed"]:
+            parts = await run_in_threadpool(minioStorage.list_parts, bucket, object_name, session["s3_upload_id"])
+            if [part.part_number for part in parts] != list(range(1, payload.total_chunks + 1)):
+                raise FileNotFoundError(f"Missing parts for direct upload {payload.upload_id}")
+            await run_in_threadpool(minioStorage.complete_multipart_upload,
+                                    bucket, object_name, session["s3_upload_id"], parts)
+            # A retried upload_complete must not complete the multipart upload twice
+            session["completed"] = True
+            with open(os.path.join(upload_path, DIRECT_SESSION_FILENAME), "w") as session_file:
+                json.dump(session, session_file)
+
+        final_bucket = minioStorage.private_bucket if payload.credential else minioStorage.public_bucket
+        filename = f"{payload.upload_id}.{payload.file_extension.value}"
+        celery_task_id = str(uuid.uuid4())
+        file = await mysql.run(self.repo.create_file, FileBaseDTO(
+            upload_id=payload.upload_id,
+            path=f"{final_bucket}/{filename}",
+            content_type=payload.content_type,
+            detail=payload.detail,
+            size=payload.total_size,
+            credential=payload.credential,
+            celery_task_id=celery_task_id,
+            appointment_id=payload.appointment_id,
+            user_id=payload.user_id,
+            filename=payload.filename,
+        ))
+        try:
+            finalize_direct_upload_task.apply_async(kwargs=dict(
+                bucket=final_bucket,
+                filename=filename,
+                staging_bucket=bucket,
+                staging_object=object_name,
+                original_filename=payload.filename,
+            ), task_id=celery_task_id)
+        except Exception:
+            await mysql.run(self.repo.set_upload_state, celery_task_id, UploadState.failed.value)
+            raise
+        logger.info(f"Queued scan of direct upload {payload.upload_id} with task {celery_task_id}")
+        # Nothing of a direct upload is left on local disk
+        shutil.rmtree(upload_path, ignore_errors=True)
+        return file
+
+    async def upload_chunk(self, payload: UploadChunkDTO) -> int:
+        """Store a chunk of an upload and return its size"""
         upload_dir = os.path.join(config.APP_UPLOAD_DIR, payload.upload_id)
+        if not os.path.isdir(upload_dir):
+            raise FileNotFoundError(f"Upload directory not found for upload_id: {payload.upload_id}")
+
+        # Reject early when the multipart parser already knows the chunk is too big
+        if payload.file.size is not None and payload.file.size > config.APP_MAX_CHUNK_SIZE:
+            self._raise_chunk_too_large()
+        expected = self._parse_chunk_checksum(payload.checksum) if payload.checksum else None
+        total_chunks = await run_in_threadpool(read_total_chunks, upload_dir)
+        if payload.chunk_index < 0 or (total_chunks is not None and payload.chunk_index >= total_chunks):
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'chunk_index'),
+                'msg': ValidatonErrors.CHUNK_INDEX_OUT_OF_RANGE,
+                'type': 'value_error'
+            }],
+                body={"chunk_index": payload.chunk_index, "total_chunks": total_chunks})
+
         chunk_path = os.path.join(upload_dir, f"{payload.chunk_index}.part")
-        async with aiofiles.open(chunk_path, "wb") as chunk_file:
-            content = await payload.file.read()
-            if len(content) > config.APP_MAX_CHUNK_SIZE:
+        # Write to a temporary file of this request and link it in place once complete,
+        # so a rejected or interrupted chunk never leaves a half-written .part file
+        # behind and concurrent requests for the same chunk never share a file
+        temp_path = f"{chunk_path}.{uuid.uuid4().hex}.tmp"
+        written = 0
+        # Checksums of the chunk by algorithm, computed while it streams to disk
+        checksums = {ChecksumAlgorithm.sha256: hashlib.sha256()}
+        if expected:
+            checksums.setdefault(expected[0], new_checksum(expected[0]))
+        # Running SHA-256 of the upload when this is the next chunk in order, None otherwise
+        digest = content_hasher.chunk_digest(payload.upload_id, payload.chunk_index)
+        try:
+            async with aiofiles.open(temp_path, "wb") as chunk_file:
+                while True:
+                    block = await payload.file.read(config.APP_STREAM_BLOCK_SIZE)
+                    if not block:
+                        break
+                    written += len(block)
+                    if written > config.APP_MAX_CHUNK_SIZE:
+                        self._raise_chunk_too_large()
+                    for checksum in checksums.values():
+                        checksum.update(block)
+                    if digest is not None:
+                        digest.update(block)
+                    await chunk_file.write(block)
+            hexdigests = {algorithm.value: checksum.hexdigest() for algorithm, checksum in checksums.items()}
+            if expected and hexdigests[expected[0].value] != expected[1]:
                 raise RequestValidationError(errors=[{
-                    'loc': ('body', 'file'),
-                    'msg': ValidatonErrors.LE_CHUNCK_SIZE,
+                    'loc': ('body', 'checksum'),
+                    'msg': ValidatonErrors.CHECKSUM_MISMATCH,
                     'type': 'value_error'
                 }],
-                    body={"file": "invalid_size"})
-            await chunk_file.write(content)
+                    body={"checksum": payload.checksum, "chunk_index": payload.chunk_index})
+            try:
+                # Unlike a rename, linking never replaces a stored chunk: the first
+                # complete copy wins, and chunks hashed or scanned already stay as they were
+                os.link(temp_path, chunk_path)
+            except FileExistsError:
+                await self._check_duplicate_chunk(upload_dir, payload.chunk_index, hexdigests)
+            await run_in_threadpool(record_chunk, upload_dir, payload.chunk_index, written, hexdigests)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        content_hasher.chunk_stored(payload.upload_id, payload.chunk_index, digest)
+        # Hash chunks that arrived before this one out of order
+        await run_in_threadpool(content_hasher.advance, payload.upload_id, upload_dir)
+        # With the clamd backend, scanning proceeds while the remaining chunks upload
+        await virus_scanner.feed_upload(payload.upload_id, upload_dir)
+        return written
 
-    async def _assemble_chunks_for_scanning(self, upload_path: str, total_chunks: int) -> str:
-        """Assemble chunks into a single file for virus scanning"""
-        assembled_file_path = os.path.join(upload_path, "assembled_for_scan")
-        
+    async def upload_single(self, payload: UploadSingleDTO) -> File:
+        """
+        Upload a small file in one request: it is stored as the only chunk of a new
+        upload, which is completed right away. Files larger than a chunk are rejected
+        like an oversized chunk and go through `upload/init` instead.
+        """
+        session = await self.upload_initialize(UploadInitDTO(total_chunks=1))
         try:
-            with open(assembled_file_path, "wb") as assembled_file:
-                for i in range(total_chunks):
-                    chunk_path = os.path.join(upload_path, f"{i}.part")
-                    if not os.path.exists(chunk_path):
-                        raise FileNotFoundError(f"Missing chunk {i} for upload")
-                    
-                    with open(chunk_path, "rb") as chunk_file:
-                        assembled_file.write(chunk_file.read())
-            
-            logger.info(f"Assembled {total_chunks} chunks into {assembled_file_path}")
-            return assembled_file_path
-            
-        except Exception as e:
-            logger.error(f"Failed to assemble chunks: {str(e)}")
-            # Clean up partial file if it exists
-            if os.path.exists(assembled_file_path):
-                os.remove(assembled_file_path)
+            size = await self.upload_chunk(UploadChunkDTO(
+                chunk_size=payload.file.size or 0, file=payload.file, upload_id=session.upload_id,
+                chunk_index=0, checksum=payload.checksum))
+            return await self.upload_complete(UploadFileDTO(
+                upload_id=session.upload_id, total_chunks=1, total_size=size, size=size,
+                **payload.model_dump(exclude={"file", "checksum"})))
+        except BaseException:
+            # The client never learns the upload_id, so a failed upload cannot be resumed
+            content_hasher.discard(session.upload_id)
+            await run_in_threadpool(partial(shutil.rmtree, os.path.join(config.APP_UPLOAD_DIR, session.upload_id), ignore_errors=True))
             raise
 
+    async def _check_duplicate_chunk(self, upload_dir: str, chunk_index: int, hexdigests: Dict[str, str]) -> None:
+        """
+        A chunk sent again, when retried after a lost response or by a resumed
+        upload, is accepted only with the content stored already.
+        """
+        stored_sha256 = await run_in_threadpool(stored_chunk_sha256, upload_dir, chunk_index)
+        if stored_sha256 != hexdigests[ChecksumAlgorithm.sha256.value]:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'file'),
+                'msg': ValidatonErrors.CHUNK_CONFLICT,
+                'type': 'value_error'
+            }],
+                body={"chunk_index": chunk_index})
+
+    async def get_upload_chunks(self, upload_id: str) -> UploadManifestDTO:
+        """
+        The chunks of an upload received so far, for clients resuming an interrupted
+        upload to send only the missing ones.
+
+        :raises FileNotFoundError: If the upload does not exist (any more).
+        """
+        upload_dir = os.path.join(config.APP_UPLOAD_DIR, upload_id)
+        if not os.path.isdir(upload_dir):
+            raise FileNotFoundError(f"Upload directory not found for upload_id: {upload_id}")
+        direct_session = self._load_direct_session(upload_dir)
+        if direct_session:
+            # The parts went straight to MinIO, which keeps the record
+            parts = await run_in_threadpool(minioStorage.list_parts, direct_session["bucket"],
+                                            direct_session["object_name"], direct_session["s3_upload_id"])
+            received = [UploadedChunkDTO(index=part.part_number - 1, size=part.size) for part in parts]
+            return UploadManifestDTO(upload_id=upload_id, mode=UploadMode.direct, received=received,
+                                     chunk_size=direct_session.get("chunk_size", max(config.APP_MAX_CHUNK_SIZE, MIN_PART_SIZE)))
+        manifest = await run_in_threadpool(read_manifest, upload_dir)
+        received = [UploadedChunkDTO(index=index, **chunk) for index, chunk in manifest["chunks"].items()]
+        missing = None
+        if manifest["total_chunks"] is not None:
+            missing = [index for index in range(manifest["total_chunks"]) if index not in manifest["chunks"]]
+        return UploadManifestDTO(upload_id=upload_id, total_chunks=manifest["total_chunks"],
+                                 chunk_size=manifest["chunk_size"], received=received, missing=missing)
+
+    def _parse_chunk_checksum(self, checksum: str) -> tuple[ChecksumAlgorithm, str]:
+        try:
+            algorithm, digest = parse_checksum(checksum)
+        except ValueError:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'checksum'),
+                'msg': ValidatonErrors.INVALID_CHECKSUM,
+                'type': 'value_error'
+            }],
+                body={"checksum": checksum})
+        return algorithm, digest
+
+    async def _check_chunks_received(self, upload_path: str, total_chunks: int) -> None:
+        """Chunks may arrive in any order and concurrently; all of them must be stored before completing"""
+        manifest = await run_in_threadpool(read_manifest, upload_path)
+        if manifest["total_chunks"] is not None and manifest["total_chunks"] != total_chunks:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'total_chunks'),
+                'msg': ValidatonErrors.TOTAL_CHUNKS_MISMATCH,
+                'type': 'value_error'
+            }],
+                body={"total_chunks": total_chunks, "declared": manifest["total_chunks"]})
+        missing = [index for index in range(total_chunks) if index not in manifest["chunks"]]
+        if missing:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'total_chunks'),
+                'msg': ValidatonErrors.MISSING_CHUNKS,
+                'type': 'value_error'
+            }],
+                body={"total_chunks": total_chunks, "missing": missing})
+
+    def _raise_chunk_too_large(self) -> None:
+        raise RequestValidationError(errors=[{
+            'loc': ('body', 'file'),
+            'msg': ValidatonErrors.LE_CHUNCK_SIZE,
+            'type': 'value_error'
+        }],
+            body={"file": "invalid_size"})
+
     async def upload_complete(self, payload: UploadFileDTO) -> File:
         assembled_file_path = None
         try:
             logger.info(f"Starting upload_complete for upload_id: {payload.upload_id}")
 
             # First, check if a file record with this upload_id already exists (idempotency)
-            existing_file = self.repo.db.query(File).filter(File.upload_id == payload.upload_id).first()
+            existing_file = await mysql.run(self.repo.get_file_by_upload_id, payload.upload_id)
             if existing_file:
                 logger.warning(f"File with upload_id {payload.upload_id} already exists. Returning existing file record.")
                 return existing_file
@@ -90,11 +429,30 @@ class FileService(BaseService[FileRepo]):
                 logger.error(f"Upload directory not found: {upload_path}")
                 raise FileNotFoundError(f"Upload directory not found for upload_id: {payload.upload_id}")
 
-            # Assemble chunks for virus scanning
-            assembled_file_path = await self._assemble_chunks_for_scanning(upload_path, payload.total_chunks)
-            
-            # VIRUS SCAN - Scan the assembled file
-            scan_result = await virus_scanner.scan_file(assembled_file_path)
+            direct_session = self._load_direct_session(upload_path)
+            if direct_session:
+                # Parts were uploaded by the client straight to MinIO
+                return await self._complete_direct_upload(upload_path, direct_session, payload)
+
+            await self._check_chunks_received(upload_path, payload.total_chunks)
+            # Finish the hash computed while chunks were ingested
+            content_sha256 = await run_in_threadpool(
+                content_hasher.hexdigest, payload.upload_id, upload_path, payload.total_chunks)
+            signature_version = await virus_scanner.signature_version()
+            scan_result = await self._cached_scan_result(content_sha256, signature_version)
+            if scan_result:
+                logger.info(f"Reusing scan result of identical content for {payload.upload_id}")
+                await virus_scanner.discard_upload(payload.upload_id)
+            else:
+                if not config.MINIO_STREAM_CHUNKS:
+                    # Assemble chunks once; the same file is scanned and then handed to the Celery task.
+                    # Assembly is blocking disk I/O, so keep it off the event loop.
+                    assembled_file_path = await run_in_threadpool(assemble_chunks, upload_path, payload.total_chunks)
+
+                # VIRUS SCAN - Finish the incremental clamd scan, or scan the whole upload
+                scan_result = await virus_scanner.scan_upload(
+                    payload.upload_id, upload_path, payload.total_chunks, payload.filename)
+                await self._cache_scan_result(content_sha256, signature_version, scan_result)
             logger.info(f"Virus scan result for {payload.upload_id}: {scan_result}")
             
             # Initialize virus scan fields
@@ -128,6 +486,7 @@ class FileService(BaseService[FileRepo]):
                     credential=payload.credential,
                     detail=payload.detail,
                     celery_task_id="",  # No Celery task for infected files
+                    upload_state=UploadState.failed.value,
                     virus_scan_status=virus_scan_status,
                     virus_scan_result=scan_result,
                     virus_scan_date=virus_scan_date,
@@ -135,7 +494,7 @@ class FileService(BaseService[FileRepo]):
                     quarantine_reason=quarantine_reason
                 )
                 
-                file = self.repo.create_file(file_dto)
+                file = await mysql.run(self.repo.create_file, file_dto)
                 
                 # Raise exception to prevent further processing
                 raise VirusDetectedException(
@@ -167,20 +526,40 @@ class FileService(BaseService[FileRepo]):
                 bucket = minioStorage.private_bucket
 
             filename = f"{payload.upload_id}.{payload.file_extension.value}"
+            stored_object = None
+            if config.STORAGE_CONTENT_ADDRESSED and content_sha256 and not is_quarantined:
+                # Identical content is stored once and shared by reference
+                filename = f"{CAS_PREFIX}/{content_sha256}"
+                stored_object, must_upload = await mysql.run(
+                    StoredObjectRepo(db=self.repo.db).acquire, f"{bucket}/{filename}", content_sha256,
+                    payload.total_size, celery_task_id=str(uuid.uuid4()))
             logger.info(f"Creating Celery task for bucket: {bucket}, filename: {filename}")
 
-            # Create Celery task (only if not quarantined)
+            # Create Celery task (only if not quarantined). The task is queued once the file row
+            # exists, so the state updates made by the worker always find it.
             celery_task_id = ""
-            if not is_quarantined:
-                celery_task = upload_file_task.delay(
+            upload_state = UploadState.queued.value
+            enqueue = None
+            if stored_object and not must_upload:
+                # The content is already stored (or being stored): share its task and skip the upload
+                celery_task_id = stored_object.celery_task_id
+                upload_state = await mysql.run(self.repo.get_upload_state_by_task, celery_task_id) or upload_state
+                logger.info(f"Upload {payload.upload_id} references existing object {bucket}/{filename}")
+                await virus_scanner.discard_upload(payload.upload_id)
+                shutil.rmtree(upload_path, ignore_errors=True)
+                assembled_file_path = None
+            elif not is_quarantined:
+                celery_task_id = stored_object.celery_task_id if stored_object else str(uuid.uuid4())
+                enqueue = partial(upload_file_task.apply_async, kwargs=dict(
                     bucket=bucket,
                     upload_id=payload.upload_id,
                     total_chunks=payload.total_chunks,
                     filename=filename,
                     content_type=payload.content_type,
-                )
-                celery_task_id = celery_task.id
-                logger.info(f"Celery task created with ID: {celery_task.id}")
+                ), task_id=celery_task_id)
+            else:
+                # Quarantined after a scan error: never stored
+                upload_state = UploadState.failed.value
 
             # Create file record in database with scan results
             file_dto = FileBaseDTO(
@@ -194,22 +573,41 @@ class FileService(BaseService[FileRepo]):
                 appointment_id=payload.appointment_id,
                 user_id=payload.user_id,
                 filename=payload.filename,
+                upload_state=upload_state,
                 virus_scan_status=virus_scan_status,
                 virus_scan_result=scan_result,
                 virus_scan_date=virus_scan_date,
                 is_quarantined=is_quarantined,
-                quarantine_reason=quarantine_reason
+                quarantine_reason=quarantine_reason,
+                content_sha256=content_sha256
             )
             logger.info(f"Creating file record with DTO: {file_dto}")
 
-            file = self.repo.create_file(file_dto)
+            try:
+                file = await mysql.run(self.repo.create_file, file_dto)
+            except Exception:
+                if stored_object:
+                    await mysql.run(StoredObjectRepo(db=self.repo.db).release, file_dto.path)
+                raise
             logger.info(f"File record created successfully with ID: {file.id}")
+
+            if enqueue:
+                try:
+                    enqueue()
+                except Exception:
+                    await mysql.run(self.repo.set_upload_state, celery_task_id, UploadState.failed.value)
+                    raise
+                logger.info(f"Celery task created with ID: {celery_task_id}")
+                # The task now owns the assembled file and removes it after storing it
+                assembled_file_path = None
             
             return file
 
         except VirusDetectedException:
             # Re-raise virus exceptions
             raise
+        except RequestValidationError:
+            raise
         except FileNotFoundError:
             # Re-raise FileNotFoundError as is
             raise
@@ -238,13 +636,26 @@ class FileService(BaseService[FileRepo]):
         safe_filename = file.filename or object_name
         disposition = f"{disposition_type}; filename=\"{safe_filename}\"; filename*=UTF-8''{quote(safe_filename)}"
 
+        if file.credential:
+            # Ensure credential values are strings for signing
+            for key, value in file.credential.items():
+                if not isinstance(value, str):
+                    file.credential[key] = str(value)
+
+        # A cached URL is reused only if it was signed for the same disposition and credential
+        fingerprint = (disposition, self._credential_hash(file.credential))
+        cached = minioStorage.url_cache.get(file.id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
         if not file.credential:
             # Prefer presigned URL (for filename headers). Fallback to direct HTTPS URL if signing fails.
             try:
-                return minioStorage.get_presigned_url(
+                url = minioStorage.get_presigned_url(
                     method="GET",
                     bucket_name=bucket_name,
                     object_name=object_name,
+                    expires=timedelta(seconds=config.DOWNLOAD_URL_EXPIRY),
                     response_headers={"response-content-disposition": disposition},
                 )
             except Exception as e:
@@ -252,18 +663,48 @@ class FileService(BaseService[FileRepo]):
                 # Fallback to direct external URL (no Content-Disposition control)
                 return f"https://{config.MINIO_EXTERNAL_ENDPOINT}/{bucket_name}/{object_name}"
         else:
-            # Ensure credential values are strings for signing
-            for key, value in file.credential.items():
-                if not isinstance(value, str):
-                    file.credential[key] = str(value)
             # For private files, presign is required; let exceptions bubble up to surface the error
-            return minioStorage.get_presigned_url(
+            url = minioStorage.get_presigned_url(
                 method="GET",
                 bucket_name=bucket_name,
                 object_name=object_name,
+                expires=timedelta(seconds=config.DOWNLOAD_URL_EXPIRY),
                 response_headers={"response-content-disposition": disposition},
                 extra_query_params=file.credential,
             )
+        minioStorage.url_cache.set(file.id, (fingerprint, url))
+        return url
+
+    def _credential_hash(self, credential: Optional[Dict[str, Any]]) -> str:
+        if not credential:
+            return ""
+        return hashlib.sha256(json.dumps(credential, sort_keys=True).encode()).hexdigest()
+
+    async def sign_files(self, payload: SignFilesDTO) -> tuple[Dict[str, str], list[str], list[str]]:
+        """
+        Sign download URLs for a batch of files with a single query.
+
+        :return: URLs by file ID, then the IDs that do not exist and the IDs whose credential does not match.
+        """
+        file_ids = list(dict.fromkeys(payload.file_ids))
+        if not 0 < len(file_ids) <= config.APP_FILE_LIST_MAX_LIMIT:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'file_ids'),
+                'msg': ValidatonErrors.SIGN_BATCH_SIZE,
+                'type': 'value_error'
+            }],
+                body={"file_ids": len(file_ids)})
+        files = {file.id: file for file in await mysql.run(self.repo.get_files, file_ids)}
+        urls, not_found, forbidden = {}, [], []
+        for file_id in file_ids:
+            file = files.get(file_id)
+            if file is None:
+                not_found.append(file_id)
+            elif file.credential and payload.credential != file.credential:
+                forbidden.append(file_id)
+            else:
+                urls[file_id] = await self.get_download_link(file)
+        return urls, not_found, forbidden
 
     def _should_display_inline(self, content_type: Optional[str]) -> str:
         """Return 'inline' for content types we want to display in-browser, else 'attachment'."""
@@ -276,51 +717,245 @@ class FileService(BaseService[FileRepo]):
         return "attachment"
 
 
-    async def get_files_by_appointment(self, appointment_id: str) -> list[File]:
+    async def get_files_by_appointment(self, appointment_id: str, query: FileListQueryDTO) -> tuple[list[File], Optional[str]]:
         # In a real app, you'd validate the appointment name here
-        return self.repo.get_files_by_appointment(appointment_id)
+        after = self._cursor_position(query)
+        files = await mysql.run(self.repo.get_files_by_appointment, appointment_id, query, after)
+        return self._page(files, query, lambda file: file)
+
+    async def list_all_files(self, user_id: str, query: FileListQueryDTO) -> tuple[list[tuple], Optional[str]]:
+        after = self._cursor_position(query)
+        rows = await mysql.run(self.repo.list_all_files, user_id, query, after)
+        return self._page(rows, query, lambda row: row[0])
 
-    async def list_all_files(self, user_id: str) -> list[tuple]:
-        return self.repo.list_all_files(user_id)
+    def _page(self, rows: list, query: FileListQueryDTO, file_of) -> tuple[list, Optional[str]]:
+        """Trim the extra row fetched by the repository and build the cursor of the next page"""
+        if len(rows) <= query.limit:
+            return rows, None
+        rows = rows[:query.limit]
+        last = file_of(rows[-1])
+        value = getattr(last, query.sort.value)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        cursor = encode_cursor({"sort": query.sort.value, "order": query.order.value, "value": value, "id": last.id})
+        return rows, cursor
+
+    def _cursor_position(self, query: FileListQueryDTO) -> Optional[tuple[Any, str]]:
+        """Return the `(sort value, id)` position encoded in the query cursor"""
+        if not query.cursor:
+            return None
+        try:
+            payload = decode_cursor(query.cursor)
+            # A cursor only makes sense for the ordering it was issued for
+            if payload.get("sort") != query.sort.value or payload.get("order") != query.order.value:
+                raise ValueError("Cursor issued for another ordering")
+            value, last_id = payload["value"], payload["id"]
+            if query.sort == FileSortField.created_at:
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, str):
+                raise ValueError("Invalid cursor value")
+            return value, str(last_id)
+        except (ValueError, TypeError, KeyError):
+            raise RequestValidationError(errors=[{
+                'loc': ('query', 'cursor'),
+                'msg': ValidatonErrors.INVALID_CURSOR,
+                'type': 'value_error'
+            }],
+                body={"cursor": query.cursor})
 
     async def delete_file(self, file_id: str):
+        # DB lookups, the MinIO removal and the delete all block: run them off the event loop
+        return await mysql.run(self._delete_file, file_id)
+
+    def _delete_file(self, file_id: str):
         # First get the file record to extract MinIO path info
         file = self.repo.get_file(file_id)
         if file:
-            # Delete from MinIO
-            try:
-                bucket_name = file.path.split("/")[0]
-                object_name = "/".join(file.path.split("/")[1:])
-                minioStorage.remove_object(bucket_name, object_name)
-                logger.info(f"Deleted file from MinIO: {bucket_name}/{object_name}")
-            except Exception as e:
-                logger.error(f"Failed to delete file from MinIO: {str(e)}")
-                # Continue with DB deletion even if MinIO deletion fails
-            
-            # Delete from database
-            return self.repo.delete_file(file_id)
+            paths = self._release_stored_objects([file])
+            # Commits the released references together with the delete
+            deleted = self.repo.delete_file(file_id)
+            self._remove_unreferenced_objects(paths)
+            return deleted
         return None
+
+    async def delete_files(self, payload: DeleteFilesDTO) -> tuple[list[str], list[str]]:
+        """
+        Delete a batch of files, removing their objects with multi-object deletes.
+
+        :return: The deleted IDs, then the IDs that do not exist.
+        """
+        file_ids = list(dict.fromkeys(payload.file_ids))
+        if not 0 < len(file_ids) <= config.APP_FILE_DELETE_BATCH_SIZE:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'file_ids'),
+                'msg': ValidatonErrors.DELETE_BATCH_SIZE,
+                'type': 'value_error'
+            }],
+                body={"file_ids": len(file_ids)})
+        return await mysql.run(self._delete_files, file_ids)
+
+    def _delete_files(self, file_ids: list[str]) -> tuple[list[str], list[str]]:
+        files = self.repo.get_files(file_ids)
+        found = {file.id for file in files}
+        paths = self._release_stored_objects(files)
+        # Commits the released references together with the delete
+        self.repo.delete_files(list(found))
+        self._remove_unreferenced_objects(paths)
+        return [id for id in file_ids if id in found], [id for id in file_ids if id not in found]
+
+    def _release_stored_objects(self, files: list[File]) -> list[str]:
+        """Drop the references of `files` in the transaction deleting them; returns the objects left unreferenced"""
+        for file in files:
+            minioStorage.url_cache.pop(file.id)
+        # Content-addressed objects are only removed with their last reference
+        return StoredObjectRepo(db=self.repo.db).release_many([file.path for file in files])
+
+    def _remove_unreferenced_objects(self, paths: list[str]) -> None:
+        """Remove objects once the files referencing them are deleted; a failure leaves them behind"""
+        try:
+            removed = StoredObjectRepo(db=self.repo.db).remove_unreferenced(paths, minioStorage.remove_objects)
+            logger.info(f"Deleted {len(removed)} objects from MinIO")
+        except Exception as e:
+            logger.error(f"Failed to delete files from MinIO: {str(e)}")
+
+    async def delete_files_in_background(self, payload: DeleteFilesDTO) -> str:
+        """Queue the deletion of any number of files; returns the ID of the task reporting its progress"""
+        file_ids = list(dict.fromkeys(payload.file_ids))
+        if not file_ids:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'file_ids'),
+                'msg': ValidatonErrors.DELETE_BATCH_SIZE,
+                'type': 'value_error'
+            }],
+                body={"file_ids": 0})
+        task = await run_in_threadpool(partial(delete_files_task.apply_async, kwargs={"file_ids": file_ids}))
+        return task.id
+
+    async def get_delete_progress(self, task_id: str) -> Dict[str, Any]:
+        """State of a background delete with the `deleted` and `total` files reported so far"""
+        meta = await run_in_threadpool(celery.backend.get_task_meta, task_id)
+        progress = meta.get('result') if isinstance(meta.get('result'), dict) else {}
+        return {
+            "status": meta.get('status'),
+            "deleted": progress.get("deleted", 0),
+            "total": progress.get("total", 0),
+        }
+
     async def get_file(self, id: id, credential=Dict[str, Any]) -> File:
-        file = self.repo.get_file(id=id)
+        file = await mysql.run(self.repo.get_file, id=id)
         if file == None:
             raise FileNotFoundException
         if file.credential and credential != file.credential:
             raise PermissionException()
         return file
 
-    async def get_upload_status(self, file_id: str, credential=Dict[str, Any]) -> str:
+    async def get_upload_status(self, file_id: str, credential=Dict[str, Any]) -> UploadState:
+        file = await self.get_file(id=file_id, credential=credential)
+        # Kept on the row by the storage tasks: no result backend query
+        return UploadState(file.upload_state)
+
+    async def get_upload_statuses(self, payload: UploadStatusBatchDTO) -> tuple[Dict[str, UploadState], list[str], list[str]]:
+        """
+        Resolve the upload state of a batch of files with a single query.
+
+        :return: States by file ID, then the IDs that do not exist and the IDs whose credential does not match.
+        """
+        credentials = {entry.id: entry.credential for entry in payload.files}
+        if not 0 < len(credentials) <= config.APP_FILE_LIST_MAX_LIMIT:
+            raise RequestValidationError(errors=[{
+                'loc': ('body', 'files'),
+                'msg': ValidatonErrors.STATUS_BATCH_SIZE,
+                'type': 'value_error'
+            }],
+                body={"files": len(credentials)})
+        rows = {row[0]: row for row in await mysql.run(self.repo.get_upload_states, list(credentials))}
+        states, not_found, forbidden = {}, [], []
+        for file_id, credential in credentials.items():
+            row = rows.get(file_id)
+            if row is None:
+                not_found.append(file_id)
+            elif row[2] and credential != row[2]:
+                forbidden.append(file_id)
+            else:
+                states[file_id] = UploadState(row[1])
+        return states, not_found, forbidden
+
+    async def upload_state_events(self, file_id: str, credential=Dict[str, Any]) -> AsyncIterator[Optional[UploadState]]:
+        """
+        Stream the upload state of a file: the current state first, then every change
+        until it is stored or failed. `None` is yielded on polls without a change.
+        """
         file = await self.get_file(id=file_id, credential=credential)
-        result = AsyncResult(file.celery_task_id)
-        return result.state
+        # The stream outlives the request session: polls use their own sessions on its engine
+        return self._watch_upload_state(file.id, UploadState(file.upload_state), self.repo.db.get_bind())
+
+    async def _watch_upload_state(self, file_id: str, state: UploadState, bind: Engine) -> AsyncIterator[Optional[UploadState]]:
+        yield state
+        while state not in TERMINAL_UPLOAD_STATES:
+            await asyncio.sleep(config.UPLOAD_STATE_POLL_INTERVAL)
+            current = await mysql.run(self._read_upload_state, file_id, bind)
+            if current is None:
+                # The file was deleted
+                return
+            if current != state.value:
+                state = UploadState(current)
+                yield state
+            else:
+                yield None
+
+    def _read_upload_state(self, file_id: str, bind: Engine) -> Optional[str]:
+        # A short-lived session per poll, so each one reads a fresh snapshot
+        db = Session(bind=bind)
+        try:
+            return FileRepo(db=db).get_upload_state(file_id)
+        finally:
+            db.close()
 
     async def retry_upload(self, payload: RetryUploadFileDTO):
         file = await self.get_file(id=payload.id, credential=payload.credential)
-        result = AsyncResult(file.celery_task_id)
-        if result.status == UploadStatus.SUCCESS.value:
+        state = UploadState(file.upload_state)
+        if state == UploadState.stored:
             raise FileUploadedException()
-        if result.status == UploadStatus.PENDING.value or result.status == UploadStatus.STARTED.value:
+        if state != UploadState.failed or not file.celery_task_id:
             raise FilePendingUploadException()
-        meta = celery.backend.get_task_meta(file.celery_task_id)
-        upload_file_task.apply_async(
-            args=meta['args'], kwargs=meta['kwargs'], task_id=file.celery_task_id)
+        await mysql.run(self.repo.set_upload_state, file.celery_task_id, UploadState.queued.value)
+        try:
+            await run_in_threadpool(self._retry_task, file)
+        except Exception:
+            await mysql.run(self.repo.set_upload_state, file.celery_task_id, UploadState.failed.value)
+            raise
         return file
+
+    def _retry_task(self, file: File) -> None:
+        """
+        Queue the storage task of a failed upload again. Its arguments are rebuilt from
+        the row and the upload directory: a task whose queueing failed never reached
+        the result backend.
+        """
+        bucket, filename = file.path.split("/", 1)
+        upload_dir = os.path.join(config.APP_UPLOAD_DIR, file.upload_id)
+        direct_session = self._load_direct_session(upload_dir)
+        total_chunks = read_total_chunks(upload_dir)
+        if direct_session:
+            finalize_direct_upload_task.apply_async(kwargs=dict(
+                bucket=bucket,
+                filename=filename,
+                staging_bucket=direct_session["bucket"],
+                staging_object=direct_session["object_name"],
+                original_filename=file.filename,
+            ), task_id=file.celery_task_id)
+        elif total_chunks is not None:
+            upload_file_task.apply_async(kwargs=dict(
+                bucket=bucket,
+                upload_id=file.upload_id,
+                total_chunks=total_chunks,
+                filename=filename,
+                content_type=file.content_type,
+            ), task_id=file.celery_task_id)
+        else:
+            # Nothing left locally to rebuild them from (uploads from before the manifest,
+            # or direct uploads whose task failed): the task ran, so the backend has them
+            meta = celery.backend.get_task_meta(file.celery_task_id)
+            task = celery.tasks.get(meta.get('name')) or upload_file_task
+            task.apply_async(
+                args=meta['args'], kwargs=meta['kwargs'], task_id=file.celery_task_id)
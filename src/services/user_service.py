@@ -1,8 +1,10 @@
 from repositories.user_repository import UserRepo
 from services.base_service import BaseService
 from dto.user_dto import UserCreate, User
-from typing import List
+from typing import List, Optional
 from infrastructure.minio import minioStorage
+from repositories.stored_object_repository import StoredObjectRepo
+from tasks.file_delete_task import delete_files_task
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,22 +22,31 @@ class UserService(BaseService[UserRepo]):
 
     def delete_user(self, user_id: str) -> User:
         # First get the user to access its appointments and files
-        user = self.repo.get(id=user_id)
+        user = self.repo.get_with_files(user_id)
         if not user:
             return None
-            
-        # Delete all files associated with this user from MinIO
-        for appointment in user.appointments:
-            for file in appointment.files:
-                try:
-                    # Delete from MinIO
-                    bucket_name = file.path.split("/")[0]
-                    object_name = "/".join(file.path.split("/")[1:])
-                    minioStorage.remove_object(bucket_name, object_name)
-                    logger.info(f"Deleted file from MinIO: {bucket_name}/{object_name}")
-                except Exception as e:
-                    logger.error(f"Failed to delete file from MinIO: {str(e)}")
-                    # Continue with deletion even if MinIO deletion fails
-        
-        # Delete the user (cascade will delete associated appointments and files from DB)
-        return self.repo.delete_user(user_id)
\ No newline at end of file
+
+        # Drop the cached download URLs of their files
+        for file in user.files:
+            minioStorage.url_cache.pop(file.id)
+        # Objects are kept while other files still reference the content-addressed object
+        stored_objects = StoredObjectRepo(db=self.repo.db)
+        paths = stored_objects.release_many([file.path for file in user.files])
+
+        # Delete the user (cascade will delete associated appointments and files from DB),
+        # committing the released references with it
+        deleted = self.repo.delete_user(user_id)
+
+        # Only then remove the objects no file references any more, 1000 per MinIO request
+        try:
+            removed = stored_objects.remove_unreferenced(paths, minioStorage.remove_objects)
+            logger.info(f"Deleted {len(removed)} objects of user {user_id} from MinIO")
+        except Exception as e:
+            logger.error(f"Failed to delete files from MinIO: {str(e)}")
+        return deleted
+
+    def delete_user_in_background(self, user_id: str) -> Optional[str]:
+        """Queue the deletion of the user and all their data; returns the ID of the task reporting its progress"""
+        if not self.repo.get(id=user_id):
+            return None
+        return delete_files_task.apply_async(kwargs={"user_id": user_id}).id
@@ -1,7 +1,37 @@
 from infrastructure.celery import celery
 from infrastructure.minio import minioStorage
+from infrastructure.db.mysql import mysql
+from repositories.file_repository import FileRepo
+from constants.upload_state import UploadState
 from core.config import config
 import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def set_upload_state(celery_task_id: str, state: UploadState) -> None:
+    """Record the upload state on the files stored by a task; a failed update never fails the task"""
+    db = mysql.SessionLocal()
+    try:
+        FileRepo(db=db).set_upload_state(celery_task_id, state.value)
+    except Exception as exc:
+        logger.error(f"Failed to set upload state {state.value} for task {celery_task_id}: {str(exc)}")
+    finally:
+        db.close()
+
+
+def set_scan_result(celery_task_id: str, values: dict) -> None:
+    """Record the virus scan of the files stored by a task"""
+    db = mysql.SessionLocal()
+    try:
+        FileRepo(db=db).update_by_task(celery_task_id, values)
+    finally:
+        db.close()
+
 
 from . import file_upload_task
 
+from . import direct_upload_task
+
+from . import file_delete_task
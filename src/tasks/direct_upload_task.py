@@ -0,0 +1,78 @@
+from . import celery, minioStorage, set_upload_state, set_scan_result
+from minio import S3Error
+from constants.upload_state import UploadState
+from core.config import config
+from infrastructure.virus_scanner import virus_scanner
+from datetime import datetime
+from typing import Any, Dict
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _scan(stream, filename: str, file_size: int) -> Dict[str, Any]:
+    try:
+        return await virus_scanner.scan_stream(stream, filename, file_size)
+    finally:
+        # The scanner's HTTP session belongs to this task's event loop
+        await virus_scanner.close()
+
+
+def _scan_staged_object(staging_bucket: str, staging_object: str, filename: str) -> Dict[str, Any]:
+    """Stream the staging object from MinIO to the virus scanner"""
+    stat = minioStorage.stat_object(staging_bucket, staging_object)
+    response = minioStorage.get_object(staging_bucket, staging_object)
+    try:
+        return asyncio.run(_scan(response, filename, stat.size))
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def _scan_fields(scan_result: Dict[str, Any]) -> Dict[str, Any]:
+    """File columns recording a scan result, as `upload_complete` sets them for chunked uploads"""
+    fields = dict(virus_scan_status='clean', virus_scan_result=scan_result, virus_scan_date=datetime.utcnow(),
+                  is_quarantined=False, quarantine_reason=None)
+    if scan_result.get('is_infected'):
+        fields.update(virus_scan_status='infected', is_quarantined=config.QUARANTINE_INFECTED_FILES,
+                      quarantine_reason=f"Virus detected: {scan_result.get('virus_name', 'Unknown threat')}")
+    elif scan_result.get('scan_result') == 'SCAN_ERROR':
+        fields.update(virus_scan_status='error', is_quarantined=config.QUARANTINE_INFECTED_FILES,
+                      quarantine_reason=f"Scan failed: {scan_result.get('error', 'Unknown error')}")
+    elif scan_result.get('scan_result') == 'SCAN_DISABLED':
+        fields.update(virus_scan_status='disabled')
+    return fields
+
+
+@celery.task(bind=True)
+def finalize_direct_upload_task(self, bucket: str, filename: str, staging_bucket: str, staging_object: str,
+                                original_filename: str = None):
+    """Scan a direct upload in its staging object, then move it to its final location"""
+    set_upload_state(self.request.id, UploadState.scanning)
+    try:
+        scan_result = _scan_staged_object(staging_bucket, staging_object, original_filename or filename)
+        logger.info(f"Virus scan result for {staging_object}: {scan_result}")
+        fields = _scan_fields(scan_result)
+        if fields['virus_scan_status'] == 'infected' or fields['is_quarantined']:
+            logger.error(f"Rejecting direct upload {staging_object}: {fields['quarantine_reason']}")
+            # Rejected direct uploads are not kept in MinIO. The file has nothing left to retry,
+            # so it is detached from this task like the infected files of chunked uploads.
+            minioStorage.remove_object(staging_bucket, staging_object)
+            set_scan_result(self.request.id, dict(
+                fields, path="QUARANTINED" if fields['is_quarantined'] else "DELETED",
+                upload_state=UploadState.failed.value, celery_task_id=""))
+            return 0
+        set_scan_result(self.request.id, fields)
+
+        set_upload_state(self.request.id, UploadState.uploading)
+        # Server-side copy: the data does not pass through the worker
+        minioStorage.copy_object(bucket, filename, staging_bucket, staging_object)
+        minioStorage.remove_object(staging_bucket, staging_object)
+    except S3Error as exc:
+        set_upload_state(self.request.id, UploadState.failed)
+        return 0
+    except Exception:
+        set_upload_state(self.request.id, UploadState.failed)
+        raise
+    set_upload_state(self.request.id, UploadState.stored)
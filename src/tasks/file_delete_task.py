@@ -0,0 +1,63 @@
+from . import celery, minioStorage, mysql, config, FileRepo
+from repositories.stored_object_repository import StoredObjectRepo
+from repositories.appointment_repository import AppointmentRepo
+from repositories.user_repository import UserRepo
+from typing import Iterator, Optional
+from entities.file import File
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _file_batches(repo: FileRepo, file_ids: Optional[list[str]], appointment_id: Optional[str],
+                  user_id: Optional[str]) -> Iterator[tuple[list[File], int]]:
+    """Yield the batches of files to delete, each with the number of files it accounts for"""
+    size = config.APP_FILE_DELETE_BATCH_SIZE
+    if file_ids is not None:
+        for start in range(0, len(file_ids), size):
+            batch = file_ids[start:start + size]
+            # IDs that do not exist (any more) count as deleted
+            yield repo.get_files(batch), len(batch)
+        return
+    # Each batch is deleted before the next is read, so files added meanwhile are deleted too
+    while files := repo.get_owned_files(size, appointment_id=appointment_id, user_id=user_id):
+        yield files, len(files)
+
+
+@celery.task(bind=True)
+def delete_files_task(self, file_ids: Optional[list[str]] = None, appointment_id: Optional[str] = None,
+                      user_id: Optional[str] = None):
+    """
+    Delete files and their stored objects in batches, then the appointment or user
+    when given. Without `file_ids` all files of the appointment or user are deleted.
+    Progress is reported as the `PROGRESS` state with `deleted` and `total` files.
+    """
+    db = mysql.SessionLocal()
+    try:
+        repo = FileRepo(db=db)
+        if file_ids is not None:
+            total = len(file_ids)
+        else:
+            total = repo.count_owned_files(appointment_id=appointment_id, user_id=user_id)
+        deleted = 0
+        self.update_state(state="PROGRESS", meta={"deleted": deleted, "total": total})
+        stored_objects = StoredObjectRepo(db=db)
+        for files, count in _file_batches(repo, file_ids, appointment_id, user_id):
+            # Cached download URLs live in the API processes and are never read for deleted files
+            paths = stored_objects.release_many([file.path for file in files])
+            # Commits the released references together with the delete
+            repo.delete_files([file.id for file in files])
+            try:
+                stored_objects.remove_unreferenced(paths, minioStorage.remove_objects)
+            except Exception as e:
+                logger.error(f"Failed to delete files from MinIO: {str(e)}")
+            deleted += count
+            total = max(total, deleted)
+            self.update_state(state="PROGRESS", meta={"deleted": deleted, "total": total})
+        if appointment_id is not None:
+            AppointmentRepo(db=db).delete_appointment(appointment_id)
+        if user_id is not None:
+            UserRepo(db=db).delete_user(user_id)
+        return {"deleted": deleted, "total": total}
+    finally:
+        db.close()
@@ -1,31 +1,42 @@
-from . import celery, minioStorage, config, os
+from . import celery, minioStorage, config, os, set_upload_state
 from minio import S3Error
+import shutil
+from constants.upload_state import UploadState
+from infrastructure.chunk_assembler import assemble_chunks, assembled_file_path, chunk_paths
 
 
-@celery.task()
-def upload_file_task(bucket: str, upload_id: str, total_chunks: int, filename: str, content_type: str | None = None):
+def _upload_sources(upload_dir: str, total_chunks: int, task_id: str) -> list[str]:
+    """Return the ordered local files making up the upload"""
+    # `upload_complete` already assembled the chunks for scanning unless chunks are streamed
+    final_file_path = assembled_file_path(upload_dir)
+    if os.path.exists(final_file_path):
+        return [final_file_path]
+    if config.MINIO_STREAM_CHUNKS:
+        return chunk_paths(upload_dir, total_chunks)
+    # Tasks queued before the assembled file was kept: rebuild it
+    set_upload_state(task_id, UploadState.assembling)
+    return [assemble_chunks(upload_dir, total_chunks)]
+
+
+@celery.task(bind=True)
+def upload_file_task(self, bucket: str, upload_id: str, total_chunks: int, filename: str, content_type: str | None = None):
     upload_dir = os.path.join(config.APP_UPLOAD_DIR, upload_id)
-    final_file_path = os.path.join(upload_dir, "final_file")
-    with open(final_file_path, "wb") as final_file:
-        for i in range(total_chunks):
-            chunk_path = os.path.join(upload_dir, f"{i}.part")
-            with open(chunk_path, "rb") as chunk_file:
-                content = chunk_file.read()
-                final_file.write(content)
-    with open(final_file_path, 'rb') as file:
-        try:
-            minioStorage.put_object(
-                bucket,
-                filename,
-                file,
-                length=-1,
-                part_size=10 * 1024 * 1024,
-                content_type=content_type or "application/octet-stream",
-            )
-            for i in range(total_chunks):
-                chunk_path = os.path.join(upload_dir, f"{i}.part")
-                os.remove(chunk_path)
-            os.remove(final_file_path)
-            os.removedirs(upload_dir)
-        except S3Error as exc:
-            return 0
\ No newline at end of file
+    try:
+        sources = _upload_sources(upload_dir, total_chunks, self.request.id)
+        set_upload_state(self.request.id, UploadState.uploading)
+        minioStorage.put_files_parallel(
+            bucket,
+            filename,
+            sources,
+            content_type=content_type or "application/octet-stream",
+        )
+    except S3Error as exc:
+        set_upload_state(self.request.id, UploadState.failed)
+        return 0
+    except Exception:
+        set_upload_state(self.request.id, UploadState.failed)
+        raise
+    set_upload_state(self.request.id, UploadState.stored)
+    # The chunks with their manifest records, and the assembled file. The object is
+    # stored already, so a failed cleanup must not fail the upload.
+    shutil.rmtree(upload_dir, ignore_errors=True)
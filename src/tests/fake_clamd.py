@@ -0,0 +1,78 @@
+"""
+Minimal clamd speaking the `zINSTREAM` and `zPING` commands, for tests.
+
+Streams containing the EICAR test signature are reported as infected.
+Run standalone with `python -m tests.fake_clamd --port 3310`.
+"""
+import argparse
+import asyncio
+import struct
+from typing import Optional
+
+EICAR = b"X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*"
+EICAR_NAME = "Eicar-Test-Signature"
+
+
+class FakeClamd:
+    def __init__(self, socket_path: Optional[str] = None, stream_max_length: int = 25 * 1024 * 1024) -> None:
+        self.socket_path = socket_path
+        self.stream_max_length = stream_max_length
+        self.port: Optional[int] = None
+        # Sizes of the packets received by each zINSTREAM command
+        self.streams: list[list[int]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def __aenter__(self) -> "FakeClamd":
+        if self.socket_path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        else:
+            self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            command = (await reader.readuntil(b"\0")).rstrip(b"\0")
+            if command == b"zPING":
+                writer.write(b"PONG\0")
+            elif command == b"zINSTREAM":
+                writer.write(await self._instream(reader))
+            else:
+                writer.write(b"UNKNOWN COMMAND\0")
+            await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    async def _instream(self, reader: asyncio.StreamReader) -> bytes:
+        packets = []
+        self.streams.append(packets)
+        data = bytearray()
+        while True:
+            (length,) = struct.unpack("!L", await reader.readexactly(4))
+            if length == 0:
+                break
+            data += await reader.readexactly(length)
+            packets.append(length)
+            if len(data) > self.stream_max_length:
+                return b"INSTREAM size limit exceeded. ERROR\0"
+        if EICAR in data:
+            return f"stream: {EICAR_NAME} FOUND\0".encode()
+        return b"stream: OK\0"
+
+
+async def _serve(port: int) -> None:
+    server = await asyncio.start_server(FakeClamd()._handle, "127.0.0.1", port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=3310)
+    asyncio.run(_serve(parser.parse_args().port))
@@ -0,0 +1,109 @@
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import insert, delete, text
+from sqlalchemy.orm import Query
+from constants.file_listing import SortOrder
+from dto.file_dto import FileListQueryDTO
+from entities import User, Appointment, File
+from infrastructure.db.mysql import mysql
+from repositories.file_repository import FileRepo
+
+USERS = 20
+APPOINTMENTS_PER_USER = 5
+FILES_PER_APPOINTMENT = 20
+STATUSES = ["clean", "clean", "clean", "pending", "error", "infected"]
+
+USER_INDEXES = {"ix_files_user_id_created_at_id", "ix_files_user_id_virus_scan_status"}
+APPOINTMENT_INDEXES = {"ix_files_appointment_id_created_at_id", "ix_files_appointment_id_virus_scan_status"}
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    session = mysql.SessionLocal()
+    users = [str(uuid.uuid4()) for _ in range(USERS)]
+    appointments = {user: [str(uuid.uuid4()) for _ in range(APPOINTMENTS_PER_USER)] for user in users}
+    start = datetime(2026, 1, 1)
+    files = []
+    for user, user_appointments in appointments.items():
+        for appointment in user_appointments:
+            for i in range(FILES_PER_APPOINTMENT):
+                file_id = str(uuid.uuid4())
+                files.append({
+                    "id": file_id, "upload_id": file_id, "filename": f"{i}.bin", "appointment_id": appointment,
+                    "user_id": user, "path": f"public/{file_id}", "content_type": "application/pdf", "size": i,
+                    "created_at": start + timedelta(minutes=len(files)),
+                    "virus_scan_status": STATUSES[i % len(STATUSES)],
+                })
+    session.execute(insert(User), [{"id": user, "name": f"plan-{user}"} for user in users])
+    session.execute(insert(Appointment), [
+        {"id": appointment, "name": "plan", "user_id": user}
+        for user, user_appointments in appointments.items() for appointment in user_appointments
+    ])
+    session.execute(insert(File), files)
+    session.commit()
+    # Refresh the index statistics the optimizer plans with
+    session.execute(text("ANALYZE TABLE files, appointments"))
+    user = users[0]
+    yield FileRepo(db=session), user, appointments[user][0]
+    session.execute(delete(File).where(File.user_id.in_(users)))
+    session.execute(delete(Appointment).where(Appointment.user_id.in_(users)))
+    session.execute(delete(User).where(User.id.in_(users)))
+    session.commit()
+    session.close()
+
+
+def explain(repo: FileRepo, query: Query) -> dict:
+    """EXPLAIN `query` and return the plan rows by table"""
+    statement = query.statement.compile(dialect=repo.db.get_bind().dialect)
+    params = tuple(statement.params[name] for name in statement.positiontup)
+    rows = repo.db.connection().exec_driver_sql(f"EXPLAIN {statement}", params).mappings().all()
+    return {row["table"]: row for row in rows}
+
+
+def assert_index_seek(plan: dict, indexes: set) -> None:
+    assert plan["key"] in indexes, plan
+    assert plan["type"] in ("ref", "range"), plan
+    # Rows are read in index order: no sort of the owner's whole file list
+    assert "filesort" not in (plan["Extra"] or ""), plan
+
+
+def test_user_listing_uses_owner_index(seeded):
+    repo, user, _ = seeded
+
+    plan = explain(repo, repo.all_files_query(user, FileListQueryDTO(limit=50)))
+
+    assert plan["files"]["key"] in USER_INDEXES, plan
+    assert plan["files"]["type"] != "ALL", plan
+    assert plan["appointments"]["key"] == "PRIMARY", plan
+
+
+def test_appointment_listing_uses_owner_index(seeded):
+    repo, _, appointment = seeded
+
+    plan = explain(repo, repo.files_by_appointment_query(appointment, FileListQueryDTO(limit=50)))
+
+    assert plan["files"]["key"] in APPOINTMENT_INDEXES, plan
+    assert plan["files"]["type"] != "ALL", plan
+
+
+def test_status_filtered_listings_use_status_indexes(seeded):
+    repo, user, appointment = seeded
+    query = FileListQueryDTO(limit=50, virus_scan_status="clean")
+
+    user_plan = explain(repo, repo.all_files_query(user, query))["files"]
+    appointment_plan = explain(repo, repo.files_by_appointment_query(appointment, query))["files"]
+
+    assert "ix_files_user_id_virus_scan_status" in user_plan["possible_keys"], user_plan
+    assert_index_seek(user_plan, USER_INDEXES)
+    assert "ix_files_appointment_id_virus_scan_status" in appointment_plan["possible_keys"], appointment_plan
+    assert_index_seek(appointment_plan, APPOINTMENT_INDEXES)
+
+
+def test_keyset_page_seeks_past_the_cursor(seeded):
+    repo, user, _ = seeded
+    query = FileListQueryDTO(limit=50, order=SortOrder.asc, virus_scan_status="clean")
+
+    plan = explain(repo, repo.all_files_query(user, query, after=(datetime(2026, 1, 1, 1), "")))["files"]
+
+    assert_index_seek(plan, USER_INDEXES)
@@ -0,0 +1,108 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from api.routes.appointment import get_appointment_service
+from api.routes.user import get_user_service
+from entities import User, Appointment, File
+from entities.stored_object import StoredObject
+from infrastructure.cache import TTLCache
+from infrastructure.db.mysql import mysql
+from infrastructure.minio import minioStorage
+from repositories.appointment_repository import AppointmentRepo
+from repositories.user_repository import UserRepo
+from services.appointment_service import AppointmentService
+from services.user_service import UserService
+from main import app
+
+FILES = 20
+# Scan results and details are the bulk of a file row
+BLOB = {"report": "x" * 50_000}
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(minioStorage, "remove_objects", lambda paths: [])
+    monkeypatch.setattr(minioStorage, "url_cache", TTLCache(maxsize=10, ttl=60))
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    mysql.Base.metadata.create_all(engine, tables=[User.__table__, Appointment.__table__, File.__table__,
+                                                   StoredObject.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add(User(id="user", name="user"))
+    for appointment_id in ("first", "second"):
+        session.add(Appointment(id=appointment_id, name="Checkup", user_id="user"))
+    for i in range(FILES):
+        session.add(File(id=f"file-{i}", upload_id=f"file-{i}", filename="scan.pdf", user_id="user",
+                         appointment_id="first" if i % 2 else "second", path=f"public/file-{i}",
+                         content_type="application/pdf", size=1, detail=BLOB, virus_scan_result=BLOB))
+    session.commit()
+    session.expunge_all()
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, parameters, context, executemany: statements.append(statement))
+    session.statements = statements
+    yield session
+    app.dependency_overrides.clear()
+    session.close()
+
+
+def selects(statements):
+    return [statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]
+
+
+def assert_no_file_blobs(statements):
+    for statement in statements:
+        assert "files.detail" not in statement and "files.virus_scan_result" not in statement, statement
+
+
+def test_listing_appointments_reads_no_files(session):
+    app.dependency_overrides[get_appointment_service] = lambda: AppointmentService(repo=AppointmentRepo(db=session))
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/v1/appointments/", params={"user_id": "user"})
+
+    response = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert sorted(appointment["id"] for appointment in response.json()["data"]) == ["first", "second"]
+    assert len(response.content) < 1_000
+    assert len(session.statements) == 1
+    assert " files" not in session.statements[0]
+
+
+def test_appointment_cascade_reads_only_file_paths(session):
+    service = AppointmentService(repo=AppointmentRepo(db=session))
+
+    assert service.delete_appointment("first")
+
+    assert_no_file_blobs(session.statements)
+    # The appointment with its files, stored object references, then the same again for the
+    # delete, and the references locked again to remove the unreferenced objects
+    assert len(selects(session.statements)) == 6
+    session.expire_all()
+    assert session.query(File).filter(File.appointment_id == "first").count() == 0
+    assert session.query(File).count() == FILES // 2
+
+
+def test_user_cascade_reads_only_file_paths(session):
+    app.dependency_overrides[get_user_service] = lambda: UserService(repo=UserRepo(db=session))
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.delete("/api/v1/users/user")
+
+    response = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert_no_file_blobs(session.statements)
+    # The user with their appointments and files, stored object references, then the same again
+    # for the delete, and the references locked again to remove the unreferenced objects:
+    # independent of the number of appointments and files
+    assert len(selects(session.statements)) == 10
+    session.expire_all()
+    assert session.query(File).count() == 0
@@ -0,0 +1,139 @@
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from api.routes.file import get_file_handler
+from fastapi.exceptions import RequestValidationError
+from core.config import config
+from dto.file_dto import DeleteFilesDTO
+from entities import User, Appointment, File
+from entities.stored_object import StoredObject
+from handlers.file_handler import FileHandler
+from infrastructure.cache import TTLCache
+from infrastructure.db.mysql import mysql
+from infrastructure.minio import MinioStorage, minioStorage
+from repositories.appointment_repository import AppointmentRepo
+from repositories.file_repository import FileRepo
+from services.appointment_service import AppointmentService
+from services.file_service import FileService
+from tasks.file_delete_task import delete_files_task
+from main import app
+from tests.test_utils import FILE_ENDPOINT
+
+
+@pytest.fixture
+def session(monkeypatch):
+    removed = []
+
+    def remove_objects(paths):
+        removed.append(sorted(paths))
+        return []
+
+    monkeypatch.setattr(minioStorage, "remove_objects", remove_objects)
+    monkeypatch.setattr(minioStorage, "url_cache", TTLCache(maxsize=10, ttl=60))
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    mysql.Base.metadata.create_all(engine, tables=[User.__table__, Appointment.__table__, File.__table__,
+                                                   StoredObject.__table__])
+    monkeypatch.setattr(mysql, "SessionLocal", sessionmaker(bind=engine))
+    session = mysql.SessionLocal()
+    session.add(User(id="user", name="user"))
+    for appointment_id in ("first", "second"):
+        session.add(Appointment(id=appointment_id, name="Checkup", user_id="user"))
+    for i in range(5):
+        session.add(File(id=f"file-{i}", upload_id=f"file-{i}", filename="scan.pdf", user_id="user",
+                         appointment_id="first" if i < 3 else "second", path=f"public/file-{i}",
+                         content_type="application/pdf", size=1))
+    session.commit()
+    session.removed = removed
+    yield session
+    app.dependency_overrides.clear()
+    session.close()
+
+
+def test_remove_objects_batches_per_bucket(monkeypatch):
+    requests = []
+
+    def remove_objects(bucket_name, delete_object_list):
+        names = [delete_object._name for delete_object in delete_object_list]
+        requests.append((bucket_name, names))
+        return iter([SimpleNamespace(name=names[0], code="AccessDenied", message="denied")] if bucket_name == "private" else [])
+
+    storage = object.__new__(MinioStorage)
+    storage.client = SimpleNamespace(remove_objects=remove_objects)
+
+    failed = storage.remove_objects(["public/a", "private/cas/b", "public/c", "QUARANTINED", "public/a"])
+
+    # One request per bucket; quarantine placeholders have no object to remove
+    assert requests == [("public", ["a", "c"]), ("private", ["cas/b"])]
+    assert failed == ["private/cas/b"]
+
+
+def test_batch_delete_endpoint(session):
+    app.dependency_overrides[get_file_handler] = lambda: FileHandler(service=FileService(repo=FileRepo(db=session)))
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request("DELETE", f"{FILE_ENDPOINT}/batch", json={
+                "file_ids": ["file-0", "missing", "file-3"]})
+
+    response = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {"deleted": ["file-0", "file-3"], "not_found": ["missing"]}
+    # A single multi-object delete for the whole batch
+    assert session.removed == [["public/file-0", "public/file-3"]]
+    assert sorted(file.id for file in session.query(File)) == ["file-1", "file-2", "file-4"]
+
+
+def test_batch_delete_size_is_bounded(session, monkeypatch):
+    monkeypatch.setattr(config, "APP_FILE_DELETE_BATCH_SIZE", 2)
+    service = FileService(repo=FileRepo(db=session))
+
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.delete_files(DeleteFilesDTO(file_ids=["file-0", "file-1", "file-2"])))
+    assert session.removed == []
+
+
+def test_appointment_cascade_removes_objects_in_one_request(session):
+    service = AppointmentService(repo=AppointmentRepo(db=session))
+
+    assert service.delete_appointment("first")
+
+    assert session.removed == [["public/file-0", "public/file-1", "public/file-2"]]
+    assert sorted(file.id for file in session.query(File)) == ["file-3", "file-4"]
+
+
+@pytest.mark.parametrize("url", ["/api/v1/appointments/missing", "/api/v1/users/missing"])
+@pytest.mark.parametrize("background", ["true", "false"])
+def test_deleting_a_missing_owner_is_not_found(session, url, background):
+    app.dependency_overrides[mysql.get_db] = lambda: session
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.delete(url, params={"background": background})
+
+    response = asyncio.run(main())
+
+    assert response.status_code == 404
+    assert response.json()["success"] is False
+
+
+def test_background_delete_reports_progress(session, monkeypatch):
+    monkeypatch.setattr(config, "APP_FILE_DELETE_BATCH_SIZE", 2)
+    progress = []
+    monkeypatch.setattr(delete_files_task, "update_state", lambda state, meta: progress.append((state, dict(meta))))
+
+    result = delete_files_task.run(user_id="user")
+
+    assert result == {"deleted": 5, "total": 5}
+    assert [meta["deleted"] for _, meta in progress] == [0, 2, 4, 5]
+    assert {state for state, _ in progress} == {"PROGRESS"}
+    assert len(session.removed) == 3
+    session.expire_all()
+    assert session.query(File).count() == 0
+    assert session.query(User).count() == 0
@@ -0,0 +1,30 @@
+from infrastructure import cache
+from infrastructure.cache import TTLCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = TTLCache[int](maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = TTLCache[int](maxsize=10, ttl=60)
+    lru.set("default", 1)
+    lru.set("short", 2, ttl=5)
+
+    now[0] += 10
+    assert lru.get("short") is None
+    assert lru.get("default") == 1
+
+    now[0] += 60
+    assert lru.get("default", default=0) == 0
+    assert len(lru) == 0
@@ -0,0 +1,56 @@
+import os
+import errno
+import pytest
+from infrastructure import chunk_assembler
+from infrastructure.chunk_assembler import ChunkStreamReader, assemble_chunks, assembled_file_path, chunk_paths
+
+
+def write_chunks(upload_dir, chunks):
+    for i, content in enumerate(chunks):
+        (upload_dir / f"{i}.part").write_bytes(content)
+
+
+def test_chunks_are_assembled_in_order(tmp_path):
+    write_chunks(tmp_path, [b"first-", b"second-", b"third"])
+
+    path = assemble_chunks(str(tmp_path), 3)
+
+    assert path == assembled_file_path(str(tmp_path))
+    with open(path, "rb") as assembled:
+        assert assembled.read() == b"first-second-third"
+
+
+def test_missing_chunk_leaves_no_assembled_file(tmp_path):
+    write_chunks(tmp_path, [b"first-"])
+
+    with pytest.raises(FileNotFoundError):
+        assemble_chunks(str(tmp_path), 2)
+
+    assert sorted(os.listdir(tmp_path)) == ["0.part"]
+
+
+def test_falls_back_when_kernel_copy_is_unsupported(tmp_path, monkeypatch):
+    def unsupported(src_fd, dst_fd, offset, length):
+        raise OSError(errno.EXDEV, "cross-device copy")
+
+    monkeypatch.setattr(chunk_assembler, "_COPY_STRATEGIES", [unsupported, chunk_assembler._copy_buffered])
+    write_chunks(tmp_path, [b"a" * 300, b"b" * 5])
+
+    path = assemble_chunks(str(tmp_path), 2)
+
+    with open(path, "rb") as assembled:
+        assert assembled.read() == b"a" * 300 + b"b" * 5
+
+
+def test_chunk_stream_reader_reads_across_chunks(tmp_path):
+    write_chunks(tmp_path, [b"first-", b"", b"second-", b"third"])
+    paths = chunk_paths(str(tmp_path), 4)
+
+    with ChunkStreamReader(paths) as reader:
+        assert reader.size == 18
+        assert reader.read(4) == b"firs"
+        assert reader.read(10) == b"t-second-t"
+        assert reader.read() == b"hird"
+        assert reader.read(1) == b""
+
+    assert not os.path.exists(assembled_file_path(str(tmp_path)))
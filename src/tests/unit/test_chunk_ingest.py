@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import os
+from io import BytesIO
+import pytest
+from fastapi import UploadFile
+from fastapi.exceptions import RequestValidationError
+from core.config import config
+from dto.file_dto import UploadChunkDTO
+from services.file_service import FileService
+from infrastructure.content_hash import content_hasher
+from infrastructure.upload_manifest import read_manifest
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "APP_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "APP_MAX_CHUNK_SIZE", 1024)
+    monkeypatch.setattr(config, "APP_STREAM_BLOCK_SIZE", 100)
+    upload_id = "upload"
+    os.makedirs(tmp_path / upload_id)
+    yield tmp_path / upload_id
+    content_hasher.discard(upload_id)
+
+
+def make_payload(content: bytes, chunk_index: int = 0, size=None, checksum=None) -> UploadChunkDTO:
+    file = UploadFile(file=BytesIO(content), filename="chunk", size=size)
+    return UploadChunkDTO(chunk_size=len(content), file=file, upload_id="upload", chunk_index=chunk_index,
+                          checksum=checksum)
+
+
+def test_chunk_is_streamed_to_part_file(upload_dir):
+    service = FileService(repo=None)
+    asyncio.run(service.upload_chunk(make_payload(b"a" * 1000)))
+
+    assert (upload_dir / "0.part").read_bytes() == b"a" * 1000
+    # The chunk and its manifest record, no temporary file
+    assert sorted(os.listdir(upload_dir)) == ["0.part", "0.part.json"]
+
+
+def test_oversized_chunk_leaves_no_part_file(upload_dir):
+    service = FileService(repo=None)
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_chunk(make_payload(b"a" * 1025)))
+
+    assert os.listdir(upload_dir) == []
+
+
+def test_declared_oversized_chunk_is_rejected_before_writing(upload_dir):
+    service = FileService(repo=None)
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_chunk(make_payload(b"a" * 10, size=2048)))
+
+    assert os.listdir(upload_dir) == []
+
+
+def test_missing_upload_directory(upload_dir):
+    service = FileService(repo=None)
+    payload = make_payload(b"a")
+    payload.upload_id = "unknown"
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(service.upload_chunk(payload))
+
+
+def test_in_order_chunks_are_hashed_while_streaming(upload_dir):
+    service = FileService(repo=None)
+    chunks = [b"a" * 1000, b"b" * 1000, b"c" * 10]
+    for i, content in enumerate(chunks):
+        asyncio.run(service.upload_chunk(make_payload(content, chunk_index=i)))
+    state = content_hasher._digests["upload"]
+    assert state.next_index == 3
+
+    assert content_hasher.hexdigest("upload", str(upload_dir), 3) == hashlib.sha256(b"".join(chunks)).hexdigest()
+    assert "upload" not in content_hasher._digests
+
+
+def test_chunk_checksum_is_verified_before_storing(upload_dir):
+    service = FileService(repo=None)
+    content = b"a" * 1000
+    sha256 = hashlib.sha256(content).hexdigest()
+
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_chunk(make_payload(content, checksum=f"sha256:{'0' * 64}")))
+    assert os.listdir(upload_dir) == []
+
+    asyncio.run(service.upload_chunk(make_payload(content, checksum=f"SHA256:{sha256.upper()}")))
+    assert read_manifest(str(upload_dir))["chunks"] == {0: {"size": 1000, "sha256": sha256}}
+
+
+@pytest.mark.parametrize("checksum", ["md5:abcd", "sha256:not-hex", "sha256:abcd", "crc32c:"])
+def test_malformed_checksum_is_rejected(upload_dir, checksum):
+    service = FileService(repo=None)
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_chunk(make_payload(b"a", checksum=checksum)))
+
+    assert os.listdir(upload_dir) == []
+
+
+def test_crc32c_checksum(upload_dir):
+    service = FileService(repo=None)
+    asyncio.run(service.upload_chunk(make_payload(b"123456789", checksum="crc32c:e3069283")))
+
+    assert read_manifest(str(upload_dir))["chunks"][0]["crc32c"] == "e3069283"
+
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_chunk(make_payload(b"123456789", chunk_index=1, checksum="crc32c:00000000")))
+
+
+def test_concurrent_out_of_order_chunks(upload_dir):
+    service = FileService(repo=None)
+    chunks = [bytes([i]) * 1000 for i in range(6)]
+
+    async def main():
+        await asyncio.gather(*(service.upload_chunk(make_payload(chunks[i], chunk_index=i))
+                               for i in (5, 2, 0, 4, 1, 3)))
+
+    asyncio.run(main())
+
+    assert list(read_manifest(str(upload_dir))["chunks"]) == list(range(6))
+    assert content_hasher.hexdigest("upload", str(upload_dir), 6) == hashlib.sha256(b"".join(chunks)).hexdigest()
+    assert not [name for name in os.listdir(upload_dir) if name.endswith(".tmp")]
+
+
+def test_duplicate_chunk_is_idempotent(upload_dir):
+    service = FileService(repo=None)
+
+    async def main():
+        # Sent twice at once, e.g. by a client retrying after a timeout
+        await asyncio.gather(*(service.upload_chunk(make_payload(b"a" * 1000)) for _ in range(3)))
+
+    asyncio.run(main())
+    asyncio.run(service.upload_chunk(make_payload(b"a" * 1000)))
+
+    assert (upload_dir / "0.part").read_bytes() == b"a" * 1000
+    assert sorted(os.listdir(upload_dir)) == ["0.part", "0.part.json"]
+
+
+def test_conflicting_duplicate_chunk_is_rejected(upload_dir):
+    service = FileService(repo=None)
+    asyncio.run(service.upload_chunk(make_payload(b"a" * 1000)))
+
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_chunk(make_payload(b"b" * 1000)))
+
+    assert (upload_dir / "0.part").read_bytes() == b"a" * 1000
+    assert sorted(os.listdir(upload_dir)) == ["0.part", "0.part.json"]
+
+
+def test_unrecorded_chunk_is_recorded_when_sent_again(upload_dir):
+    service = FileService(repo=None)
+    # Stored by a request interrupted before recording it
+    (upload_dir / "0.part").write_bytes(b"a" * 10)
+
+    asyncio.run(service.upload_chunk(make_payload(b"a" * 10)))
+
+    assert read_manifest(str(upload_dir))["chunks"] == {0: {"size": 10, "sha256": hashlib.sha256(b"a" * 10).hexdigest()}}
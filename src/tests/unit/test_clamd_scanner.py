@@ -0,0 +1,115 @@
+import asyncio
+import os
+import pytest
+from core.config import config
+from infrastructure.virus_scanner import VirusScanner
+from tests.fake_clamd import EICAR, EICAR_NAME, FakeClamd
+
+
+@pytest.fixture
+def clamd_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "VIRUS_SCAN_ENABLED", True)
+    monkeypatch.setattr(config, "CLAMAV_BACKEND", "clamd")
+    monkeypatch.setattr(config, "CLAMD_HOST", "127.0.0.1")
+    monkeypatch.setattr(config, "CLAMD_SOCKET", None)
+    monkeypatch.setattr(config, "APP_STREAM_BLOCK_SIZE", 16)
+    return tmp_path
+
+
+def write_chunk(upload_dir, index, content):
+    (upload_dir / f"{index}.part").write_bytes(content)
+
+
+def run_with_clamd(monkeypatch, scenario, **kwargs):
+    async def main():
+        async with FakeClamd(**kwargs) as clamd:
+            if clamd.port:
+                monkeypatch.setattr(config, "CLAMD_PORT", clamd.port)
+            return clamd, await scenario(VirusScanner())
+    return asyncio.run(main())
+
+
+def test_chunks_are_scanned_as_they_arrive(clamd_config, monkeypatch):
+    async def scenario(scanner):
+        write_chunk(clamd_config, 1, b"b" * 20)
+        await scanner.feed_upload("upload", str(clamd_config))
+        assert "upload" not in scanner._scans  # nothing contiguous yet
+
+        write_chunk(clamd_config, 0, b"a" * 20)
+        await scanner.feed_upload("upload", str(clamd_config))
+        assert scanner._scans["upload"].next_index == 2
+
+        write_chunk(clamd_config, 2, b"c" * 5)
+        return await scanner.scan_upload("upload", str(clamd_config), 3, "file.bin")
+
+    clamd, result = run_with_clamd(monkeypatch, scenario)
+
+    assert result["is_infected"] is False
+    assert result["file_size"] == 45
+    # One stream, fed in blocks of APP_STREAM_BLOCK_SIZE
+    assert clamd.streams == [[16, 4, 16, 4, 5]]
+
+
+def test_feeding_does_not_wait_for_a_running_feed(clamd_config, monkeypatch):
+    async def scenario(scanner):
+        write_chunk(clamd_config, 0, b"a" * 20)
+        await scanner.feed_upload("upload", str(clamd_config))
+        scan = scanner._scans["upload"]
+
+        write_chunk(clamd_config, 1, b"b" * 20)
+        async with scan.lock:
+            # Another chunk request is feeding clamd: this one answers right away
+            await asyncio.wait_for(scanner.feed_upload("upload", str(clamd_config)), timeout=1)
+            assert scan.next_index == 1
+
+        return await scanner.scan_upload("upload", str(clamd_config), 2, "file.bin")
+
+    clamd, result = run_with_clamd(monkeypatch, scenario)
+
+    # The chunk left behind is sent by scan_upload, on the same stream
+    assert result["file_size"] == 40
+    assert len(clamd.streams) == 1
+
+
+def test_infected_upload_is_detected(clamd_config, monkeypatch):
+    async def scenario(scanner):
+        write_chunk(clamd_config, 0, EICAR[:30])
+        await scanner.feed_upload("upload", str(clamd_config))
+        write_chunk(clamd_config, 1, EICAR[30:])
+        await scanner.feed_upload("upload", str(clamd_config))
+        return await scanner.scan_upload("upload", str(clamd_config), 2, "eicar.txt")
+
+    _, result = run_with_clamd(monkeypatch, scenario)
+
+    assert result["is_infected"] is True
+    assert result["virus_name"] == EICAR_NAME
+
+
+def test_failed_incremental_scan_falls_back_to_full_scan(clamd_config, monkeypatch):
+    async def scenario(scanner):
+        write_chunk(clamd_config, 0, b"a" * 20)
+        await scanner.feed_upload("upload", str(clamd_config))
+        scanner._scans["upload"].stream.abort()
+        write_chunk(clamd_config, 1, EICAR)
+        return await scanner.scan_upload("upload", str(clamd_config), 2, "file.bin")
+
+    clamd, result = run_with_clamd(monkeypatch, scenario)
+
+    assert result["virus_name"] == EICAR_NAME
+    assert len(clamd.streams) == 2
+
+
+def test_unix_socket_and_clamd_errors(clamd_config, monkeypatch):
+    socket_path = str(clamd_config / "clamd.sock")
+    monkeypatch.setattr(config, "CLAMD_SOCKET", socket_path)
+
+    async def scenario(scanner):
+        health = await scanner.health_check()
+        write_chunk(clamd_config, 0, b"a" * 20)
+        return health, await scanner.scan_upload("upload", str(clamd_config), 1, "file.bin")
+
+    _, (health, result) = run_with_clamd(monkeypatch, scenario, socket_path=socket_path, stream_max_length=10)
+
+    assert health["status"] == "healthy"
+    assert result["scan_result"] == "SCAN_ERROR"
+    assert "clamd closed the connection" in result["error"]
@@ -0,0 +1,35 @@
+import asyncio
+import hashlib
+from core.config import config
+from infrastructure.content_hash import ContentHasher
+from infrastructure.virus_scanner import virus_scanner
+from services.file_service import FileService
+
+
+def test_out_of_order_chunks_are_hashed_from_disk(tmp_path):
+    hasher = ContentHasher()
+    (tmp_path / "1.part").write_bytes(b"second")
+    assert hasher.chunk_digest("upload", 1) is None
+
+    digest = hasher.chunk_digest("upload", 0)
+    digest.update(b"first-")
+    (tmp_path / "0.part").write_bytes(b"first-")
+    hasher.chunk_stored("upload", 0, digest)
+    hasher.advance("upload", str(tmp_path))
+    assert hasher._digests["upload"].next_index == 2
+
+    (tmp_path / "2.part").write_bytes(b"-third")
+    assert hasher.hexdigest("upload", str(tmp_path), 3) == hashlib.sha256(b"first-second-third").hexdigest()
+
+
+def test_known_content_reuses_cached_scan_result(monkeypatch):
+    monkeypatch.setattr(config, "SCAN_CACHE_ENABLED", True)
+    service = FileService(repo=None)
+    result = {'is_infected': True, 'virus_name': 'Eicar-Test-Signature', 'scan_result': 'FOUND'}
+    virus_scanner.result_cache.set(("sha", "1.4.1/27431"), result)
+
+    cached = asyncio.run(service._cached_scan_result("sha", "1.4.1/27431"))
+    assert cached == {**result, 'cached': True}
+    # No signature version, no reuse
+    assert asyncio.run(service._cached_scan_result("sha", None)) is None
+    virus_scanner.result_cache.clear()
@@ -0,0 +1,47 @@
+import httpx
+import asyncio
+from sqlalchemy import create_engine, text
+from infrastructure.db.mysql import LazySession, mysql
+from infrastructure.db.pool import InstrumentedQueuePool, PoolMetrics
+from main import app
+
+
+def test_lazy_session_is_only_created_when_used():
+    created = []
+
+    def factory():
+        created.append(True)
+        return mysql.SessionLocal()
+
+    session = LazySession(factory)
+    session.close()
+    assert created == []
+
+    session = LazySession(factory)
+    assert session.is_active
+    session.close()
+    assert created == [True]
+
+
+def test_pool_records_checkouts(monkeypatch):
+    monkeypatch.setattr(InstrumentedQueuePool, "metrics", PoolMetrics())
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1)
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+        assert engine.pool.utilization()["checked_out"] == 1
+
+    metrics = engine.pool.metrics.snapshot()
+    assert metrics["checkouts"] == 1
+    assert metrics["checkout_ms_max"] >= metrics["checkout_ms_p50"] >= 0
+    assert engine.pool.utilization()["utilization"] == 0
+
+
+def test_pool_metrics_endpoint():
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/api/v1/metrics/db-pool")
+
+    response = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert response.json()["data"]["pool_size"] == mysql.engine.pool.size()
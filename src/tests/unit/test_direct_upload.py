@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+import pytest
+from fastapi.exceptions import RequestValidationError
+from minio.datatypes import Part
+from minio.helpers import MIN_PART_SIZE
+from core.config import config
+from constants.upload_mode import UploadMode
+from constants.upload_state import UploadState
+from dto.file_dto import UploadInitDTO, UploadFileDTO
+from infrastructure.minio import minioStorage
+from services import file_service as service_module
+from services.file_service import FileService, DIRECT_SESSION_FILENAME
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "APP_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(minioStorage, "create_multipart_upload", lambda bucket, obj, content_type: "s3-upload")
+    monkeypatch.setattr(minioStorage, "get_presigned_url",
+                        lambda method, bucket_name, object_name, expires, extra_query_params:
+                        f"{method} {bucket_name}/{object_name}?part={extra_query_params['partNumber']}")
+    return tmp_path
+
+
+def test_direct_init_returns_one_url_per_part(storage):
+    service = FileService(repo=None)
+    session = asyncio.run(service.upload_initialize(
+        UploadInitDTO(mode=UploadMode.direct, total_chunks=3, content_type="video/mp4")))
+
+    object_name = f"{minioStorage.private_bucket}/uploads/{session.upload_id}"
+    assert session.mode == UploadMode.direct
+    assert session.chunk_size >= MIN_PART_SIZE
+    assert session.part_urls == [f"PUT {object_name}?part={n}" for n in (1, 2, 3)]
+    with open(os.path.join(storage, session.upload_id, DIRECT_SESSION_FILENAME)) as session_file:
+        assert json.load(session_file)["s3_upload_id"] == "s3-upload"
+
+
+def test_direct_init_requires_total_chunks(storage):
+    service = FileService(repo=None)
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_initialize(UploadInitDTO(mode=UploadMode.direct)))
+
+    assert os.listdir(storage) == []
+
+
+def test_chunked_init_has_no_part_urls(storage):
+    service = FileService(repo=None)
+    session = asyncio.run(service.upload_initialize(UploadInitDTO()))
+
+    assert session.part_urls is None
+    assert session.chunk_size == config.APP_MAX_CHUNK_SIZE
+    assert os.listdir(storage) == [session.upload_id]
+
+
+class FakeFileRepo:
+    def __init__(self):
+        self.created = []
+
+    def get_file_by_upload_id(self, upload_id):
+        return None
+
+    def create_file(self, file):
+        self.created.append(file)
+        return SimpleNamespace(id="file", **file.model_dump())
+
+
+def test_direct_complete_queues_the_scan_without_reading_the_object(storage, monkeypatch):
+    os.makedirs(storage / "upload")
+    with open(storage / "upload" / DIRECT_SESSION_FILENAME, "w") as session_file:
+        json.dump({"bucket": "staging", "object_name": "uploads/upload", "s3_upload_id": "s3-upload",
+                   "chunk_size": MIN_PART_SIZE, "completed": False}, session_file)
+    completed, queued = [], []
+    monkeypatch.setattr(minioStorage, "list_parts", lambda bucket, obj, upload_id: [Part(1, "etag-1")])
+    monkeypatch.setattr(minioStorage, "complete_multipart_upload",
+                        lambda bucket, obj, upload_id, parts: completed.append(obj))
+    monkeypatch.setattr(minioStorage, "get_object", lambda *args: pytest.fail("the API must not read the object"))
+    monkeypatch.setattr(service_module, "finalize_direct_upload_task",
+                        SimpleNamespace(apply_async=lambda kwargs, task_id: queued.append((kwargs, task_id))))
+    repo = FakeFileRepo()
+    payload = UploadFileDTO(upload_id="upload", total_chunks=1, total_size=10, file_extension="pdf",
+                            content_type="application/pdf", size=10, detail=None, credential=None,
+                            appointment_id="appointment", user_id="user", filename="scan.pdf")
+
+    file = asyncio.run(FileService(repo=repo).upload_complete(payload))
+
+    assert completed == ["uploads/upload"]
+    assert (file.virus_scan_status, file.upload_state) == ("pending", UploadState.queued.value)
+    kwargs, task_id = queued[0]
+    assert task_id == file.celery_task_id
+    assert (kwargs["staging_object"], kwargs["original_filename"]) == ("uploads/upload", "scan.pdf")
+    assert not os.path.exists(storage / "upload")
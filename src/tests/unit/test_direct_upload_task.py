@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+import pytest
+from constants.upload_state import UploadState
+from tasks import direct_upload_task as task_module
+from tasks.direct_upload_task import finalize_direct_upload_task
+
+
+@pytest.fixture
+def staged(monkeypatch):
+    calls, states, scans = [], [], []
+    response = SimpleNamespace(close=lambda: calls.append("close"), release_conn=lambda: None)
+    monkeypatch.setattr(task_module, "set_upload_state", lambda task_id, state: states.append(state))
+    monkeypatch.setattr(task_module, "set_scan_result", lambda task_id, values: scans.append(values))
+    monkeypatch.setattr(task_module.minioStorage, "stat_object", lambda bucket, obj: SimpleNamespace(size=10))
+    monkeypatch.setattr(task_module.minioStorage, "get_object", lambda bucket, obj: response)
+    monkeypatch.setattr(task_module.minioStorage, "copy_object", lambda *args: calls.append(("copy",) + args))
+    monkeypatch.setattr(task_module.minioStorage, "remove_object", lambda *args: calls.append(("remove",) + args))
+    return calls, states, scans
+
+
+def scan_result(monkeypatch, result):
+    async def scan_stream(stream, filename, file_size):
+        return dict(result, file_size=file_size)
+
+    monkeypatch.setattr(task_module.virus_scanner, "scan_stream", scan_stream)
+
+
+def finalize():
+    finalize_direct_upload_task.apply(kwargs=dict(bucket="public", filename="upload.pdf", staging_bucket="staging",
+                                                  staging_object="uploads/upload", original_filename="scan.pdf"))
+
+
+def test_clean_upload_is_moved_after_the_scan(staged, monkeypatch):
+    calls, states, scans = staged
+    scan_result(monkeypatch, {"is_infected": False, "scan_result": "OK"})
+
+    finalize()
+
+    assert states == [UploadState.scanning, UploadState.uploading, UploadState.stored]
+    assert scans[0]["virus_scan_status"] == "clean"
+    assert calls == ["close", ("copy", "public", "upload.pdf", "staging", "uploads/upload"),
+                     ("remove", "staging", "uploads/upload")]
+
+
+def test_infected_upload_is_removed_and_never_stored(staged, monkeypatch):
+    calls, states, scans = staged
+    scan_result(monkeypatch, {"is_infected": True, "virus_name": "Eicar-Test-Signature"})
+
+    finalize()
+
+    assert states == [UploadState.scanning]
+    assert (scans[0]["virus_scan_status"], scans[0]["upload_state"]) == ("infected", UploadState.failed.value)
+    assert scans[0]["path"] in ("QUARANTINED", "DELETED")
+    assert calls == ["close", ("remove", "staging", "uploads/upload")]
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from infrastructure.cache import TTLCache
+from infrastructure.minio import minioStorage
+from services.file_service import FileService
+
+
+class FakeFileRepo:
+    db = None
+
+    def __init__(self, files):
+        self.files = {file.id: file for file in files}
+
+    def get_file(self, id):
+        return self.files.get(id)
+
+    def delete_file(self, file_id):
+        return self.files.pop(file_id)
+
+
+def make_file(file_id="file", credential=None, filename="scan.pdf"):
+    return SimpleNamespace(id=file_id, path=f"bucket/{file_id}", filename=filename,
+                           content_type="application/pdf", credential=credential)
+
+
+@pytest.fixture
+def signed(monkeypatch):
+    calls = []
+
+    def get_presigned_url(method, bucket_name, object_name, expires=None, response_headers=None,
+                          extra_query_params=None):
+        calls.append(object_name)
+        return f"https://signed/{object_name}/{len(calls)}"
+
+    monkeypatch.setattr(minioStorage, "get_presigned_url", get_presigned_url)
+    monkeypatch.setattr(minioStorage, "url_cache", TTLCache(maxsize=2, ttl=60))
+    return calls
+
+
+def test_url_is_signed_once_per_file_disposition_and_credential(signed):
+    service = FileService(repo=None)
+    file = make_file(credential={"token": "a"})
+
+    first = asyncio.run(service.get_download_link(file))
+    assert asyncio.run(service.get_download_link(file)) == first
+    assert len(signed) == 1
+
+    file.credential = {"token": "b"}
+    assert asyncio.run(service.get_download_link(file)) != first
+    file.filename = "renamed.pdf"
+    asyncio.run(service.get_download_link(file))
+    assert len(signed) == 3
+
+
+def test_cache_is_bounded_and_expires(signed, monkeypatch):
+    service = FileService(repo=None)
+    files = [make_file(f"file-{i}") for i in range(3)]
+    for file in files:
+        asyncio.run(service.get_download_link(file))
+
+    # The least recently used URL was evicted
+    asyncio.run(service.get_download_link(files[0]))
+    assert len(signed) == 4
+
+    # Entries live while the URL keeps DOWNLOAD_URL_MIN_VALIDITY left, here none
+    monkeypatch.setattr(minioStorage, "url_cache", TTLCache(maxsize=2, ttl=0))
+    asyncio.run(service.get_download_link(files[0]))
+    asyncio.run(service.get_download_link(files[0]))
+    assert len(signed) == 6
+
+
+def test_deleting_a_file_drops_its_url(signed, monkeypatch):
+    monkeypatch.setattr(minioStorage, "remove_objects", lambda paths: [])
+    monkeypatch.setattr("services.file_service.StoredObjectRepo",
+                        lambda db: SimpleNamespace(release_many=lambda paths: paths,
+                                                   remove_unreferenced=lambda paths, remove: paths))
+    file = make_file()
+    service = FileService(repo=FakeFileRepo([file]))
+    asyncio.run(service.get_download_link(file))
+
+    asyncio.run(service.delete_file(file.id))
+
+    assert minioStorage.url_cache.get(file.id) is None
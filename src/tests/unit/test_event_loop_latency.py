@@ -0,0 +1,65 @@
+import asyncio
+import math
+import os
+import time
+import httpx
+import pytest
+from core.config import config
+from api.routes.file import get_file_handler
+from handlers.file_handler import FileHandler
+from services.file_service import FileService
+from main import app
+from tests.test_utils import FILE_ENDPOINT
+
+SLOW_QUERY_SECONDS = 0.5
+
+
+class SlowFileRepo:
+    """Repository whose queries block like a slow MySQL round trip"""
+    db = None
+
+    def list_all_files(self, user_id: str, query, after=None) -> list[tuple]:
+        time.sleep(SLOW_QUERY_SECONDS)
+        return []
+
+
+@pytest.fixture
+def client_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "APP_UPLOAD_DIR", str(tmp_path))
+    os.makedirs(tmp_path / "upload")
+    app.dependency_overrides[get_file_handler] = lambda: FileHandler(service=FileService(repo=SlowFileRepo()))
+    yield app
+    app.dependency_overrides.clear()
+
+
+def test_chunk_upload_p99_while_slow_queries_run(client_app):
+    async def main():
+        transport = httpx.ASGITransport(app=client_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            done = asyncio.Event()
+            slow_responses = []
+
+            async def run_slow_queries():
+                while not done.is_set():
+                    slow_responses.append(await client.get(f"{FILE_ENDPOINT}/all", params={"user_id": "user"}))
+
+            slow_queries = [asyncio.create_task(run_slow_queries()) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            latencies = []
+            for i in range(10):
+                start = time.perf_counter()
+                response = await client.post(f"{FILE_ENDPOINT}/upload/chunk/", data={
+                    "chunk_size": 100, "upload_id": "upload", "chunk_index": i,
+                }, files={"file": ("chunk", b"0" * 100)})
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+            done.set()
+            await asyncio.gather(*slow_queries)
+        return latencies, slow_responses
+
+    latencies, responses = asyncio.run(main())
+
+    assert all(response.status_code == 200 for response in responses)
+    p99 = sorted(latencies)[math.ceil(len(latencies) * 0.99) - 1]
+    # Chunk uploads keep flowing instead of queueing behind the blocked event loop
+    assert p99 < SLOW_QUERY_SECONDS / 2
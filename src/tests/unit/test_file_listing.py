@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from fastapi.exceptions import RequestValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from constants.file_listing import FileSortField, SortOrder
+from dto.file_dto import FileListQueryDTO
+from entities import User, Appointment, File
+from infrastructure.db.mysql import mysql
+from repositories.file_repository import FileRepo
+from services.file_service import FileService
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def service():
+    # Queries run in worker threads through `mysql.run`
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    mysql.Base.metadata.create_all(engine, tables=[User.__table__, Appointment.__table__, File.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add(User(id="user", name="user"))
+    session.add(Appointment(id="appointment", name="Checkup", user_id="user"))
+    # Pairs of files share a creation time so the id tie-breaker is exercised
+    for i in range(7):
+        session.add(File(
+            id=f"file-{i}", upload_id=f"upload-{i}", filename=f"{6 - i}.bin", appointment_id="appointment",
+            user_id="user", path=f"public/{i}", size=i, created_at=START + timedelta(minutes=i // 2),
+            content_type="image/png" if i % 2 else "application/pdf",
+            virus_scan_status="infected" if i == 6 else "clean",
+        ))
+    session.commit()
+    yield FileService(repo=FileRepo(db=session))
+    session.close()
+
+
+def collect(service, **params):
+    async def main():
+        pages, cursor = [], None
+        while True:
+            query = FileListQueryDTO(cursor=cursor, **params)
+            rows, cursor = await service.list_all_files("user", query)
+            pages.append([file.id for file, _ in rows])
+            if cursor is None:
+                return pages
+    return asyncio.run(main())
+
+
+def test_pages_follow_keyset_order_without_gaps(service):
+    pages = collect(service, limit=2)
+
+    # Infected files are never listed
+    assert pages == [["file-5", "file-4"], ["file-3", "file-2"], ["file-1", "file-0"]]
+
+
+def test_sort_and_filters(service):
+    assert collect(service, limit=4, sort=FileSortField.filename, order=SortOrder.asc) == [
+        ["file-5", "file-4", "file-3", "file-2"], ["file-1", "file-0"]]
+    assert collect(service, limit=10, content_type="image/*") == [["file-5", "file-3", "file-1"]]
+    assert collect(service, limit=10, created_from=START + timedelta(minutes=1),
+                   created_to=START + timedelta(minutes=2)) == [["file-3", "file-2"]]
+
+
+def test_appointment_listing_is_paginated(service):
+    query = FileListQueryDTO(limit=5)
+    files, cursor = asyncio.run(service.get_files_by_appointment("appointment", query))
+
+    assert [file.id for file in files] == ["file-5", "file-4", "file-3", "file-2", "file-1"]
+    files, cursor = asyncio.run(service.get_files_by_appointment(
+        "appointment", FileListQueryDTO(limit=5, cursor=cursor)))
+    assert [file.id for file in files] == ["file-0"]
+    assert cursor is None
+
+
+def test_cursor_is_bound_to_its_ordering(service):
+    _, cursor = asyncio.run(service.list_all_files("user", FileListQueryDTO(limit=1)))
+
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.list_all_files("user", FileListQueryDTO(limit=1, cursor=cursor, order=SortOrder.asc)))
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.list_all_files("user", FileListQueryDTO(limit=1, cursor="not-a-cursor")))
@@ -0,0 +1,25 @@
+import os
+from constants.upload_state import UploadState
+from core.config import config
+from tasks import file_upload_task as task_module
+from tasks.file_upload_task import upload_file_task
+
+
+def test_failed_cleanup_does_not_fail_a_stored_upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "APP_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "MINIO_STREAM_CHUNKS", True)
+    os.makedirs(tmp_path / "upload")
+    (tmp_path / "upload" / "0.part").write_bytes(b"a")
+    states = []
+    monkeypatch.setattr(task_module, "set_upload_state", lambda task_id, state: states.append(state))
+    monkeypatch.setattr(task_module.minioStorage, "put_files_parallel", lambda *args, **kwargs: None)
+
+    def rmtree(path, ignore_errors=False):
+        if not ignore_errors:
+            raise OSError("Device or resource busy")
+
+    monkeypatch.setattr(task_module.shutil, "rmtree", rmtree)
+
+    upload_file_task.apply(args=("bucket", "upload", 1, "scan.pdf"))
+
+    assert states == [UploadState.uploading, UploadState.stored]
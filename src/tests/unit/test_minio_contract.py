@@ -0,0 +1,90 @@
+"""
+`MinioStorage` drives multipart uploads, parallel ones and the direct uploads sent by
+clients, through private methods of the minio SDK (`_create_multipart_upload`,
+`_upload_part`, `_list_parts`, ...), which the public client does not expose. These tests pin the SDK to the version in requirements.txt and run those
+methods down to the HTTP layer, so an SDK upgrade that changes them fails here
+instead of in production.
+"""
+import os
+from importlib.metadata import version
+from types import SimpleNamespace
+import pytest
+from minio import Minio
+from minio.datatypes import Part
+from infrastructure import minio as minio_module
+from infrastructure.minio import MinioStorage
+
+REQUIREMENTS = os.path.join(os.path.dirname(__file__), "..", "..", "requirements.txt")
+NS = 'xmlns="http://s3.amazonaws.com/doc/2006-03-01/"'
+
+
+def test_sdk_version_is_pinned():
+    with open(REQUIREMENTS) as requirements:
+        pins = dict(line.strip().split("==", 1) for line in requirements if line.startswith("minio=="))
+
+    assert pins["minio"] == version("minio")
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """A MinioStorage whose SDK client answers from recorded S3 responses"""
+    requests = []
+
+    def _execute(self, method, bucket_name=None, object_name=None, body=None, headers=None, query_params=None,
+                 preload_content=True, no_body_trace=False):
+        query_params = query_params or {}
+        requests.append((method, object_name, dict(query_params), body))
+        if "uploads" in query_params:
+            data = f"<InitiateMultipartUploadResult {NS}><UploadId>upload-1</UploadId></InitiateMultipartUploadResult>"
+        elif method == "POST":
+            data = (f"<CompleteMultipartUploadResult {NS}><Bucket>{bucket_name}</Bucket><Key>{object_name}</Key>"
+                    f"<ETag>\"final\"</ETag></CompleteMultipartUploadResult>")
+        elif method == "GET":
+            data = (f"<ListPartsResult {NS}><IsTruncated>false</IsTruncated>"
+                    f"<Part><PartNumber>1</PartNumber><ETag>\"etag-1\"</ETag><Size>5</Size></Part></ListPartsResult>")
+        else:
+            data = ""
+        etag = f'"etag-{query_params.get("partNumber", "object")}"'
+        return SimpleNamespace(data=data.encode(), headers={"etag": etag})
+
+    monkeypatch.setattr(Minio, "_execute", _execute)
+    storage = object.__new__(MinioStorage)
+    storage.client = Minio("localhost:9000", access_key="access", secret_key="secret", secure=False)
+    storage.bucket_exists = lambda bucket_name: True
+    return storage, requests
+
+
+def test_parallel_multipart_upload(s3, tmp_path, monkeypatch):
+    storage, requests = s3
+    monkeypatch.setattr(minio_module, "_part_size_for", lambda total_size, part_size: 4)
+    (tmp_path / "0.part").write_bytes(b"abcdef")
+    (tmp_path / "1.part").write_bytes(b"gh")
+
+    result = storage.put_files_parallel("bucket", "object", [str(tmp_path / "0.part"), str(tmp_path / "1.part")])
+
+    assert result.etag == "final"
+    assert requests[0][0] == "POST" and "uploads" in requests[0][2]
+    assert sorted((query["partNumber"], bytes(body)) for method, _, query, body in requests if method == "PUT") == [
+        ("1", b"abcd"), ("2", b"efgh"),
+    ]
+    assert requests[-1][0] == "POST" and requests[-1][2] == {"uploadId": "upload-1"}
+
+
+def test_single_part_upload(s3, tmp_path):
+    storage, requests = s3
+    (tmp_path / "0.part").write_bytes(b"abc")
+
+    result = storage.put_files_parallel("bucket", "object", [str(tmp_path / "0.part")])
+
+    assert result.etag == "etag-object"
+    assert [(method, bytes(body)) for method, _, _, body in requests] == [("PUT", b"abc")]
+
+
+def test_direct_upload_multipart_calls(s3):
+    storage, requests = s3
+    assert storage.create_multipart_upload("bucket", "uploads/1") == "upload-1"
+    parts = storage.list_parts("bucket", "uploads/1", "upload-1")
+    assert [(part.part_number, part.etag, part.size) for part in parts] == [(1, "etag-1", 5)]
+    storage.complete_multipart_upload("bucket", "uploads/1", "upload-1", [Part(1, "etag-1")])
+    storage.abort_multipart_upload("bucket", "uploads/1", "upload-1")
+    assert [method for method, *_ in requests] == ["POST", "GET", "POST", "DELETE"]
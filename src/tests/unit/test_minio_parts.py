@@ -0,0 +1,48 @@
+from minio.helpers import MIN_PART_SIZE, MAX_MULTIPART_COUNT
+from core.config import config
+from infrastructure import minio as minio_module
+from infrastructure.minio import MinioStorage, _part_size_for, _plan_parts, _read_ranges
+
+
+def test_parts_span_file_boundaries():
+    parts = _plan_parts([("a", 7), ("b", 0), ("c", 5)], part_size=5)
+
+    assert parts == [
+        [("a", 0, 5)],
+        [("a", 5, 2), ("c", 0, 3)],
+        [("c", 3, 2)],
+    ]
+
+
+def test_part_size_respects_s3_limits():
+    assert _part_size_for(100, 1024) == MIN_PART_SIZE
+    large = MIN_PART_SIZE * MAX_MULTIPART_COUNT * 3
+    part_size = _part_size_for(large, MIN_PART_SIZE)
+    assert part_size % MIN_PART_SIZE == 0
+    assert large / part_size <= MAX_MULTIPART_COUNT
+
+
+def test_read_ranges(tmp_path):
+    first, second = tmp_path / "0.part", tmp_path / "1.part"
+    first.write_bytes(b"0123456")
+    second.write_bytes(b"abcde")
+
+    assert _read_ranges([(str(first), 5, 2), (str(second), 0, 3)]) == b"56abc"
+
+
+def test_presigning_reuses_one_offline_external_client(monkeypatch):
+    monkeypatch.setattr(config, "MINIO_EXTERNAL_ENDPOINT", "files.example.com")
+    monkeypatch.setattr(config, "MINIO_ACCESS_KEY", "access")
+    monkeypatch.setattr(config, "MINIO_SECRET_KEY", "secret")
+    monkeypatch.setattr(MinioStorage, "_instance", None)
+    storage = MinioStorage()
+
+    def no_new_clients(*args, **kwargs):
+        raise AssertionError("a Minio client was built while presigning")
+
+    monkeypatch.setattr(minio_module, "Minio", no_new_clients)
+    # The endpoint is unreachable: a region lookup would fail
+    urls = [storage.get_presigned_url("GET", "public", name) for name in ("a.pdf", "b.pdf")]
+
+    assert urls[0].startswith("https://files.example.com/public/a.pdf?")
+    assert f"%2F{config.MINIO_REGION}%2Fs3%2F" in urls[1]
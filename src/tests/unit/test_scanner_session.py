@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from aiohttp import web
+from core.config import config
+from infrastructure.virus_scanner import VirusScanner
+
+
+@pytest.fixture
+def rest_config(monkeypatch):
+    monkeypatch.setattr(config, "VIRUS_SCAN_ENABLED", True)
+    monkeypatch.setattr(config, "CLAMAV_BACKEND", "rest")
+
+
+def test_scans_reuse_pooled_connections(rest_config):
+    client_ports = set()
+
+    async def scan(request):
+        client_ports.add(request.transport.get_extra_info("peername")[1])
+        await request.read()
+        return web.json_response({"is_infected": False, "result": "OK"})
+
+    async def index(request):
+        return web.Response(text="ok")
+
+    async def main():
+        app = web.Application()
+        app.router.add_post("/scan", scan)
+        app.router.add_get("/", index)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        scanner = VirusScanner()
+        scanner.clamav_url = f"http://127.0.0.1:{port}"
+        await scanner.startup()
+        try:
+            results = [await scanner.scan_file_content(b"data", "file.txt") for _ in range(5)]
+            health = await scanner.health_check()
+        finally:
+            await scanner.close()
+            await runner.cleanup()
+        return results, health
+
+    results, health = asyncio.run(main())
+
+    assert all(result["scan_result"] == "OK" for result in results)
+    assert health["status"] == "healthy"
+    assert len(client_ports) == 1
+
+
+def test_session_of_a_previous_loop_is_closed():
+    scanner = VirusScanner()
+    first = asyncio.run(scanner.get_session())
+
+    async def main():
+        try:
+            return await scanner.get_session()
+        finally:
+            await scanner.close()
+
+    second = asyncio.run(main())
+
+    assert second is not first
+    assert first.closed and second.closed
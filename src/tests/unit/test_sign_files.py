@@ -0,0 +1,82 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from api.routes.file import get_file_handler
+from entities import User, Appointment, File
+from handlers.file_handler import FileHandler
+from infrastructure.cache import TTLCache
+from infrastructure.db.mysql import mysql
+from infrastructure.minio import minioStorage
+from repositories.file_repository import FileRepo
+from services.file_service import FileService
+from main import app
+from tests.test_utils import FILE_ENDPOINT
+
+
+@pytest.fixture
+def signed(monkeypatch):
+    calls = []
+
+    def get_presigned_url(method, bucket_name, object_name, expires=None, response_headers=None, extra_query_params=None):
+        calls.append(object_name)
+        return f"https://signed/{bucket_name}/{object_name}"
+
+    monkeypatch.setattr(minioStorage, "get_presigned_url", get_presigned_url)
+    monkeypatch.setattr(minioStorage, "url_cache", TTLCache(maxsize=10, ttl=60))
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    mysql.Base.metadata.create_all(engine, tables=[User.__table__, Appointment.__table__, File.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add(User(id="user", name="user"))
+    session.add(Appointment(id="appointment", name="Checkup", user_id="user"))
+    for file_id, credential in (("public", None), ("private", {"token": "secret"})):
+        session.add(File(id=file_id, upload_id=file_id, filename=f"{file_id}.pdf", appointment_id="appointment",
+                         user_id="user", path=f"bucket/{file_id}", content_type="application/pdf", size=1,
+                         credential=credential, virus_scan_status="clean"))
+    session.commit()
+    app.dependency_overrides[get_file_handler] = lambda: FileHandler(service=FileService(repo=FileRepo(db=session)))
+    yield calls
+    app.dependency_overrides.clear()
+    session.close()
+
+
+def request(method, url, **kwargs):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, **kwargs)
+    return asyncio.run(main())
+
+
+def test_listing_without_urls_signs_nothing(signed):
+    response = request("GET", f"{FILE_ENDPOINT}/all", params={"user_id": "user", "include_urls": "false"})
+
+    assert response.status_code == 200
+    assert [file["download_url"] for file in response.json()["data"]] == [None, None]
+    assert signed == []
+
+
+def test_sign_batch(signed):
+    response = request("POST", f"{FILE_ENDPOINT}/sign", json={
+        "file_ids": ["public", "private", "missing", "public"],
+    })
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {
+        "urls": {"public": "https://signed/bucket/public"},
+        "not_found": ["missing"],
+        "forbidden": ["private"],
+    }
+
+    response = request("POST", f"{FILE_ENDPOINT}/sign", json={
+        "file_ids": ["private"], "credential": {"token": "secret"},
+    })
+    assert response.json()["data"]["urls"] == {"private": "https://signed/bucket/private"}
+
+
+def test_sign_batch_requires_ids(signed):
+    response = request("POST", f"{FILE_ENDPOINT}/sign", json={"file_ids": []})
+
+    assert response.status_code == 422
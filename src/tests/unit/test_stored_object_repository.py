@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from entities.file import File
+from entities.stored_object import StoredObject
+from repositories.stored_object_repository import StoredObjectRepo
+
+
+@pytest.fixture
+def repo():
+    engine = create_engine("sqlite://")
+    StoredObject.__table__.create(engine)
+    File.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield StoredObjectRepo(db=session)
+    session.close()
+
+
+def test_object_is_uploaded_once_and_removed_with_last_reference(repo):
+    path = "public/cas/abc"
+    first, must_upload = repo.acquire(path, "abc", 10, celery_task_id="task-1")
+    assert must_upload
+    second, must_upload = repo.acquire(path, "abc", 10, celery_task_id="task-2")
+    assert not must_upload
+    # Files reusing the object share the task that stores it
+    assert second.celery_task_id == "task-1"
+    assert second.ref_count == 2
+
+    assert repo.release(path) is False
+    assert repo.release(path) is True
+    assert repo.db.query(StoredObject).count() == 0
+
+
+def test_content_whose_upload_failed_is_uploaded_again(repo):
+    path = "public/cas/abc"
+    repo.acquire(path, "abc", 10, celery_task_id="task-1")
+    repo.db.add(File(id="first", upload_id="first", filename="scan.pdf", appointment_id="appointment",
+                     user_id="user", path=path, content_type="application/pdf", size=10,
+                     celery_task_id="task-1", upload_state="failed"))
+    repo.db.commit()
+
+    stored, must_upload = repo.acquire(path, "abc", 10, celery_task_id="task-2")
+
+    # The duplicate stores the content itself instead of sharing the failed task
+    assert must_upload
+    assert (stored.celery_task_id, stored.ref_count) == ("task-2", 2)
+
+
+def test_objects_without_references_are_removed(repo):
+    assert repo.release("public/legacy-upload.pdf") is True
+
+
+def test_release_many_drops_one_reference_per_path(repo):
+    for task in ("task-1", "task-2", "task-3"):
+        repo.acquire("public/cas/abc", "abc", 10, celery_task_id=task)
+    repo.acquire("public/cas/def", "def", 10, celery_task_id="task-4")
+
+    unreferenced = repo.release_many(["public/cas/abc", "public/cas/abc", "public/cas/def", "public/legacy.pdf"])
+
+    assert unreferenced == ["public/cas/def", "public/legacy.pdf"]
+    # Nothing is committed: the references are released with the files holding them
+    repo.db.rollback()
+    assert repo.db.query(StoredObject).filter_by(path="public/cas/abc").one().ref_count == 3
+
+
+def test_unreferenced_objects_are_removed_after_the_commit(repo):
+    repo.acquire("public/cas/abc", "abc", 10, celery_task_id="task-1")
+    repo.acquire("public/cas/def", "def", 10, celery_task_id="task-2")
+    unreferenced = repo.release_many(["public/cas/abc", "public/cas/def", "public/legacy.pdf"])
+    repo.db.commit()
+    # Identical content uploaded again before the objects were removed
+    _, must_upload = repo.acquire("public/cas/abc", "abc", 10, celery_task_id="task-3")
+    assert must_upload
+    removing = []
+
+    def remove_objects(paths):
+        removing.extend(paths)
+        return ["public/legacy.pdf"]
+
+    removed = repo.remove_unreferenced(unreferenced, remove_objects)
+
+    assert removing == ["public/cas/def", "public/legacy.pdf"]
+    assert removed == ["public/cas/def"]
+    assert [(stored.path, stored.ref_count) for stored in repo.db.query(StoredObject)] == [("public/cas/abc", 1)]
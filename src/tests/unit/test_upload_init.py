@@ -0,0 +1,163 @@
+import asyncio
+import os
+from types import SimpleNamespace
+import httpx
+import pytest
+from fastapi.exceptions import RequestValidationError
+from api.routes.file import get_file_handler
+from constants.upload_mode import UploadMode
+from core.config import config
+from dto.file_dto import UploadInitDTO
+from handlers.file_handler import FileHandler
+from infrastructure.content_hash import content_hasher
+from infrastructure.upload_manifest import read_manifest
+from services.file_service import FileService
+from main import app
+from minio.helpers import MIN_PART_SIZE, MAX_PART_SIZE, MAX_MULTIPART_OBJECT_SIZE
+from tests.test_utils import FILE_ENDPOINT
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "APP_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "APP_MAX_CHUNK_SIZE", 10 * MB)
+    monkeypatch.setattr(config, "APP_MIN_CHUNK_SIZE", MB)
+    monkeypatch.setattr(config, "APP_UPLOAD_PARALLELISM", 4)
+    service = FileService(repo=None)
+    app.dependency_overrides[get_file_handler] = lambda: FileHandler(service=service)
+    yield service
+    app.dependency_overrides.clear()
+
+
+def post(url, **kwargs):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(url, **kwargs)
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("total_size, chunk_size, total_chunks, parallelism", [
+    # Small files take a single chunk
+    (0, MB, 1, 1),
+    (10 * 1024, MB, 1, 1),
+    # Mid-sized files are split for the chunks to be sent at once
+    (3 * MB, MB, 3, 3),
+    (20 * MB, 5 * MB, 4, 4),
+    (20 * MB + 1, 5 * MB + 64 * 1024, 4, 4),
+    # Huge files take as few chunks as the largest chunk allows
+    (10 * 1024 * MB, 10 * MB, 1024, 4),
+])
+def test_chunk_size_follows_total_size(service, total_size, chunk_size, total_chunks, parallelism):
+    session = asyncio.run(service.upload_initialize(UploadInitDTO(total_size=total_size)))
+
+    assert (session.chunk_size, session.total_chunks, session.parallelism) == (chunk_size, total_chunks, parallelism)
+    manifest = read_manifest(os.path.join(config.APP_UPLOAD_DIR, session.upload_id))
+    assert (manifest["chunk_size"], manifest["total_chunks"]) == (chunk_size, total_chunks)
+
+
+def test_without_total_size_the_largest_chunk_is_used(service):
+    session = asyncio.run(service.upload_initialize(UploadInitDTO(total_chunks=3)))
+
+    assert (session.chunk_size, session.total_chunks, session.parallelism) == (10 * MB, 3, 3)
+
+
+def test_total_size_and_total_chunks_are_exclusive(service):
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_initialize(UploadInitDTO(total_size=MB, total_chunks=1)))
+
+
+def test_direct_parts_respect_s3_limits(service):
+    plan = service._plan_chunks(UploadInitDTO(mode=UploadMode.direct, total_size=6 * MB))
+    assert plan == (MIN_PART_SIZE, 2)
+
+    # At most 10000 parts, however large the file
+    chunk_size, total_chunks = service._plan_chunks(UploadInitDTO(mode=UploadMode.direct, total_size=200 * 1024 * MB))
+    assert chunk_size * 10000 >= 200 * 1024 * MB
+    assert total_chunks <= 10000
+    assert chunk_size % (64 * 1024) == 0
+
+    # The largest object S3 allows still fits, in parts no larger than the S3 maximum
+    chunk_size, total_chunks = service._plan_chunks(
+        UploadInitDTO(mode=UploadMode.direct, total_size=MAX_MULTIPART_OBJECT_SIZE))
+    assert total_chunks <= 10000 and chunk_size % (64 * 1024) == 0
+
+
+def test_direct_parts_never_exceed_the_s3_maximum(service, monkeypatch):
+    monkeypatch.setattr(config, "APP_MAX_CHUNK_SIZE", 2 * MAX_PART_SIZE)
+
+    chunk_size, _ = service._plan_chunks(UploadInitDTO(mode=UploadMode.direct, total_size=40 * MAX_PART_SIZE))
+    assert chunk_size == MAX_PART_SIZE
+
+
+def test_total_size_above_the_s3_object_limit_is_rejected(service):
+    with pytest.raises(RequestValidationError):
+        asyncio.run(service.upload_initialize(UploadInitDTO(total_size=MAX_MULTIPART_OBJECT_SIZE + 1)))
+
+    assert os.listdir(config.APP_UPLOAD_DIR) == []
+
+
+def test_init_endpoint_returns_the_plan(service):
+    response = post(f"{FILE_ENDPOINT}/upload/init/", data={"total_size": str(3 * MB), "content_type": "application/pdf"})
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert (data["chunk_size"], data["total_chunks"], data["parallelism"]) == (MB, 3, 3)
+
+
+FORM = {"file_extension": "pdf", "content_type": "application/pdf", "appointment_id": "appointment",
+        "user_id": "user", "filename": "scan.pdf"}
+
+
+def test_single_request_upload(service, monkeypatch):
+    completed = []
+
+    async def upload_complete(payload):
+        upload_dir = os.path.join(config.APP_UPLOAD_DIR, payload.upload_id)
+        completed.append((payload, read_manifest(upload_dir)))
+        return SimpleNamespace(id="file", path="bucket/file", credential=None, content_type=payload.content_type,
+                               detail=payload.detail, filename=payload.filename, size=payload.size,
+                               virus_scan_status="clean", is_quarantined=False, quarantine_reason=None)
+
+    async def get_download_link(file):
+        return "https://signed/bucket/file"
+
+    monkeypatch.setattr(service, "upload_complete", upload_complete)
+    monkeypatch.setattr(service, "get_download_link", get_download_link)
+
+    response = post(f"{FILE_ENDPOINT}/upload/", data={**FORM, "detail": '{"page": 1}'},
+                    files={"file": ("scan.pdf", b"a" * 1000)})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["size"] == 1000
+    payload, manifest = completed[0]
+    assert (payload.total_chunks, payload.total_size, payload.detail) == (1, 1000, {"page": "1"})
+    assert manifest["total_chunks"] == 1 and manifest["chunks"][0]["size"] == 1000
+
+
+def test_single_request_upload_rejects_large_files(service, monkeypatch):
+    monkeypatch.setattr(config, "APP_MAX_CHUNK_SIZE", 1024)
+
+    response = post(f"{FILE_ENDPOINT}/upload/", data=FORM, files={"file": ("scan.pdf", b"a" * 1025)})
+
+    assert response.status_code == 422
+    # Nothing is left of the upload
+    assert os.listdir(config.APP_UPLOAD_DIR) == []
+
+
+def test_single_request_upload_is_cleaned_up_when_completion_fails(service, monkeypatch):
+    upload_ids = []
+
+    async def upload_complete(payload):
+        upload_ids.append(payload.upload_id)
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(service, "upload_complete", upload_complete)
+
+    response = post(f"{FILE_ENDPOINT}/upload/", data=FORM, files={"file": ("scan.pdf", b"a" * 1000)})
+
+    assert response.status_code == 500
+    assert os.listdir(config.APP_UPLOAD_DIR) == []
+    assert upload_ids[0] not in content_hasher._digests
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import os
+from io import BytesIO
+import httpx
+import pytest
+from types import SimpleNamespace
+from fastapi import UploadFile
+from api.routes.file import get_file_handler
+from core.config import config
+from dto.file_dto import UploadChunkDTO, UploadInitDTO, UploadFileDTO
+from fastapi.exceptions import RequestValidationError
+from handlers.file_handler import FileHandler
+from infrastructure.upload_manifest import read_manifest
+from services.file_service import FileService
+from main import app
+from tests.test_utils import FILE_ENDPOINT
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "APP_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "APP_MAX_CHUNK_SIZE", 1024)
+    service = FileService(repo=None)
+    app.dependency_overrides[get_file_handler] = lambda: FileHandler(service=service)
+    yield service
+    app.dependency_overrides.clear()
+
+
+def send_chunk(service, upload_id, chunk_index, content):
+    file = UploadFile(file=BytesIO(content), filename="chunk")
+    asyncio.run(service.upload_chunk(UploadChunkDTO(
+        chunk_size=len(content), file=file, upload_id=upload_id, chunk_index=chunk_index)))
+
+
+def get_chunks(upload_id):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(f"{FILE_ENDPOINT}/upload/{upload_id}/chunks")
+    return asyncio.run(main())
+
+
+def test_manifest_lists_received_and_missing_chunks(service):
+    session = asyncio.run(service.upload_initialize(UploadInitDTO(total_chunks=4)))
+    send_chunk(service, session.upload_id, 0, b"a" * 1024)
+    send_chunk(service, session.upload_id, 2, b"c" * 10)
+
+    response = get_chunks(session.upload_id)
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {
+        "upload_id": session.upload_id,
+        "mode": "chunked",
+        "total_chunks": 4,
+        "chunk_size": 1024,
+        "received": [
+            {"index": 0, "size": 1024, "sha256": hashlib.sha256(b"a" * 1024).hexdigest(), "crc32c": None},
+            {"index": 2, "size": 10, "sha256": hashlib.sha256(b"c" * 10).hexdigest(), "crc32c": None},
+        ],
+        "missing": [1, 3],
+    }
+
+
+def test_chunk_without_record_is_missing(service):
+    session = asyncio.run(service.upload_initialize(UploadInitDTO()))
+    upload_dir = os.path.join(config.APP_UPLOAD_DIR, session.upload_id)
+    send_chunk(service, session.upload_id, 0, b"a")
+    # Interrupted between storing the part and recording it
+    with open(os.path.join(upload_dir, "1.part"), "wb") as part:
+        part.write(b"b")
+
+    manifest = read_manifest(upload_dir)
+
+    assert manifest["total_chunks"] is None
+    assert list(manifest["chunks"]) == [0]
+
+
+def test_unknown_upload(service):
+    assert get_chunks("unknown").status_code == 404
+
+
+def complete(service, upload_id, total_chunks):
+    return asyncio.run(service.upload_complete(UploadFileDTO(
+        upload_id=upload_id, total_chunks=total_chunks, total_size=1, file_extension="pdf",
+        content_type="application/pdf", size=1, detail=None, credential=None, appointment_id="appointment",
+        user_id="user", filename="scan.pdf")))
+
+
+def test_chunk_index_outside_declared_total_is_rejected(service):
+    session = asyncio.run(service.upload_initialize(UploadInitDTO(total_chunks=2)))
+
+    for chunk_index in (-1, 2):
+        with pytest.raises(RequestValidationError):
+            send_chunk(service, session.upload_id, chunk_index, b"a")
+
+
+def test_complete_requires_every_chunk(service):
+    service.repo = SimpleNamespace(get_file_by_upload_id=lambda upload_id: None)
+    session = asyncio.run(service.upload_initialize(UploadInitDTO(total_chunks=3)))
+    send_chunk(service, session.upload_id, 2, b"c")
+    send_chunk(service, session.upload_id, 0, b"a")
+
+    with pytest.raises(RequestValidationError) as missing:
+        complete(service, session.upload_id, 3)
+    assert missing.value.body["missing"] == [1]
+
+    with pytest.raises(RequestValidationError) as mismatch:
+        complete(service, session.upload_id, 2)
+    assert mismatch.value.body["declared"] == 3
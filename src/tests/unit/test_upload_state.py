@@ -0,0 +1,167 @@
+import asyncio
+import inspect
+import os
+from types import SimpleNamespace
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from api.routes.file import get_file_handler
+from constants.upload_state import UploadState
+from core.config import config
+from dto.file_dto import RetryUploadFileDTO
+from entities import User, Appointment, File
+from exceptions.http_exception import FileUploadedException, FilePendingUploadException
+from handlers.file_handler import FileHandler
+from infrastructure.db.mysql import mysql
+from infrastructure.upload_manifest import create_manifest
+from repositories.file_repository import FileRepo
+from services import file_service as service_module
+from services.file_service import FileService
+from tasks.file_upload_task import upload_file_task
+from main import app
+from tests.test_utils import FILE_ENDPOINT
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    monkeypatch.setattr(config, "UPLOAD_STATE_POLL_INTERVAL", 0.01)
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    mysql.Base.metadata.create_all(engine, tables=[User.__table__, Appointment.__table__, File.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add(User(id="user", name="user"))
+    session.add(Appointment(id="appointment", name="Checkup", user_id="user"))
+    # Both files share one content-addressed object, stored by one task
+    for file_id in ("file", "copy"):
+        session.add(File(id=file_id, upload_id=file_id, filename="scan.pdf", appointment_id="appointment",
+                         user_id="user", path="bucket/cas/abc", content_type="application/pdf", size=1,
+                         celery_task_id="task"))
+    session.commit()
+    yield FileRepo(db=session)
+    app.dependency_overrides.clear()
+    session.close()
+
+
+def retry(file_id):
+    return RetryUploadFileDTO(id=file_id, credential=None)
+
+
+def test_state_is_read_from_the_row(repo):
+    service = FileService(repo=repo)
+    assert asyncio.run(service.get_upload_status("file", credential={})) == UploadState.queued
+
+    assert repo.set_upload_state("task", UploadState.stored.value) == 2
+    repo.db.expire_all()
+    assert asyncio.run(service.get_upload_status("copy", credential={})) == UploadState.stored
+
+
+def test_retry_only_requeues_failed_uploads(repo, monkeypatch):
+    service = FileService(repo=repo)
+    retried = []
+    monkeypatch.setattr(service, "_retry_task", retried.append)
+
+    with pytest.raises(FilePendingUploadException):
+        asyncio.run(service.retry_upload(retry("file")))
+    repo.set_upload_state("task", UploadState.failed.value)
+    repo.db.expire_all()
+    asyncio.run(service.retry_upload(retry("file")))
+    repo.db.expire_all()
+
+    assert [file.celery_task_id for file in retried] == ["task"]
+    assert repo.get_upload_state("file") == UploadState.queued.value
+    repo.set_upload_state("task", UploadState.stored.value)
+    repo.db.expire_all()
+    with pytest.raises(FileUploadedException):
+        asyncio.run(service.retry_upload(retry("file")))
+
+
+def test_retry_rebuilds_the_task_whose_queueing_failed(repo, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "APP_UPLOAD_DIR", str(tmp_path))
+    os.makedirs(tmp_path / "file")
+    create_manifest(str(tmp_path / "file"), 3, 1024)
+    repo.set_upload_state("task", UploadState.failed.value)
+    repo.db.expire_all()
+    # The task never reached the result backend
+    monkeypatch.setattr(service_module.celery.backend, "get_task_meta",
+                        lambda task_id: {"name": None, "args": None, "kwargs": None})
+    queued = []
+    monkeypatch.setattr(service_module, "upload_file_task",
+                        SimpleNamespace(apply_async=lambda kwargs, task_id: queued.append((kwargs, task_id))))
+
+    asyncio.run(FileService(repo=repo).retry_upload(retry("file")))
+
+    kwargs, task_id = queued[0]
+    assert task_id == "task"
+    assert kwargs == {"bucket": "bucket", "upload_id": "file", "total_chunks": 3, "filename": "cas/abc",
+                      "content_type": "application/pdf"}
+    # Celery would reject arguments the task does not take
+    inspect.signature(upload_file_task.run).bind(**kwargs)
+
+
+def test_state_stream_follows_the_task(repo):
+    service = FileService(repo=repo)
+
+    async def next_change(states):
+        async for state in states:
+            if state is not None:
+                return state
+
+    async def main():
+        states = await service.upload_state_events("file", credential={})
+        seen = [await next_change(states)]
+        repo.set_upload_state("task", UploadState.uploading.value)
+        seen.append(await next_change(states))
+        repo.set_upload_state("task", UploadState.stored.value)
+        seen.append(await next_change(states))
+        # The stream ends once the upload is stored
+        seen.append(await next_change(states))
+        return seen
+
+    assert asyncio.run(main()) == [UploadState.queued, UploadState.uploading, UploadState.stored, None]
+
+
+def test_state_events_endpoint(repo):
+    repo.set_upload_state("task", UploadState.stored.value)
+    app.dependency_overrides[get_file_handler] = lambda: FileHandler(service=FileService(repo=repo))
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(f"{FILE_ENDPOINT}/status/file/events")
+
+    response = asyncio.run(main())
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == 'event: state\ndata: {"status":"SUCCESS","state":"stored"}\n\n'
+
+
+def test_batch_status_endpoint(repo):
+    for file_id in ("private", "other"):
+        repo.create(File(id=file_id, upload_id=file_id, filename="scan.pdf", appointment_id="appointment",
+                         user_id="user", path=f"bucket/{file_id}", content_type="application/pdf", size=1,
+                         celery_task_id=f"{file_id}-task", credential={"token": "secret"}, upload_state="uploading"))
+    repo.set_upload_state("task", UploadState.stored.value)
+    app.dependency_overrides[get_file_handler] = lambda: FileHandler(service=FileService(repo=repo))
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(f"{FILE_ENDPOINT}/status/batch", json={"files": [
+                {"id": "file"}, {"id": "private", "credential": {"token": "secret"}},
+                {"id": "copy", "credential": None}, {"id": "other", "credential": {"token": "guess"}},
+                {"id": "missing"},
+            ]})
+
+    response = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {
+        "statuses": {
+            "file": {"status": "SUCCESS", "state": "stored"},
+            "private": {"status": "STARTED", "state": "uploading"},
+            "copy": {"status": "SUCCESS", "state": "stored"},
+        },
+        "not_found": ["missing"],
+        "forbidden": ["other"],
+    }
@@ -1,7 +1,9 @@
 import json
+import base64
+import binascii
 from fastapi.exceptions import RequestValidationError
 from constants.errors import ValidatonErrors
-from typing import Dict
+from typing import Any, Dict
 
 
 def parse_json_to_dict(json_string: str, body: str) -> Dict[str, str]:
@@ -15,3 +17,20 @@ def parse_json_to_dict(json_string: str, body: str) -> Dict[str, str]:
         }],
             body={body: "invalid_format"})
     return {str(key): str(value) for key, value in parsed_dict.items()}
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor"""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor built by `encode_cursor`, raising `ValueError` if it is malformed"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(payload, dict):
+        raise ValueError("Malformed cursor")
+    return payload